@@ -8,7 +8,7 @@ import subprocess
 import sys
 import threading
 
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 from homeassistant.const import (
     __version__,
@@ -152,6 +152,10 @@ def get_arguments() -> argparse.Namespace:
         metavar='path_to_pid_file',
         default=None,
         help='Path to PID file useful for running as daemon')
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Print how long importing and setting up each component took')
     parser.add_argument(
         '--log-rotate-days',
         type=int,
@@ -308,10 +312,33 @@ def setup_and_run_hass(config_dir: str,
             EVENT_HOMEASSISTANT_START, open_browser
         )
 
+    if args.profile_startup:
+        def print_profile(event):
+            """Print the startup profile of the components."""
+            print_startup_profile(bootstrap.setup_profile(hass))
+
+        run_callback_threadsafe(
+            hass.loop,
+            hass.bus.async_listen_once,
+            EVENT_HOMEASSISTANT_START, print_profile
+        )
+
     hass.start()
     return hass.exit_code
 
 
+def print_startup_profile(profile: Dict[str, Dict[str, float]]) -> None:
+    """Print the startup profile, slowest component first."""
+    keys = ('import', 'requirements', 'setup')
+    rows = sorted(profile.items(), key=lambda item: -sum(item[1].values()))
+
+    print('{:<40}{:>14}{:>14}{:>14}'.format('Component', *keys))
+    for name, timings in rows:
+        print('{:<40}'.format(name) + ''.join(
+            '{:>13.3f}s'.format(timings[key]) if key in timings
+            else '{:>14}'.format('-') for key in keys))
+
+
 def try_to_restart() -> None:
     """Attempt to clean up state and start a new homeassistant instance."""
     # Things should be mostly shut down already at this point, now just try
@@ -4,7 +4,9 @@ import logging
 import logging.handlers
 import os
 import sys
+import threading
 from collections import defaultdict
+from time import monotonic
 
 from types import ModuleType
 from typing import Any, Optional, Dict
@@ -31,15 +33,50 @@ _LOGGER = logging.getLogger(__name__)
 ATTR_COMPONENT = 'component'
 
 ERROR_LOG_FILENAME = 'home-assistant.log'
+REQUIREMENTS_CACHE_FILENAME = '.requirements_cache'
 _PERSISTENT_ERRORS = {}
 HA_COMPONENT_URL = '[{}](https://home-assistant.io/components/{}/)'
 
+# Components set up one by one before all others
+FIRST_COMPONENTS = ('logger', 'recorder', 'introduction')
+
+# Components whose sync setup is running in the current thread
+_SYNC_SETUPS = threading.local()
+
 
 def setup_component(hass: core.HomeAssistant, domain: str,
                     config: Optional[Dict]=None) -> bool:
     """Setup a component and all its dependencies."""
-    return run_coroutine_threadsafe(
-        async_setup_component(hass, domain, config), loop=hass.loop).result()
+    in_setup = getattr(_SYNC_SETUPS, 'domains', None)
+
+    if in_setup:
+        # Setup on behalf of the component set up in this thread, so
+        # waiting on a setup that waits for it is detected
+        coro = _async_setup_component_for(hass, domain, config, in_setup[-1])
+    else:
+        coro = async_setup_component(hass, domain, config)
+
+    return run_coroutine_threadsafe(coro, loop=hass.loop).result()
+
+
+@asyncio.coroutine
+def _async_setup_component_for(hass: core.HomeAssistant, domain: str,
+                               config: Optional[Dict], waiter: str) -> bool:
+    """Setup a component for the sync setup of waiter.
+
+    This method is a coroutine.
+    """
+    setup_waiters = hass.data.get('setup_waiters')
+    if setup_waiters is None:
+        setup_waiters = hass.data['setup_waiters'] = {}
+
+    task = asyncio.Task.current_task(loop=hass.loop)
+    setup_waiters[task] = waiter
+
+    try:
+        return (yield from async_setup_component(hass, domain, config))
+    finally:
+        del setup_waiters[task]
 
 
 @asyncio.coroutine
@@ -85,12 +122,28 @@ def _handle_requirements(hass: core.HomeAssistant, component,
     if hass.config.skip_pip or not hasattr(component, 'REQUIREMENTS'):
         return True
 
-    for req in component.REQUIREMENTS:
-        if not pkg_util.install_package(req, target=hass.config.path('deps')):
-            _LOGGER.error('Not initializing %s because could not install '
-                          'dependency %s', name, req)
-            _async_persistent_notification(hass, name)
-            return False
+    deps_dir = hass.config.path('deps')
+
+    requirements_timings = hass.data.get('requirements_timings')
+    if requirements_timings is None:
+        requirements_timings = hass.data['requirements_timings'] = {}
+
+    cache = hass.data.get('requirements_cache')
+    if cache is None:
+        cache = hass.data.setdefault(
+            'requirements_cache', pkg_util.RequirementsCache(
+                hass.config.path(REQUIREMENTS_CACHE_FILENAME), deps_dir))
+
+    start = monotonic()
+    failed = pkg_util.install_packages(
+        component.REQUIREMENTS, target=deps_dir, cache=cache)
+    requirements_timings[name] = monotonic() - start
+
+    if failed:
+        _LOGGER.error('Not initializing %s because could not install '
+                      'dependency %s', name, ', '.join(failed))
+        _async_persistent_notification(hass, name)
+        return False
 
     return True
 
@@ -100,25 +153,102 @@ def _async_setup_component(hass: core.HomeAssistant,
                            domain: str, config) -> bool:
     """Setup a component for Home Assistant.
 
+    Waits for the result if the component is already being set up.
+
     This method is a coroutine.
     """
-    # pylint: disable=too-many-return-statements
     if domain in hass.config.components:
         return True
 
+    setup_tasks = hass.data.get('setup_tasks')
+    if setup_tasks is None:
+        setup_tasks = hass.data['setup_tasks'] = {}
+
+    setup_waits = hass.data.get('setup_waits')
+    if setup_waits is None:
+        setup_waits = hass.data['setup_waits'] = {}
+
+    waiter = _async_current_setup(hass, setup_tasks)
+
+    if waiter is not None:
+        # Waiting on a setup that waits for us would never finish
+        if _async_waits_for(setup_waits, domain, waiter):
+            _LOGGER.error('Attempt made to setup %s during setup of %s',
+                          domain, waiter)
+            _async_persistent_notification(hass, domain, True)
+            return False
+
+        setup_waits.setdefault(waiter, []).append(domain)
+
+    try:
+        task = setup_tasks.get(domain)
+
+        if task is not None:
+            return (yield from asyncio.shield(task, loop=hass.loop))
+
+        task = setup_tasks[domain] = hass.loop.create_task(
+            _async_run_setup_component(hass, domain, config))
+
+        try:
+            return (yield from task)
+        finally:
+            setup_tasks.pop(domain)
+    finally:
+        if waiter is not None:
+            waits = setup_waits[waiter]
+            waits.remove(domain)
+
+            if not waits:
+                del setup_waits[waiter]
+
+
+@core.callback
+def _async_current_setup(hass: core.HomeAssistant, setup_tasks):
+    """Return the component the current task is setting up, if any."""
+    task = asyncio.Task.current_task(loop=hass.loop)
+
+    for domain, setup_task in setup_tasks.items():
+        if setup_task is task:
+            return domain
+
+    return hass.data.get('setup_waiters', {}).get(task)
+
+
+def _async_waits_for(setup_waits, domain: str, other: str) -> bool:
+    """Return if the setup of domain is, or waits for, the setup of other."""
+    seen = set()
+    pending = [domain]
+
+    while pending:
+        current = pending.pop()
+
+        if current == other:
+            return True
+
+        if current not in seen:
+            seen.add(current)
+            pending.extend(setup_waits.get(current, ()))
+
+    return False
+
+
+@asyncio.coroutine
+def _async_run_setup_component(hass: core.HomeAssistant,
+                               domain: str, config) -> bool:
+    """Run the setup of a component and record how long it took.
+
+    This method is a coroutine.
+    """
+    # pylint: disable=too-many-return-statements
     setup_lock = hass.data.get('setup_lock')
     if setup_lock is None:
         setup_lock = hass.data['setup_lock'] = asyncio.Lock(loop=hass.loop)
 
-    setup_progress = hass.data.get('setup_progress')
-    if setup_progress is None:
-        setup_progress = hass.data['setup_progress'] = []
+    setup_timings = hass.data.get('setup_timings')
+    if setup_timings is None:
+        setup_timings = hass.data['setup_timings'] = {}
 
-    if domain in setup_progress:
-        _LOGGER.error('Attempt made to setup %s during setup of %s',
-                      domain, domain)
-        _async_persistent_notification(hass, domain, True)
-        return False
+    start = monotonic()
 
     try:
         # Used to indicate to discovery that a setup is ongoing and allow it
@@ -128,7 +258,6 @@ def _async_setup_component(hass: core.HomeAssistant,
             yield from setup_lock.acquire()
             did_lock = True
 
-        setup_progress.append(domain)
         config = yield from async_prepare_setup_component(hass, config, domain)
 
         if config is None:
@@ -147,7 +276,8 @@ def _async_setup_component(hass: core.HomeAssistant,
                 result = yield from component.async_setup(hass, config)
             else:
                 result = yield from hass.loop.run_in_executor(
-                    None, component.setup, hass, config)
+                    None, _sync_setup_component, component, domain, hass,
+                    config)
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception('Error during setup of component %s', domain)
             _async_persistent_notification(hass, domain, True)
@@ -172,11 +302,114 @@ def _async_setup_component(hass: core.HomeAssistant,
 
         return True
     finally:
-        setup_progress.remove(domain)
+        setup_timings[domain] = monotonic() - start
         if did_lock:
             setup_lock.release()
 
 
+def _sync_setup_component(component, domain: str,
+                          hass: core.HomeAssistant, config) -> bool:
+    """Run the sync setup of a component and track it for the thread.
+
+    This method needs to run in an executor.
+    """
+    in_setup = getattr(_SYNC_SETUPS, 'domains', None)
+    if in_setup is None:
+        in_setup = _SYNC_SETUPS.domains = []
+
+    in_setup.append(domain)
+    try:
+        return component.setup(hass, config)
+    finally:
+        in_setup.pop()
+
+
+@asyncio.coroutine
+def _async_setup_components(hass: core.HomeAssistant, components, config):
+    """Setup components concurrently in the order of their dependencies.
+
+    A component is set up as soon as its dependencies are. Components that
+    depend on the group component wait for all the ones that do not, like
+    the sequential load order. At most hass.config.setup_concurrency
+    components are set up at the same time.
+
+    This method is a coroutine.
+    """
+    load_order = loader.load_order_components(components)
+
+    for domain in FIRST_COMPONENTS:
+        if domain in load_order:
+            yield from _async_setup_component(hass, domain, config)
+
+    setup_lock = hass.data.get('setup_lock')
+    if setup_lock is None:
+        setup_lock = hass.data['setup_lock'] = asyncio.Lock(loop=hass.loop)
+
+    semaphore = asyncio.Semaphore(hass.config.setup_concurrency,
+                                  loop=hass.loop)
+    grouped = set(domain for domain in load_order
+                  if 'group' in loader.load_order_component(domain))
+    tasks = {}
+
+    @asyncio.coroutine
+    def setup_after(domain, waits):
+        """Setup the component once the components it waits for are."""
+        if waits:
+            yield from asyncio.wait(waits, loop=hass.loop)
+
+        with (yield from semaphore):
+            yield from _async_setup_component(hass, domain, config)
+
+    # Keep discovery waiting until all components are set up
+    yield from setup_lock.acquire()
+
+    try:
+        for domain in load_order:
+            if domain in FIRST_COMPONENTS:
+                continue
+
+            component = loader.get_component(domain)
+            waits = [tasks[dep] for dep
+                     in getattr(component, 'DEPENDENCIES', []) if dep in tasks]
+
+            if domain in grouped:
+                waits.extend(task for comp, task in tasks.items()
+                             if comp not in grouped)
+
+            tasks[domain] = hass.loop.create_task(setup_after(domain, waits))
+
+        if tasks:
+            yield from asyncio.wait(tasks.values(), loop=hass.loop)
+    finally:
+        setup_lock.release()
+
+
+def setup_profile(hass: core.HomeAssistant) -> Dict[str, Dict[str, float]]:
+    """Return the import, requirements and setup time of each component.
+
+    Async friendly.
+    """
+    timings = (('import', loader.IMPORT_TIMINGS),
+               ('requirements', hass.data.get('requirements_timings', {})),
+               ('setup', hass.data.get('setup_timings', {})))
+    profile = defaultdict(dict)  # type: Dict[str, Dict[str, float]]
+
+    for key, durations in timings:
+        for name, duration in durations.items():
+            profile[name][key] = duration
+
+    return dict(profile)
+
+
+def _log_setup_timings(hass: core.HomeAssistant):
+    """Log how long the setup of each component took, slowest first."""
+    setup_timings = hass.data.get('setup_timings', {})
+
+    _LOGGER.info('Component setup times: %s', ', '.join(
+        '{}: {:.2f}s'.format(domain, duration) for domain, duration in
+        sorted(setup_timings.items(), key=lambda item: -item[1])))
+
+
 def prepare_setup_component(hass: core.HomeAssistant, config: dict,
                             domain: str):
     """Prepare setup of a component and return processed config."""
@@ -414,8 +647,9 @@ def async_from_config_dict(config: Dict[str, Any],
     service.HASS = hass
 
     # Setup the components
-    for domain in loader.load_order_components(components):
-        yield from _async_setup_component(hass, domain, config)
+    yield from _async_setup_components(hass, components, config)
+
+    _log_setup_timings(hass)
 
     return hass
 
@@ -472,7 +706,7 @@ def async_from_config_file(config_path: str,
 
     try:
         config_dict = yield from hass.loop.run_in_executor(
-            None, conf_util.load_yaml_config_file, config_path)
+            None, conf_util.load_hass_config_file, config_path, config_dir)
     except HomeAssistantError:
         return None
     finally:
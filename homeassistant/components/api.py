@@ -5,6 +5,7 @@ For more details about the RESTful API, please refer to the documentation at
 https://home-assistant.io/developers/api/
 """
 import asyncio
+from collections import OrderedDict
 import json
 import logging
 
@@ -13,15 +14,16 @@ import async_timeout
 
 import homeassistant.core as ha
 import homeassistant.remote as rem
-from homeassistant.bootstrap import ERROR_LOG_FILENAME
+from homeassistant.bootstrap import ERROR_LOG_FILENAME, setup_profile
 from homeassistant.const import (
-    EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED,
+    EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED,
     HTTP_BAD_REQUEST, HTTP_CREATED, HTTP_NOT_FOUND,
     HTTP_UNPROCESSABLE_ENTITY, MATCH_ALL, URL_API, URL_API_COMPONENTS,
     URL_API_CONFIG, URL_API_DISCOVERY_INFO, URL_API_ERROR_LOG,
-    URL_API_EVENT_FORWARD, URL_API_EVENTS, URL_API_SERVICES,
-    URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE,
-    __version__)
+    URL_API_EVENT_FORWARD, URL_API_EVENTS, URL_API_EVENTS_BATCH,
+    URL_API_EXECUTORS, URL_API_SERVICES,
+    URL_API_STARTUP_PROFILE, URL_API_STATES, URL_API_STATES_ENTITY,
+    URL_API_STREAM, URL_API_TEMPLATE, __version__)
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.state import AsyncTrackStates
 from homeassistant.helpers import template
@@ -30,8 +32,14 @@ from homeassistant.components.http import HomeAssistantView
 DOMAIN = 'api'
 DEPENDENCIES = ['http']
 
+DATA_STREAM_HUB = 'api_stream_hub'
+
 STREAM_PING_PAYLOAD = "ping"
+STREAM_PING_MESSAGE = "data: {}\n\n".format(
+    STREAM_PING_PAYLOAD).encode('UTF-8')
 STREAM_PING_INTERVAL = 50  # seconds
+# Maximum number of messages queued for a slow stream client
+STREAM_QUEUE_SIZE = 200
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -46,10 +54,13 @@ def setup(hass, config):
     hass.http.register_view(APIEntityStateView)
     hass.http.register_view(APIEventListenersView)
     hass.http.register_view(APIEventView)
+    hass.http.register_view(APIEventsBatchView)
     hass.http.register_view(APIServicesView)
     hass.http.register_view(APIDomainServicesView)
     hass.http.register_view(APIEventForwardingView)
     hass.http.register_view(APIComponentsView)
+    hass.http.register_view(APIStartupProfileView)
+    hass.http.register_view(APIExecutorsView)
     hass.http.register_view(APIErrorLogView)
     hass.http.register_view(APITemplateView)
 
@@ -77,63 +88,193 @@ class APIEventStream(HomeAssistantView):
     @asyncio.coroutine
     def get(self, request):
         """Provide a streaming interface for the event bus."""
-        stop_obj = object()
-        to_write = asyncio.Queue(loop=self.hass.loop)
+        hub = self.hass.data.get(DATA_STREAM_HUB)
+
+        if hub is None:
+            hub = self.hass.data[DATA_STREAM_HUB] = StreamHub(self.hass)
 
         restrict = request.GET.get('restrict')
         if restrict:
-            restrict = restrict.split(',') + [EVENT_HOMEASSISTANT_STOP]
-
-        @asyncio.coroutine
-        def forward_events(event):
-            """Forward events to the open request."""
-            if event.event_type == EVENT_TIME_CHANGED:
-                return
-
-            if restrict and event.event_type not in restrict:
-                return
-
-            _LOGGER.debug('STREAM %s FORWARDING %s', id(stop_obj), event)
-
-            if event.event_type == EVENT_HOMEASSISTANT_STOP:
-                data = stop_obj
-            else:
-                data = json.dumps(event, cls=rem.JSONEncoder)
-
-            yield from to_write.put(data)
+            restrict = restrict.split(',')
 
         response = web.StreamResponse()
         response.content_type = 'text/event-stream'
         yield from response.prepare(request)
 
-        unsub_stream = self.hass.bus.async_listen(MATCH_ALL, forward_events)
+        client = hub.async_add(restrict)
 
         try:
-            _LOGGER.debug('STREAM %s ATTACHED', id(stop_obj))
+            _LOGGER.debug('STREAM %s ATTACHED', id(client))
 
             # Fire off one message so browsers fire open event right away
-            yield from to_write.put(STREAM_PING_PAYLOAD)
+            payloads = [STREAM_PING_MESSAGE]
 
             while True:
+                for payload in payloads:
+                    _LOGGER.debug('STREAM %s WRITING %s', id(client),
+                                  payload.strip())
+                    response.write(payload)
+                yield from response.drain()
+
                 try:
                     with async_timeout.timeout(STREAM_PING_INTERVAL,
                                                loop=self.hass.loop):
-                        payload = yield from to_write.get()
-
-                    if payload is stop_obj:
-                        break
-
-                    msg = "data: {}\n\n".format(payload)
-                    _LOGGER.debug('STREAM %s WRITING %s', id(stop_obj),
-                                  msg.strip())
-                    response.write(msg.encode("UTF-8"))
-                    yield from response.drain()
+                        payloads = yield from client.get()
                 except asyncio.TimeoutError:
-                    yield from to_write.put(STREAM_PING_PAYLOAD)
+                    payloads = [STREAM_PING_MESSAGE]
+
+                if payloads is None:
+                    break
 
         finally:
-            _LOGGER.debug('STREAM %s RESPONSE CLOSED', id(stop_obj))
-            unsub_stream()
+            _LOGGER.debug('STREAM %s RESPONSE CLOSED, %s messages dropped',
+                          id(client), client.dropped)
+            hub.async_remove(client)
+
+
+class StreamClient(object):
+    """Bounded queue of encoded stream messages for one connection."""
+
+    def __init__(self, loop, restrict, max_size):
+        """Initialize the stream client."""
+        self.restrict = restrict
+        self.dropped = 0
+        self.closed = False
+        self._max_size = max_size
+        # Payloads by coalesce key, in the order they are sent
+        self._queue = OrderedDict()
+        self._ready = asyncio.Event(loop=loop)
+
+    @ha.callback
+    def put(self, payload, key=None):
+        """Queue an encoded message.
+
+        A message with the same key as a message that is still queued
+        replaces it at the end of the queue, so messages keep their order.
+        When the queue is full the oldest message is dropped.
+        """
+        if key is None:
+            key = object()
+        else:
+            self._queue.pop(key, None)
+
+        if len(self._queue) >= self._max_size:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+
+        self._queue[key] = payload
+        self._ready.set()
+
+    @ha.callback
+    def close(self):
+        """Mark the stream as closed."""
+        self.closed = True
+        self._ready.set()
+
+    @asyncio.coroutine
+    def get(self):
+        """Wait for queued messages and return all of them.
+
+        Returns None when the stream is closed.
+        """
+        yield from self._ready.wait()
+        self._ready.clear()
+
+        if self.closed:
+            return None
+
+        payloads = list(self._queue.values())
+        self._queue.clear()
+        return payloads
+
+
+class StreamHub(object):
+    """Encode each event once and fan it out to the stream clients."""
+
+    def __init__(self, hass):
+        """Initialize the stream hub."""
+        self.hass = hass
+        self._clients = set()
+        self._restricted = {}
+        self._unsub_events = None
+
+    @ha.callback
+    def async_add(self, restrict=None):
+        """Add a client, restricted to event types if restrict is given."""
+        if restrict:
+            restrict = set(restrict)
+
+        client = StreamClient(self.hass.loop, restrict, STREAM_QUEUE_SIZE)
+
+        if restrict:
+            for event_type in restrict:
+                self._restricted.setdefault(event_type, set()).add(client)
+        else:
+            self._clients.add(client)
+
+        if self._unsub_events is None:
+            self._unsub_events = self.hass.bus.async_listen(
+                MATCH_ALL, self._async_event_listener)
+
+        return client
+
+    @ha.callback
+    def async_remove(self, client):
+        """Remove a client."""
+        if client.restrict:
+            for event_type in client.restrict:
+                clients = self._restricted.get(event_type)
+
+                if clients is None:
+                    continue
+
+                clients.discard(client)
+
+                if not clients:
+                    del self._restricted[event_type]
+        else:
+            self._clients.discard(client)
+
+        if not self._clients and not self._restricted and \
+           self._unsub_events is not None:
+            self._unsub_events()
+            self._unsub_events = None
+
+    @ha.callback
+    def _async_event_listener(self, event):
+        """Encode an event and queue it for the interested clients."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return
+
+        if event.event_type == EVENT_HOMEASSISTANT_STOP:
+            for client in self._clients:
+                client.close()
+            for clients in self._restricted.values():
+                for client in clients:
+                    client.close()
+            return
+
+        restricted = self._restricted.get(event.event_type)
+
+        if not self._clients and not restricted:
+            return
+
+        _LOGGER.debug('STREAM FORWARDING %s', event)
+
+        payload = 'data: {}\n\n'.format(
+            ha.json_dumps(event)).encode('UTF-8')
+
+        if event.event_type == EVENT_STATE_CHANGED:
+            key = event.data.get('entity_id')
+        else:
+            key = None
+
+        for client in self._clients:
+            client.put(payload, key)
+
+        if restricted:
+            for client in restricted:
+                client.put(payload, key)
 
 
 class APIConfigView(HomeAssistantView):
@@ -262,18 +403,36 @@ class APIEventView(HomeAssistantView):
             return self.json_message('Event data should be a JSON object',
                                      HTTP_BAD_REQUEST)
 
-        # Special case handling for event STATE_CHANGED
-        # We will try to convert state dicts back to State objects
-        if event_type == ha.EVENT_STATE_CHANGED and event_data:
-            for key in ('old_state', 'new_state'):
-                state = ha.State.from_dict(event_data.get(key))
+        async_fire_remote_event(self.hass, event_type, event_data)
 
-                if state:
-                    event_data[key] = state
+        return self.json_message("Event {} fired.".format(event_type))
 
-        self.hass.bus.async_fire(event_type, event_data, ha.EventOrigin.remote)
 
-        return self.json_message("Event {} fired.".format(event_type))
+class APIEventsBatchView(HomeAssistantView):
+    """View to fire a list of events in one request."""
+
+    url = URL_API_EVENTS_BATCH
+    name = "api:events-batch"
+
+    @asyncio.coroutine
+    def post(self, request):
+        """Fire events in the order they were received."""
+        body = yield from request.text()
+        events = json.loads(body) if body else None
+
+        if not isinstance(events, list) or not all(
+                isinstance(event, dict) and 'event_type' in event and
+                isinstance(event.get('event_data') or {}, dict)
+                for event in events):
+            return self.json_message(
+                'Events should be a list of JSON objects with an event_type',
+                HTTP_BAD_REQUEST)
+
+        for event in events:
+            async_fire_remote_event(
+                self.hass, event['event_type'], event.get('event_data'))
+
+        return self.json_message("{} events fired.".format(len(events)))
 
 
 class APIServicesView(HomeAssistantView):
@@ -392,6 +551,31 @@ class APIComponentsView(HomeAssistantView):
         return self.json(self.hass.config.components)
 
 
+class APIStartupProfileView(HomeAssistantView):
+    """View to handle startup profile requests."""
+
+    url = URL_API_STARTUP_PROFILE
+    name = "api:startup-profile"
+
+    @ha.callback
+    def get(self, request):
+        """Get the import, requirements and setup time of components."""
+        return self.json(setup_profile(self.hass))
+
+
+class APIExecutorsView(HomeAssistantView):
+    """View to handle executor pool metrics requests."""
+
+    url = URL_API_EXECUTORS
+    name = "api:executors"
+
+    @ha.callback
+    def get(self, request):
+        """Get the size and load of the executor pools."""
+        return self.json({name: executor.metrics() for name, executor
+                          in self.hass.executors.items()})
+
+
 class APIErrorLogView(HomeAssistantView):
     """View to handle ErrorLog requests."""
 
@@ -424,6 +608,21 @@ class APITemplateView(HomeAssistantView):
                                      HTTP_BAD_REQUEST)
 
 
+@ha.callback
+def async_fire_remote_event(hass, event_type, event_data):
+    """Fire an event received from a remote instance."""
+    # Special case handling for event STATE_CHANGED
+    # We will try to convert state dicts back to State objects
+    if event_type == ha.EVENT_STATE_CHANGED and event_data:
+        for key in ('old_state', 'new_state'):
+            state = ha.State.from_dict(event_data.get(key))
+
+            if state:
+                event_data[key] = state
+
+    hass.bus.async_fire(event_type, event_data, ha.EventOrigin.remote)
+
+
 def async_services_json(hass):
     """Generate services data to JSONify."""
     return [{"domain": key, "services": value}
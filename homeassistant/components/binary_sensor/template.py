@@ -18,7 +18,8 @@ from homeassistant.const import (
     CONF_SENSOR_CLASS, CONF_SENSORS)
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity import async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change, async_track_template_states)
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,8 +43,7 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
 
     for device, device_config in config[CONF_SENSORS].items():
         value_template = device_config[CONF_VALUE_TEMPLATE]
-        entity_ids = (device_config.get(ATTR_ENTITY_ID) or
-                      value_template.extract_entities())
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
         friendly_name = device_config.get(ATTR_FRIENDLY_NAME, device)
         sensor_class = device_config.get(CONF_SENSOR_CLASS)
 
@@ -86,8 +86,12 @@ class BinarySensorTemplate(BinarySensorDevice):
             """Called when the target device changes state."""
             hass.async_add_job(self.async_update_ha_state, True)
 
-        async_track_state_change(
-            hass, entity_ids, template_bsensor_state_listener)
+        if entity_ids:
+            async_track_state_change(
+                hass, entity_ids, template_bsensor_state_listener)
+        else:
+            async_track_template_states(
+                hass, self._template, template_bsensor_state_listener)
 
     @property
     def name(self):
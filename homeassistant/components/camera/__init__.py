@@ -10,6 +10,7 @@ import logging
 
 from aiohttp import web
 
+from homeassistant.core import POOL_IO
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers.config_validation import PLATFORM_SCHEMA  # noqa
@@ -88,7 +89,7 @@ class Camera(Entity):
         This method must be run in the event loop.
         """
         image = yield from self.hass.loop.run_in_executor(
-            None, self.camera_image)
+            self.hass.executors[POOL_IO], self.camera_image)
         return image
 
     @asyncio.coroutine
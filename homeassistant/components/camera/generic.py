@@ -16,6 +16,7 @@ import voluptuous as vol
 from homeassistant.const import (
     CONF_NAME, CONF_USERNAME, CONF_PASSWORD, CONF_AUTHENTICATION,
     HTTP_BASIC_AUTHENTICATION, HTTP_DIGEST_AUTHENTICATION)
+from homeassistant.core import POOL_IO
 from homeassistant.exceptions import TemplateError
 from homeassistant.components.camera import (PLATFORM_SCHEMA, Camera)
 from homeassistant.helpers import config_validation as cv
@@ -104,7 +105,7 @@ class GenericCamera(Camera):
                     return self._last_image
 
             self._last_image = yield from self.hass.loop.run_in_executor(
-                None, fetch)
+                self.hass.executors[POOL_IO], fetch)
         # async
         else:
             try:
@@ -10,10 +10,9 @@ from datetime import timedelta
 import voluptuous as vol
 
 from homeassistant.const import (
-    CONF_NAME, CONF_WHITELIST, EVENT_STATE_CHANGED, STATE_UNKNOWN)
+    CONF_NAME, CONF_WHITELIST, STATE_UNKNOWN)
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers import state as state_helper
-from homeassistant.util import Throttle
+from homeassistant.helpers import exporter, state as state_helper
 
 REQUIREMENTS = ['dweepy==0.2.0']
 
@@ -36,35 +35,50 @@ def setup(hass, config):
     """Setup the Dweet.io component."""
     conf = config[DOMAIN]
     name = conf.get(CONF_NAME)
-    whitelist = conf.get(CONF_WHITELIST)
-    json_body = {}
-
-    def dweet_event_listener(event):
-        """Listen for new messages on the bus and sends them to Dweet.io."""
-        state = event.data.get('new_state')
-        if state is None or state.state in (STATE_UNKNOWN, '') \
-                or state.entity_id not in whitelist:
-            return
+    whitelist = frozenset(conf.get(CONF_WHITELIST))
 
-        try:
-            _state = state_helper.state_as_number(state)
-        except ValueError:
-            _state = state.state
+    DweetExporter(hass, name, whitelist.__contains__).register()
+
+    return True
 
-        json_body[state.attributes.get('friendly_name')] = _state
 
-        send_data(name, json_body)
+class DweetExporter(exporter.Exporter):
+    """Send the latest states of the whitelisted entities to Dweet.io."""
 
-    hass.bus.listen(EVENT_STATE_CHANGED, dweet_event_listener)
+    # Dweet.io is rate limited, send at most one dweet per interval
+    batch_size = exporter.Exporter.queue_size
+    flush_interval = MIN_TIME_BETWEEN_UPDATES.total_seconds()
 
-    return True
+    def __init__(self, hass, name, entity_filter):
+        """Initialize the exporter."""
+        super().__init__(hass, DOMAIN, entity_filter)
+        self.dweet_name = name
+        self.json_body = {}
+
+    def export(self, events):
+        """Send the collected data to Dweet.io."""
+        import dweepy
 
+        updated = False
 
-@Throttle(MIN_TIME_BETWEEN_UPDATES)
-def send_data(name, msg):
-    """Send the collected data to Dweet.io."""
-    import dweepy
-    try:
-        dweepy.dweet_for(name, msg)
-    except dweepy.DweepyError:
-        _LOGGER.error("Error saving data '%s' to Dweet.io", msg)
+        for event in events:
+            state = event.data['new_state']
+            if state.state in (STATE_UNKNOWN, ''):
+                continue
+
+            try:
+                _state = state_helper.state_as_number(state)
+            except ValueError:
+                _state = state.state
+
+            self.json_body[state.attributes.get('friendly_name')] = _state
+            updated = True
+
+        if not updated:
+            return
+
+        try:
+            dweepy.dweet_for(self.dweet_name, self.json_body)
+        except dweepy.DweepyError:
+            _LOGGER.error("Error saving data '%s' to Dweet.io",
+                          self.json_body)
@@ -8,15 +8,27 @@ import asyncio
 from collections import defaultdict
 from datetime import timedelta
 from itertools import groupby
+import json
+import logging
+import math
+import threading
+
+from aiohttp import web
 import voluptuous as vol
 
-from homeassistant.const import HTTP_BAD_REQUEST
+from homeassistant.const import (
+    CONTENT_TYPE_JSON, HTTP_BAD_REQUEST, HTTP_INTERNAL_SERVER_ERROR)
+from homeassistant.core import POOL_DB
 import homeassistant.helpers.config_validation as cv
+import homeassistant.remote as rem
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
 from homeassistant.components.frontend import register_built_in_panel
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import ATTR_HIDDEN
+from homeassistant.util.async import run_coroutine_threadsafe
+
+_LOGGER = logging.getLogger(__name__)
 
 DOMAIN = 'history'
 DEPENDENCIES = ['recorder', 'http']
@@ -44,6 +56,11 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+# Rows fetched from the database at a time while streaming
+STREAM_YIELD_PER = 1000
+# Serialized entities that can wait to be written to a streaming response
+STREAM_QUEUE_SIZE = 4
+
 
 def last_5_states(entity_id):
     """Return the last 5 states for entity_id."""
@@ -51,7 +68,7 @@ def last_5_states(entity_id):
 
     states = recorder.get_model('States')
     return recorder.execute(
-        recorder.query('States').filter(
+        recorder.read_query('States').filter(
             (states.entity_id == entity_id) &
             (states.last_changed == states.last_updated)
         ).order_by(states.state_id.desc()).limit(5))
@@ -66,9 +83,110 @@ def get_significant_states(start_time, end_time=None, entity_id=None,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
     """
+    query = _significant_states_query(start_time, end_time, entity_id,
+                                      filters)
+
+    states = (
+        state for state in recorder.execute(query)
+        if (_is_significant(state) and
+            not state.attributes.get(ATTR_HIDDEN, False)))
+
+    return states_to_json(states, start_time, entity_id, filters)
+
+
+def stream_significant_states(start_time, end_time=None, entity_id=None,
+                              filters=None):
+    """Yield the significant states during a period one entity at a time.
+
+    Returns the same states as get_significant_states but reads them from
+    the database while they are consumed instead of loading all of them.
+    """
+    entity_ids = [entity_id] if entity_id is not None else None
+    initial = {}
+
+    for state in get_states(start_time, entity_ids, filters=filters):
+        state.last_changed = start_time
+        state.last_updated = start_time
+        initial[state.entity_id] = state
+
+    query = _significant_states_query(start_time, end_time, entity_id,
+                                      filters)
+
+    try:
+        states = (
+            state for state in (
+                row.to_native() for row
+                in query.yield_per(STREAM_YIELD_PER))
+            if (state is not None and _is_significant(state) and
+                not state.attributes.get(ATTR_HIDDEN, False)))
+
+        for entity_id, group in groupby(states,
+                                        lambda state: state.entity_id):
+            initial_state = initial.pop(entity_id, None)
+            result = [] if initial_state is None else [initial_state]
+            result.extend(group)
+            yield result
+    finally:
+        query.session.close()
+
+    for state in initial.values():
+        yield [state]
+
+
+def downsample_states(states, start_time, end_time, max_points):
+    """Reduce the numeric states of an entity to min/max/mean buckets.
+
+    The period is split into max_points buckets. Numeric states in the same
+    bucket are merged into one point with the mean as state and the min and
+    max of the bucket. Of the other states, including values like nan that
+    are not finite, only the first of each value in a bucket is kept.
+    """
+    width = (end_time - start_time) / max_points
+    index = None
+    bucket = None
+    others = {}
+
+    for state in states:
+        state_index = int((state.last_updated - start_time) / width)
+
+        if state_index != index:
+            yield from _bucket_points(bucket, others)
+            index = state_index
+            bucket = None
+            others = {}
+
+        try:
+            value = float(state.state)
+        except ValueError:
+            value = None
+
+        if value is None or not math.isfinite(value):
+            others.setdefault(state.state, state)
+            continue
+
+        if bucket is None:
+            bucket = _Bucket(state)
+
+        bucket.add(value)
+
+    yield from _bucket_points(bucket, others)
+
+
+def _bucket_points(bucket, others):
+    """Yield the points of a bucket in the order they were recorded."""
+    points = list(others.values())
+    if bucket is not None:
+        points.append(bucket)
+
+    for point in sorted(points, key=lambda point: point.last_updated):
+        yield point.as_dict() if point is bucket else point
+
+
+def _significant_states_query(start_time, end_time, entity_id, filters):
+    """Return the query for significant states during a period."""
     entity_ids = (entity_id.lower(), ) if entity_id is not None else None
     states = recorder.get_model('States')
-    query = recorder.query('States').filter(
+    query = recorder.read_query('States').filter(
         (states.domain.in_(SIGNIFICANT_DOMAINS) |
          (states.last_changed == states.last_updated)) &
         (states.last_updated > start_time))
@@ -78,19 +196,89 @@ def get_significant_states(start_time, end_time=None, entity_id=None,
     if end_time is not None:
         query = query.filter(states.last_updated < end_time)
 
-    states = (
-        state for state in recorder.execute(
-            query.order_by(states.entity_id, states.last_updated))
-        if (_is_significant(state) and
-            not state.attributes.get(ATTR_HIDDEN, False)))
+    return query.order_by(states.entity_id, states.last_updated)
 
-    return states_to_json(states, start_time, entity_id, filters)
+
+class _Bucket(object):
+    """Numeric states of an entity that fall in the same period."""
+
+    __slots__ = ['state', 'count', 'total', 'min', 'max']
+
+    def __init__(self, state):
+        """Initialize the bucket with its first state."""
+        self.state = state
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @property
+    def last_updated(self):
+        """Return when the first state of the bucket was recorded."""
+        return self.state.last_updated
+
+    def add(self, value):
+        """Add a value to the bucket."""
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def as_dict(self):
+        """Return the bucket as a state dict with min and max."""
+        result = self.state.as_dict()
+        result['state'] = str(self.total / self.count)
+        result['min'] = self.min
+        result['max'] = self.max
+        return result
+
+
+def compact_states(states):
+    """Encode the history of a single entity in a columnar form.
+
+    Timestamps are epoch seconds and attributes are only included for the
+    states where they differ from the previous state. Accepts both states
+    and the state dicts returned by downsample_states.
+    """
+    result = None
+    attributes = None
+
+    for state in states:
+        if not isinstance(state, dict):
+            state = state.as_dict()
+
+        if result is None:
+            attributes = state['attributes']
+            result = {
+                'entity_id': state['entity_id'],
+                'attributes': attributes,
+                'attribute_changes': {},
+                'last_changed': [],
+                'last_updated': [],
+                'states': [],
+            }
+        elif state['attributes'] != attributes:
+            attributes = state['attributes']
+            result['attribute_changes'][len(result['states'])] = attributes
+
+        result['last_changed'].append(
+            dt_util.as_timestamp(state['last_changed']))
+        result['last_updated'].append(
+            dt_util.as_timestamp(state['last_updated']))
+        result['states'].append(state['state'])
+
+        if 'min' in state:
+            index = len(result['states']) - 1
+            for key in ('min', 'max'):
+                result.setdefault(key, {})[index] = state[key]
+
+    return result
 
 
 def state_changes_during_period(start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     states = recorder.get_model('States')
-    query = recorder.query('States').filter(
+    query = recorder.read_query('States').filter(
         (states.last_changed == states.last_updated) &
         (states.last_changed > start_time))
 
@@ -118,7 +306,7 @@ def get_states(utc_point_in_time, entity_ids=None, run=None, filters=None):
     from sqlalchemy import and_, func
 
     states = recorder.get_model('States')
-    most_recent_state_ids = recorder.query(
+    most_recent_state_ids = recorder.read_query(
         func.max(states.state_id).label('max_state_id')
     ).filter(
         (states.created >= run.start) &
@@ -131,7 +319,7 @@ def get_states(utc_point_in_time, entity_ids=None, run=None, filters=None):
     most_recent_state_ids = most_recent_state_ids.group_by(
         states.entity_id).subquery()
 
-    query = recorder.query('States').join(most_recent_state_ids, and_(
+    query = recorder.read_query('States').join(most_recent_state_ids, and_(
         states.state_id == most_recent_state_ids.c.max_state_id))
 
     for state in recorder.execute(query):
@@ -205,7 +393,7 @@ class Last5StatesView(HomeAssistantView):
     def get(self, request, entity_id):
         """Retrieve last 5 states of entity."""
         result = yield from self.hass.loop.run_in_executor(
-            None, last_5_states, entity_id)
+            self.hass.executors[POOL_DB], last_5_states, entity_id)
         return self.json(result)
 
 
@@ -240,11 +428,129 @@ class HistoryPeriodView(HomeAssistantView):
         end_time = start_time + one_day
         entity_id = request.GET.get('filter_entity_id')
 
+        max_points = request.GET.get('max_points')
+        if max_points is not None:
+            try:
+                max_points = int(max_points)
+            except ValueError:
+                max_points = 0
+
+            if max_points < 1:
+                return self.json_message('Invalid max_points',
+                                         HTTP_BAD_REQUEST)
+
+        compact = request.GET.get('format') == 'compact'
+
+        if 'stream' in request.GET:
+            response = yield from self._stream(
+                request, start_time, end_time, entity_id, max_points, compact)
+            return response
+
+        def get_results():
+            """Query the history and downsample it if requested."""
+            result = get_significant_states(
+                start_time, end_time, entity_id, self.filters).values()
+
+            if max_points is not None:
+                result = [list(downsample_states(states, start_time, end_time,
+                                                 max_points))
+                          for states in result]
+
+            if compact:
+                result = [compact_states(states) for states in result]
+
+            return result
+
         result = yield from self.hass.loop.run_in_executor(
-            None, get_significant_states, start_time, end_time, entity_id,
-            self.filters)
+            self.hass.executors[POOL_DB], get_results)
+
+        return self.json(result)
 
-        return self.json(result.values())
+    @asyncio.coroutine
+    def _stream(self, request, start_time, end_time, entity_id, max_points,
+                compact):
+        """Write the history to the response while it is read.
+
+        The history is serialized per entity in the executor and handed to
+        the event loop through a bounded queue.
+        """
+        to_write = asyncio.Queue(STREAM_QUEUE_SIZE, loop=self.hass.loop)
+        stop = threading.Event()
+
+        def put(chunk):
+            """Wait until the chunk is queued."""
+            run_coroutine_threadsafe(
+                to_write.put(chunk), self.hass.loop).result()
+
+        def produce():
+            """Serialize the history of each entity into the queue."""
+            delimiter = b'['
+            try:
+                for states in stream_significant_states(
+                        start_time, end_time, entity_id, self.filters):
+                    if stop.is_set():
+                        return
+
+                    if max_points is not None:
+                        states = downsample_states(
+                            states, start_time, end_time, max_points)
+
+                    if compact:
+                        states = compact_states(states)
+                    else:
+                        states = list(states)
+
+                    put(delimiter + json.dumps(
+                        states, sort_keys=True,
+                        cls=rem.JSONEncoder).encode('UTF-8'))
+                    delimiter = b','
+
+                put(b'[]' if delimiter == b'[' else b']')
+            finally:
+                put(None)
+
+        producer = self.hass.loop.run_in_executor(
+            self.hass.executors[POOL_DB], produce)
+        chunk = yield from to_write.get()
+
+        if chunk is None:
+            # Nothing has been sent yet, so the error can still be reported.
+            try:
+                yield from producer
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error reading the history')
+            return self.json_message('Error reading the history',
+                                     HTTP_INTERNAL_SERVER_ERROR)
+
+        response = web.StreamResponse()
+        response.content_type = CONTENT_TYPE_JSON
+        failed = False
+
+        try:
+            yield from response.prepare(request)
+
+            while chunk is not None:
+                response.write(chunk)
+                yield from response.drain()
+                chunk = yield from to_write.get()
+        finally:
+            # Let the producer finish if the client went away.
+            stop.set()
+            while chunk is not None:
+                chunk = yield from to_write.get()
+
+            try:
+                yield from producer
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error streaming the history')
+                failed = True
+
+        if failed:
+            # Drop the connection without ending the body so the client
+            # does not mistake the truncated history for a complete one.
+            request.transport.close()
+
+        return response
 
 
 class Filters(object):
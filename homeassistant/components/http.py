@@ -6,7 +6,6 @@ https://home-assistant.io/components/http/
 """
 import asyncio
 import hmac
-import json
 import logging
 import mimetypes
 import os
@@ -22,7 +21,7 @@ from aiohttp.web_exceptions import (
     HTTPUnauthorized, HTTPMovedPermanently, HTTPNotModified)
 from aiohttp.web_urldispatcher import StaticRoute
 
-from homeassistant.core import is_callback
+from homeassistant.core import is_callback, json_dumps
 import homeassistant.remote as rem
 from homeassistant import util
 from homeassistant.const import (
@@ -363,6 +362,14 @@ class HomeAssistantWSGI(object):
         self.server.close()
         yield from self.server.wait_closed()
         yield from self.app.shutdown()
+
+        # Idle keep-alive connections, like the ones pooled by remote.API,
+        # would otherwise hold up the shutdown until the timeout.
+        # pylint: disable=protected-access
+        for conn in self._handler.connections:
+            if not conn._reading_request:
+                yield from conn.shutdown(None)
+
         yield from self._handler.finish_connections(60.0)
         yield from self.app.cleanup()
 
@@ -404,8 +411,7 @@ class HomeAssistantView(object):
     # pylint: disable=no-self-use
     def json(self, result, status_code=200):
         """Return a JSON response."""
-        msg = json.dumps(
-            result, sort_keys=True, cls=rem.JSONEncoder).encode('UTF-8')
+        msg = json_dumps(result).encode('UTF-8')
         return web.Response(
             body=msg, content_type=CONTENT_TYPE_JSON, status=status_code)
 
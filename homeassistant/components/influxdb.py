@@ -9,10 +9,10 @@ import logging
 import voluptuous as vol
 
 from homeassistant.const import (
-    EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN, CONF_HOST,
-    CONF_PORT, CONF_SSL, CONF_VERIFY_SSL, CONF_USERNAME, CONF_BLACKLIST,
-    CONF_PASSWORD, CONF_WHITELIST)
-from homeassistant.helpers import state as state_helper
+    STATE_UNAVAILABLE, STATE_UNKNOWN, CONF_HOST, CONF_PORT, CONF_SSL,
+    CONF_VERIFY_SSL, CONF_USERNAME, CONF_BLACKLIST, CONF_PASSWORD,
+    CONF_WHITELIST)
+from homeassistant.helpers import exporter, state as state_helper
 import homeassistant.helpers.config_validation as cv
 
 REQUIREMENTS = ['influxdb==3.0.0']
@@ -78,28 +78,46 @@ def setup(hass, config):
                       "the database exists and is READ/WRITE.", exc)
         return False
 
-    def influx_event_listener(event):
-        """Listen for new messages on the bus and sends them to Influx."""
-        state = event.data.get('new_state')
-        if state is None or state.state in (
-                STATE_UNKNOWN, '', STATE_UNAVAILABLE) or \
-                state.entity_id in blacklist:
-            return
+    entity_filter = exporter.generate_filter(
+        include_entities=whitelist, exclude_entities=blacklist)
 
-        try:
-            if len(whitelist) > 0 and state.entity_id not in whitelist:
-                return
+    InfluxThread(hass, influx, exceptions, entity_filter, tags).register()
+
+    return True
+
+
+class InfluxThread(exporter.Exporter):
+    """Write state changes to InfluxDB in batches."""
+
+    batch_size = 500
+
+    def __init__(self, hass, influx, exceptions, entity_filter, tags):
+        """Initialize the worker."""
+        super().__init__(hass, DOMAIN, entity_filter)
+        self.influx = influx
+        self.tags = tags
+        self.exceptions = exceptions
+        self.retry_exceptions = (exceptions.InfluxDBServerError, IOError)
 
-            _state = state_helper.state_as_number(state)
-        except ValueError:
-            _state = state.state
+    def export(self, events):
+        """Write the points of the events."""
+        points = []
 
-        measurement = state.attributes.get('unit_of_measurement')
-        if measurement in (None, ''):
-            measurement = state.entity_id
+        for event in events:
+            state = event.data['new_state']
+            if state.state in (STATE_UNKNOWN, '', STATE_UNAVAILABLE):
+                continue
 
-        json_body = [
-            {
+            try:
+                _state = state_helper.state_as_number(state)
+            except ValueError:
+                _state = state.state
+
+            measurement = state.attributes.get('unit_of_measurement')
+            if measurement in (None, ''):
+                measurement = state.entity_id
+
+            point = {
                 'measurement': measurement,
                 'tags': {
                     'domain': state.domain,
@@ -110,19 +128,35 @@ def setup(hass, config):
                     'value': _state,
                 }
             }
-        ]
 
-        for key, value in state.attributes.items():
-            if key != 'unit_of_measurement':
-                json_body[0]['fields'][key] = value
+            for key, value in state.attributes.items():
+                if key != 'unit_of_measurement':
+                    point['fields'][key] = value
 
-        json_body[0]['tags'].update(tags)
+            point['tags'].update(self.tags)
+            points.append(point)
+
+        if not points:
+            return
 
         try:
-            influx.write_points(json_body)
-        except exceptions.InfluxDBClientError:
-            _LOGGER.exception('Error saving event "%s" to InfluxDB', json_body)
+            self.influx.write_points(points)
+        except self.exceptions.InfluxDBClientError:
+            if len(points) == 1:
+                raise
+        else:
+            return
 
-    hass.bus.listen(EVENT_STATE_CHANGED, influx_event_listener)
+        # One rejected point fails the whole write, write the points one
+        # by one so only the rejected ones are lost
+        rejected = 0
 
-    return True
+        for point in points:
+            try:
+                self.influx.write_points([point])
+            except self.exceptions.InfluxDBClientError as err:
+                rejected += 1
+                _LOGGER.error('Error writing point of %s: %s',
+                              point['measurement'], err)
+
+        return rejected
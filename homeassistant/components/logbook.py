@@ -21,7 +21,8 @@ from homeassistant.const import (EVENT_HOMEASSISTANT_START,
                                  EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED,
                                  STATE_NOT_HOME, STATE_OFF, STATE_ON,
                                  ATTR_HIDDEN, HTTP_BAD_REQUEST)
-from homeassistant.core import State, split_entity_id, DOMAIN as HA_DOMAIN
+from homeassistant.core import (
+    POOL_DB, State, split_entity_id, DOMAIN as HA_DOMAIN)
 from homeassistant.util.async import run_callback_threadsafe
 
 DOMAIN = "logbook"
@@ -140,13 +141,14 @@ class LogbookView(HomeAssistantView):
         def get_results():
             """Query DB for results."""
             events = recorder.get_model('Events')
-            query = recorder.query('Events').filter(
+            query = recorder.read_query('Events').filter(
                 (events.time_fired > start_day) &
                 (events.time_fired < end_day))
             events = recorder.execute(query)
             return _exclude_events(events, self.config)
 
-        events = yield from self.hass.loop.run_in_executor(None, get_results)
+        events = yield from self.hass.loop.run_in_executor(
+            self.hass.executors[POOL_DB], get_results)
 
         return self.json(humanify(events))
 
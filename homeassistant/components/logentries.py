@@ -10,8 +10,8 @@ import requests
 
 import voluptuous as vol
 
-from homeassistant.const import (CONF_TOKEN, EVENT_STATE_CHANGED)
-from homeassistant.helpers import state as state_helper
+from homeassistant.const import CONF_TOKEN
+from homeassistant.helpers import exporter, state as state_helper
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,31 +33,39 @@ def setup(hass, config):
     token = conf.get(CONF_TOKEN)
     le_wh = '{}{}'.format(DEFAULT_HOST, token)
 
-    def logentries_event_listener(event):
-        """Listen for new messages on the bus and sends them to Logentries."""
-        state = event.data.get('new_state')
-        if state is None:
-            return
-        try:
-            _state = state_helper.state_as_number(state)
-        except ValueError:
-            _state = state.state
-        json_body = [
-            {
+    LogentriesExporter(hass, le_wh).register()
+
+    return True
+
+
+class LogentriesExporter(exporter.Exporter):
+    """Send state changes to a Logentries webhook."""
+
+    retry_exceptions = (requests.exceptions.RequestException,)
+
+    def __init__(self, hass, le_wh):
+        """Initialize the exporter."""
+        super().__init__(hass, DOMAIN)
+        self.le_wh = le_wh
+
+    def export(self, events):
+        """Send the events in one request."""
+        json_body = []
+
+        for event in events:
+            state = event.data['new_state']
+            try:
+                _state = state_helper.state_as_number(state)
+            except ValueError:
+                _state = state.state
+            json_body.append({
                 'domain': state.domain,
                 'entity_id': state.object_id,
                 'attributes': dict(state.attributes),
                 'time': str(event.time_fired),
                 'value': _state,
-            }
-        ]
-        try:
-            payload = {"host": le_wh,
-                       "event": json_body}
-            requests.post(le_wh, data=json.dumps(payload), timeout=10)
-        except requests.exceptions.RequestException as error:
-            _LOGGER.exception('Error sending to Logentries: %s', error)
+            })
 
-    hass.bus.listen(EVENT_STATE_CHANGED, logentries_event_listener)
-
-    return True
+        payload = {"host": self.le_wh,
+                   "event": json_body}
+        requests.post(self.le_wh, data=json.dumps(payload), timeout=10)
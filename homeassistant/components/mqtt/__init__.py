@@ -4,7 +4,6 @@ Support for MQTT message handling.
 For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/mqtt/
 """
-import asyncio
 import logging
 import os
 import socket
@@ -14,6 +13,7 @@ import voluptuous as vol
 
 from homeassistant.bootstrap import prepare_setup_platform
 from homeassistant.config import load_yaml_config_file
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import template, config_validation as cv
 from homeassistant.helpers.event import threaded_listener_factory
@@ -25,6 +25,7 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "mqtt"
 
 MQTT_CLIENT = None
+DATA_SUBSCRIPTIONS = 'mqtt_subscriptions'
 
 SERVICE_PUBLISH = 'publish'
 EVENT_MQTT_MESSAGE_RECEIVED = 'mqtt_message_received'
@@ -161,24 +162,9 @@ def publish_template(hass, topic, payload_template, qos=None, retain=None):
     hass.services.call(DOMAIN, SERVICE_PUBLISH, data)
 
 
-def async_subscribe(hass, topic, callback, qos=DEFAULT_QOS):
+def async_subscribe(hass, topic, msg_callback, qos=DEFAULT_QOS):
     """Subscribe to an MQTT topic."""
-    @asyncio.coroutine
-    def mqtt_topic_subscriber(event):
-        """Match subscribed MQTT topic."""
-        if not _match_topic(topic, event.data[ATTR_TOPIC]):
-            return
-
-        hass.async_run_job(callback, event.data[ATTR_TOPIC],
-                           event.data[ATTR_PAYLOAD], event.data[ATTR_QOS])
-
-    async_remove = hass.bus.async_listen(EVENT_MQTT_MESSAGE_RECEIVED,
-                                         mqtt_topic_subscriber)
-
-    # Future: track subscriber count and unsubscribe in remove
-    MQTT_CLIENT.subscribe(topic, qos)
-
-    return async_remove
+    return hass.data[DATA_SUBSCRIPTIONS].async_add(topic, msg_callback, qos)
 
 
 # pylint: disable=invalid-name
@@ -279,6 +265,9 @@ def setup(hass, config):
             return
         MQTT_CLIENT.publish(msg_topic, payload, qos, retain)
 
+    subscriptions = hass.data[DATA_SUBSCRIPTIONS] = Subscriptions(hass)
+    hass.bus.listen(EVENT_MQTT_MESSAGE_RECEIVED,
+                    subscriptions.async_message_received)
     hass.bus.listen_once(EVENT_HOMEASSISTANT_START, start_mqtt)
 
     descriptions = load_yaml_config_file(
@@ -360,6 +349,9 @@ class MQTT(object):
         """Unsubscribe from topic."""
         result, mid = self._mqttc.unsubscribe(topic)
         _raise_on_error(result)
+        # Forget the topic right away, so subscribing again before the
+        # broker acknowledges sends a new subscribe
+        self.topics.pop(topic, None)
         self.progress[mid] = topic
 
     def _mqtt_on_connect(self, _mqttc, _userdata, _flags, result_code):
@@ -413,11 +405,12 @@ class MQTT(object):
             })
 
     def _mqtt_on_unsubscribe(self, _mqttc, _userdata, mid, granted_qos):
-        """Unsubscribe successful callback."""
-        topic = self.progress.pop(mid, None)
-        if topic is None:
-            return
-        self.topics.pop(topic, None)
+        """Unsubscribe successful callback.
+
+        The topic was already forgotten by unsubscribe, if it is known
+        again it was subscribed again since and has to be kept.
+        """
+        self.progress.pop(mid, None)
 
     def _mqtt_on_disconnect(self, _mqttc, _userdata, result_code):
         """Disconnected callback."""
@@ -460,14 +453,118 @@ def _raise_on_error(result):
         raise HomeAssistantError('Error talking to MQTT: {}'.format(result))
 
 
-def _match_topic(subscription, topic):
-    """Test if topic matches subscription."""
-    if subscription.endswith('#'):
-        return (subscription[:-2] == topic or
-                topic.startswith(subscription[:-1]))
+class _TopicNode(object):
+    """A level of the subscribed topics."""
+
+    __slots__ = ['children', 'callbacks']
 
-    sub_parts = subscription.split('/')
-    topic_parts = topic.split('/')
+    def __init__(self):
+        """Initialize an empty topic level."""
+        self.children = {}
+        self.callbacks = []
 
-    return (len(sub_parts) == len(topic_parts) and
-            all(a == b for a, b in zip(sub_parts, topic_parts) if a != '+'))
+
+class Subscriptions(object):
+    """Dispatch received messages to the subscribed callbacks.
+
+    Subscriptions are stored in a trie with a level per topic part, so a
+    message is matched in time proportional to the depth of its topic.
+    Topics are subscribed on the broker while they have subscribers.
+    """
+
+    def __init__(self, hass):
+        """Initialize the subscriptions."""
+        self.hass = hass
+        self._root = _TopicNode()
+        self._counts = {}
+
+    @callback
+    def async_add(self, topic, msg_callback, qos):
+        """Add a subscription and return a function to remove it."""
+        count = self._counts.get(topic, 0)
+
+        # Subscribe first, so nothing is changed if the broker fails
+        if count == 0:
+            MQTT_CLIENT.subscribe(topic, qos)
+
+        node = self._root
+        for part in topic.split('/'):
+            node = node.children.setdefault(part, _TopicNode())
+        node.callbacks.append(msg_callback)
+
+        self._counts[topic] = count + 1
+
+        removed = False
+
+        @callback
+        def async_remove():
+            """Remove the subscription."""
+            nonlocal removed
+            if removed:
+                return
+
+            count = self._counts[topic] - 1
+
+            # Unsubscribe first, so nothing is changed if the broker fails
+            if count == 0:
+                MQTT_CLIENT.unsubscribe(topic)
+
+            removed = True
+            node.callbacks.remove(msg_callback)
+            self._prune(topic)
+
+            if count == 0:
+                del self._counts[topic]
+            else:
+                self._counts[topic] = count
+
+        return async_remove
+
+    def _prune(self, topic):
+        """Remove the topic levels that no longer lead to a subscription."""
+        path = [self._root]
+        parts = topic.split('/')
+        for part in parts:
+            path.append(path[-1].children[part])
+
+        for part, parent, node in zip(reversed(parts), reversed(path[:-1]),
+                                      reversed(path[1:])):
+            if node.callbacks or node.children:
+                return
+            del parent.children[part]
+
+    def match(self, topic):
+        """Return the callbacks subscribed to topics matching topic."""
+        result = []
+        parts = topic.split('/')
+        nodes = [self._root]
+
+        for part in parts:
+            next_nodes = []
+            for node in nodes:
+                if '#' in node.children:
+                    result.extend(node.children['#'].callbacks)
+                for key in (part, '+'):
+                    if key in node.children:
+                        next_nodes.append(node.children[key])
+            nodes = next_nodes
+
+            if not nodes:
+                return result
+
+        for node in nodes:
+            result.extend(node.callbacks)
+            # A subtree wildcard also matches its parent level
+            if '#' in node.children:
+                result.extend(node.children['#'].callbacks)
+
+        return result
+
+    @callback
+    def async_message_received(self, event):
+        """Run the callbacks subscribed to the topic of a message."""
+        topic = event.data[ATTR_TOPIC]
+        for msg_callback in self.match(topic):
+            self.hass.async_run_job(msg_callback, topic,
+                                    event.data[ATTR_PAYLOAD],
+                                    event.data[ATTR_QOS])
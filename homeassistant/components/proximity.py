@@ -16,7 +16,7 @@ from homeassistant.const import (
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.event import track_state_change
 from homeassistant.util.distance import convert
-from homeassistant.util.location import distance
+from homeassistant.util.location import distance, nearest
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -172,8 +172,9 @@ class Proximity(Entity):
         if 'latitude' not in new_state.attributes:
             return
 
-        # Collect distances to the zone for all devices.
-        distances_to_zone = {}
+        # Collect the locations of all devices.
+        devices = []
+        locations = []
         for device in self.proximity_devices:
             # Ignore devices in an ignored zone.
             device_state = self.hass.states.get(device)
@@ -184,29 +185,25 @@ class Proximity(Entity):
             if 'latitude' not in device_state.attributes:
                 continue
 
-            # Calculate the distance to the proximity zone.
-            dist_to_zone = distance(proximity_latitude,
-                                    proximity_longitude,
-                                    device_state.attributes['latitude'],
-                                    device_state.attributes['longitude'])
+            devices.append(device)
+            locations.append((device_state.attributes['latitude'],
+                              device_state.attributes['longitude']))
 
-            # Add the device and distance to a dictionary.
-            distances_to_zone[device] = round(
-                convert(dist_to_zone, 'm', self.unit_of_measurement), 1)
+        # Work out the closest device, only calculating the exact distance
+        # to the proximity zone for the devices that can be the closest.
+        index, dist_to_zone = nearest(
+            proximity_latitude, proximity_longitude, locations)
 
-        # Loop through each of the distances collected and work out the
-        # closest.
-        closest_device = None  # type: str
-        dist_to_zone = None  # type: float
+        if index is None:
+            return
 
-        for device in distances_to_zone:
-            if not dist_to_zone or distances_to_zone[device] < dist_to_zone:
-                closest_device = device
-                dist_to_zone = distances_to_zone[device]
+        closest_device = devices[index]
+        dist_to_zone = round(
+            convert(dist_to_zone, 'm', self.unit_of_measurement), 1)
 
         # If the closest device is one of the other devices.
         if closest_device != entity:
-            self.dist_to = round(distances_to_zone[closest_device])
+            self.dist_to = round(dist_to_zone)
             self.dir_of_travel = 'unknown'
             device_state = self.hass.states.get(closest_device)
             self.nearest = device_state.name
@@ -216,7 +213,7 @@ class Proximity(Entity):
         # Stop if we cannot calculate the direction of travel (i.e. we don't
         # have a previous state and a current LAT and LONG).
         if old_state is None or 'latitude' not in old_state.attributes:
-            self.dist_to = round(distances_to_zone[entity])
+            self.dist_to = round(dist_to_zone)
             self.dir_of_travel = 'unknown'
             self.nearest = entity_name
             self.update_ha_state()
@@ -7,6 +7,7 @@ to query this database.
 For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/recorder/
 """
+from collections import OrderedDict
 import logging
 import queue
 import threading
@@ -34,6 +35,38 @@ DEFAULT_DB_FILE = 'home-assistant_v2.db'
 
 CONF_DB_URL = 'db_url'
 CONF_PURGE_DAYS = 'purge_days'
+CONF_COMMIT_INTERVAL = 'commit_interval'
+CONF_MAX_BATCH_SIZE = 'max_batch_size'
+CONF_INCREMENTAL_VACUUM = 'incremental_vacuum'
+
+DEFAULT_COMMIT_INTERVAL = 1
+DEFAULT_MAX_BATCH_SIZE = 500
+
+# SQLite engine profile: WAL lets readers run while the recorder writes
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024  # bytes
+SQLITE_CACHE_SIZE = -16 * 1024  # negative values are KiB
+SQLITE_WRITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size={}'.format(SQLITE_MMAP_SIZE),
+    'PRAGMA cache_size={}'.format(SQLITE_CACHE_SIZE),
+)
+SQLITE_READ_PRAGMAS = (
+    'PRAGMA query_only=ON',
+    'PRAGMA mmap_size={}'.format(SQLITE_MMAP_SIZE),
+    'PRAGMA cache_size={}'.format(SQLITE_CACHE_SIZE),
+)
+READ_POOL_SIZE = 5
+
+# Number of attribute hashes to remember the shared attributes row of
+ATTRIBUTES_CACHE_SIZE = 2048
+ATTRIBUTES_QUERY_SIZE = 500
+
+# Number of states and of events deleted per purge transaction
+PURGE_BATCH_SIZE = 500
+
+# Queued to ask the recorder thread to start purging old data
+PURGE_REQUEST = object()
 
 RETRIES = 3
 CONNECT_RETRY_WAIT = 10
@@ -44,6 +77,11 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_DAYS):
             vol.All(vol.Coerce(int), vol.Range(min=1)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_MAX_BATCH_SIZE, default=DEFAULT_MAX_BATCH_SIZE):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_INCREMENTAL_VACUUM, default=False): cv.boolean,
     })
 }, extra=vol.ALLOW_EXTRA)
 
@@ -53,6 +91,7 @@ _LOGGER = logging.getLogger(__name__)
 # These classes will be populated during setup()
 # pylint: disable=invalid-name,no-member
 Session = None  # pylint: disable=no-member
+ReadSession = None  # pylint: disable=no-member
 
 
 # pylint: disable=invalid-sequence-index
@@ -70,9 +109,10 @@ def execute(q: QueryType) -> List[Any]:
                     (row.to_native() for row in q)
                     if row is not None]
             except sqlalchemy.exc.SQLAlchemyError as e:
-                log_error(e, retry_wait=QUERY_RETRY_WAIT, rollback=True)
+                log_error(e, retry_wait=QUERY_RETRY_WAIT, rollback=False)
+                q.session.rollback()
     finally:
-        Session.close()
+        q.session.close()
     return []
 
 
@@ -90,7 +130,7 @@ def run_information(point_in_time: Optional[datetime]=None):
             start=_INSTANCE.recording_start,
             closed_incorrect=False)
 
-    return query('RecorderRuns').filter(
+    return read_query('RecorderRuns').filter(
         (recorder_runs.start < point_in_time) &
         (recorder_runs.end > point_in_time)).first()
 
@@ -103,14 +143,20 @@ def setup(hass: HomeAssistant, config: ConfigType) -> bool:
         _LOGGER.error("Only a single instance allowed")
         return False
 
-    purge_days = config.get(DOMAIN, {}).get(CONF_PURGE_DAYS)
+    conf = config.get(DOMAIN, {})
+    purge_days = conf.get(CONF_PURGE_DAYS)
 
-    db_url = config.get(DOMAIN, {}).get(CONF_DB_URL, None)
+    db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
         db_url = DEFAULT_URL.format(
             hass_config_path=hass.config.path(DEFAULT_DB_FILE))
 
-    _INSTANCE = Recorder(hass, purge_days=purge_days, uri=db_url)
+    _INSTANCE = Recorder(
+        hass, purge_days=purge_days, uri=db_url,
+        commit_interval=conf.get(CONF_COMMIT_INTERVAL,
+                                 DEFAULT_COMMIT_INTERVAL),
+        max_batch_size=conf.get(CONF_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE),
+        incremental_vacuum=conf.get(CONF_INCREMENTAL_VACUUM, False))
 
     return True
 
@@ -119,9 +165,34 @@ def query(model_name: Union[str, Any], *args) -> QueryType:
     """Helper to return a query handle."""
     _verify_instance()
 
+    return _query(Session, model_name, *args)
+
+
+def read_query(model_name: Union[str, Any], *args) -> QueryType:
+    """Helper to return a query handle on the read only connections.
+
+    Use this for queries that are not made by the recorder itself, like
+    history and logbook, so long reads do not block recording.
+    """
+    _verify_instance()
+
+    return _query(ReadSession, model_name, *args)
+
+
+def _query(session, model_name: Union[str, Any], *args) -> QueryType:
+    """Return a query handle, loading shared attributes with the states."""
+    from sqlalchemy.orm import joinedload
+
     if isinstance(model_name, str):
-        return Session.query(get_model(model_name), *args)
-    return Session.query(model_name, *args)
+        model_name = get_model(model_name)
+
+    result = session.query(model_name, *args)
+
+    # Join the attributes instead of loading them for each state
+    if model_name is get_model('States'):
+        result = result.options(joinedload(model_name.state_attributes))
+
+    return result
 
 
 def get_model(model_name: str) -> Any:
@@ -153,7 +224,10 @@ def log_error(e: Exception, retry_wait: Optional[float]=0,
 class Recorder(threading.Thread):
     """A threaded recorder class."""
 
-    def __init__(self, hass: HomeAssistant, purge_days: int, uri: str) -> None:
+    def __init__(self, hass: HomeAssistant, purge_days: int, uri: str,
+                 commit_interval: float=DEFAULT_COMMIT_INTERVAL,
+                 max_batch_size: int=DEFAULT_MAX_BATCH_SIZE,
+                 incremental_vacuum: bool=False) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self)
 
@@ -164,7 +238,15 @@ class Recorder(threading.Thread):
         self.db_url = uri
         self.db_ready = threading.Event()
         self.engine = None  # type: Any
+        self.read_engine = None  # type: Any
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
+        self.last_batch_size = 0
+        self.last_commit_latency = None  # type: Optional[float]
+        self.incremental_vacuum = incremental_vacuum
+        self.purge_progress = None  # type: Optional[dict]
         self._run = None  # type: Any
+        self._attributes_ids = OrderedDict()  # type: OrderedDict
 
         def start_recording(event):
             """Start recording."""
@@ -176,7 +258,6 @@ class Recorder(threading.Thread):
 
     def run(self):
         """Start processing events to save."""
-        from homeassistant.components.recorder.models import Events, States
         import sqlalchemy.exc
 
         while True:
@@ -191,41 +272,162 @@ class Recorder(threading.Thread):
         if self.purge_days is not None:
             def purge_ticker(event):
                 """Rerun purge every second day."""
-                self._purge_old_data()
+                self.queue.put(PURGE_REQUEST)
                 track_point_in_utc_time(self.hass, purge_ticker,
                                         dt_util.utcnow() + timedelta(days=2))
             track_point_in_utc_time(self.hass, purge_ticker,
                                     dt_util.utcnow() + timedelta(minutes=5))
 
         while True:
-            event = self.queue.get()
+            events, stop = self._get_batch()
+
+            if events:
+                self._save_events(events)
 
-            if event is None:
+            for _ in range(len(events) + stop):
+                self.queue.task_done()
+
+            if self.purge_progress is not None and not stop:
+                self._purge_step()
+
+            if stop:
                 self._close_run()
                 self._close_connection()
-                self.queue.task_done()
                 return
 
-            if event.event_type == EVENT_TIME_CHANGED:
+    def _get_batch(self):
+        """Drain the queue into a batch of events to save.
+
+        Blocks until an event is available, then keeps collecting the events
+        that are already queued until the queue is empty, max_batch_size is
+        reached or commit_interval has passed. A burst of events is saved
+        in a single transaction without delaying a lone event.
+        While purging, an empty batch is returned instead of blocking.
+        Returns the batch and if the recorder should stop.
+        """
+        events = []
+        try:
+            event = self.queue.get(block=self.purge_progress is None)
+        except queue.Empty:
+            return events, False
+        deadline = time.monotonic() + self.commit_interval
+
+        while event is not None:
+            if event is PURGE_REQUEST:
+                self._start_purge()
                 self.queue.task_done()
-                continue
+            else:
+                events.append(event)
 
-            dbevent = Events.from_event(event)
-            self._commit(dbevent)
+            if len(events) >= self.max_batch_size or \
+               time.monotonic() >= deadline:
+                return events, False
 
-            if event.event_type != EVENT_STATE_CHANGED:
-                self.queue.task_done()
-                continue
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                return events, False
+
+        return events, True
+
+    def _save_events(self, events):
+        """Save a batch of events and their states in one transaction."""
+        from homeassistant.components.recorder.models import (
+            Events, States, StateAttributes)
+
+        attributes_ids = {}
+
+        def _insert_batch(session):
+            attributes_ids.clear()
+            dbevents = [Events.from_event(event) for event in events]
+            session.bulk_save_objects(dbevents, return_defaults=True)
+
+            dbstates = []
+            shared = {}
+            for event, dbevent in zip(events, dbevents):
+                if event.event_type != EVENT_STATE_CHANGED:
+                    continue
+
+                dbstate = States.from_event(event)
+                dbstate.event_id = dbevent.event_id
+                dbattributes = StateAttributes.from_event(event)
+                shared.setdefault(dbattributes.hash, dbattributes)
+                dbstates.append((dbstate, dbattributes.hash))
+
+            attributes_ids.update(
+                self._get_attributes_ids(session, shared))
+
+            for dbstate, attributes_hash in dbstates:
+                dbstate.attributes_id = attributes_ids[attributes_hash]
+
+            session.bulk_save_objects([dbstate for dbstate, _ in dbstates])
+
+        start = time.monotonic()
+        if self._commit(_insert_batch):
+            self._cache_attributes_ids(attributes_ids)
+        self.last_commit_latency = time.monotonic() - start
+        self.last_batch_size = len(events)
+        _LOGGER.debug("Saved %s events in %.3fs", self.last_batch_size,
+                      self.last_commit_latency)
+
+    def _get_attributes_ids(self, session, shared):
+        """Return the ids of the shared attributes rows by hash.
+
+        Rows that are not cached or in the database yet are inserted.
+        """
+        from homeassistant.components.recorder.models import StateAttributes
+
+        attributes_ids = {}
+        missing = []
+
+        for attributes_hash in shared:
+            attributes_id = self._attributes_ids.get(attributes_hash)
+
+            if attributes_id is None:
+                missing.append(attributes_hash)
+            else:
+                attributes_ids[attributes_hash] = attributes_id
+
+        # Stay below the SQLite limit of variables in a single statement
+        for index in range(0, len(missing), ATTRIBUTES_QUERY_SIZE):
+            attributes_ids.update(session.query(
+                StateAttributes.hash, StateAttributes.attributes_id).filter(
+                    StateAttributes.hash.in_(
+                        missing[index:index + ATTRIBUTES_QUERY_SIZE])))
 
-            dbstate = States.from_event(event)
-            dbstate.event_id = dbevent.event_id
-            self._commit(dbstate)
+        new_attributes = [shared[attributes_hash] for attributes_hash
+                          in missing if attributes_hash not in attributes_ids]
 
-            self.queue.task_done()
+        if new_attributes:
+            session.bulk_save_objects(new_attributes, return_defaults=True)
+            attributes_ids.update(
+                (dbattributes.hash, dbattributes.attributes_id)
+                for dbattributes in new_attributes)
+
+        return attributes_ids
+
+    def _cache_attributes_ids(self, attributes_ids):
+        """Remember committed shared attributes rows."""
+        cache = self._attributes_ids
+
+        for attributes_hash, attributes_id in attributes_ids.items():
+            cache[attributes_hash] = attributes_id
+            cache.move_to_end(attributes_hash)
+
+        while len(cache) > ATTRIBUTES_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    @property
+    def queue_depth(self):
+        """Return the number of events waiting to be saved."""
+        return self.queue.qsize()
 
     @callback
     def event_listener(self, event):
         """Listen for new events and put them in the process queue."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return
+
         self.queue.put(event)
 
     def shutdown(self, event):
@@ -246,12 +448,15 @@ class Recorder(threading.Thread):
 
     def _setup_connection(self):
         """Ensure database is ready to fly."""
-        global Session  # pylint: disable=global-statement
+        global Session, ReadSession  # pylint: disable=global-statement
 
         import homeassistant.components.recorder.models as models
-        from sqlalchemy import create_engine
+        from sqlalchemy import create_engine, event
         from sqlalchemy.orm import scoped_session
         from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import QueuePool
+
+        sqlite_file = False
 
         if self.db_url == 'sqlite://' or ':memory:' in self.db_url:
             from sqlalchemy.pool import StaticPool
@@ -259,20 +464,51 @@ class Recorder(threading.Thread):
                 'sqlite://',
                 connect_args={'check_same_thread': False},
                 poolclass=StaticPool)
+            self.read_engine = self.engine
         else:
             self.engine = create_engine(self.db_url, echo=False)
+            self.read_engine = self.engine
+
+            if self.engine.dialect.name == 'sqlite':
+                sqlite_file = True
+                # auto_vacuum can only be changed before tables are created
+                pragmas = SQLITE_WRITE_PRAGMAS
+                if self.incremental_vacuum:
+                    pragmas = ('PRAGMA auto_vacuum=INCREMENTAL',) + pragmas
+                event.listen(self.engine, 'connect',
+                             _sqlite_pragma_listener(pragmas))
+                self.read_engine = create_engine(
+                    self.db_url, echo=False,
+                    connect_args={'check_same_thread': False},
+                    poolclass=QueuePool, pool_size=READ_POOL_SIZE)
+                event.listen(self.read_engine, 'connect',
+                             _sqlite_pragma_listener(SQLITE_READ_PRAGMAS))
 
         models.Base.metadata.create_all(self.engine)
+        migrate_schema(self.engine)
+
+        if sqlite_file and self.incremental_vacuum and \
+           not incremental_vacuum_enabled(self.engine):
+            # Converting takes a full VACUUM, too slow to do on startup
+            _LOGGER.warning(
+                "Incremental vacuum only applies to new databases, convert "
+                "this one with: hass --script db_migrator "
+                "--incremental-vacuum")
         session_factory = sessionmaker(bind=self.engine)
         Session = scoped_session(session_factory)
+        ReadSession = scoped_session(sessionmaker(bind=self.read_engine))
         self.db_ready.set()
 
     def _close_connection(self):
         """Close the connection."""
-        global Session  # pylint: disable=global-statement
+        global Session, ReadSession  # pylint: disable=global-statement
+        if self.read_engine is not self.engine:
+            self.read_engine.dispose()
         self.engine.dispose()
         self.engine = None
+        self.read_engine = None
         Session = None
+        ReadSession = None
 
     def _setup_run(self):
         """Log the start of the current run."""
@@ -300,39 +536,119 @@ class Recorder(threading.Thread):
 
     def _purge_old_data(self):
         """Purge events and states older than purge_days ago."""
-        from homeassistant.components.recorder.models import Events, States
+        self._start_purge()
 
+        while self.purge_progress is not None:
+            self._purge_step()
+
+    def _start_purge(self):
+        """Start purging events and states older than purge_days ago."""
         if not self.purge_days or self.purge_days < 1:
             _LOGGER.debug("purge_days set to %s, will not purge any old data.",
                           self.purge_days)
             return
 
-        purge_before = dt_util.utcnow() - timedelta(days=self.purge_days)
+        if self.purge_progress is not None:
+            return
 
-        def _purge_states(session):
-            deleted_rows = session.query(States) \
-                                  .filter((States.created < purge_before)) \
-                                  .delete(synchronize_session=False)
-            _LOGGER.debug("Deleted %s states", deleted_rows)
+        self.purge_progress = {
+            'purge_before': dt_util.utcnow() - timedelta(
+                days=self.purge_days),
+            'states': 0,
+            'events': 0,
+            'attributes': 0,
+            'attributes_after': 0,
+        }
+
+    def _purge_step(self):
+        """Delete one batch of old states and events.
+
+        Finishes the purge when no old rows are left.
+        """
+        from sqlalchemy import exists
+        from homeassistant.components.recorder.models import (
+            Events, States, StateAttributes)
+
+        progress = self.purge_progress
+        purge_before = progress['purge_before']
+        deleted = {}
+
+        def _old_ids(session, model, key):
+            return [row[0] for row in session.query(key).filter(
+                model.created < purge_before).order_by(
+                    model.created).limit(PURGE_BATCH_SIZE)]
+
+        def _purge_batch(session):
+            state_ids = _old_ids(session, States, States.state_id)
+            deleted['states'] = len(state_ids)
+
+            if state_ids:
+                session.query(States).filter(
+                    States.state_id.in_(state_ids)).delete(
+                        synchronize_session=False)
+
+            event_ids = _old_ids(session, Events, Events.event_id)
+            deleted['events'] = len(event_ids)
+
+            if event_ids:
+                # States still referencing the events would violate the
+                # foreign key, delete them first
+                deleted['states'] += session.query(States).filter(
+                    States.event_id.in_(event_ids)).delete(
+                        synchronize_session=False)
+                session.query(Events).filter(
+                    Events.event_id.in_(event_ids)).delete(
+                        synchronize_session=False)
+
+        if not self._commit(_purge_batch):
+            return
 
-        if self._commit(_purge_states):
-            _LOGGER.info("Purged states created before %s", purge_before)
+        progress['states'] += deleted['states']
+        progress['events'] += deleted['events']
 
-        def _purge_events(session):
-            deleted_rows = session.query(Events) \
-                                  .filter((Events.created < purge_before)) \
-                                  .delete(synchronize_session=False)
-            _LOGGER.debug("Deleted %s events", deleted_rows)
+        if self.incremental_vacuum and self.engine.dialect.name == 'sqlite':
+            self.engine.execute('PRAGMA incremental_vacuum')
 
-        if self._commit(_purge_events):
-            _LOGGER.info("Purged events created before %s", purge_before)
+        if deleted['states'] or deleted['events']:
+            _LOGGER.debug("Purged %s states and %s events created before %s",
+                          progress['states'], progress['events'],
+                          purge_before)
+            return
 
-        Session.expire_all()
+        def _purge_attributes(session):
+            key = StateAttributes.attributes_id
+            # Uses the index on states.attributes_id for each row
+            unused = ~exists().where(States.attributes_id == key)
+            ids = [row[0] for row in session.query(key).filter(
+                key > progress['attributes_after'], unused).order_by(
+                    key).limit(PURGE_BATCH_SIZE)]
+
+            if ids:
+                session.query(StateAttributes).filter(
+                    StateAttributes.attributes_id.in_(ids)).delete(
+                        synchronize_session=False)
+                progress['attributes_after'] = ids[-1]
+
+            deleted['attributes'] = len(ids)
 
-        # Execute sqlite vacuum command to free up space on disk
-        if self.engine.driver == 'sqlite':
-            _LOGGER.info("Vacuuming SQLite to free space")
-            self.engine.execute("VACUUM")
+        if not self._commit(_purge_attributes):
+            return
+
+        # Cached ids may have been deleted
+        self._attributes_ids.clear()
+
+        if deleted['attributes']:
+            progress['attributes'] += deleted['attributes']
+            _LOGGER.debug("Purged %s unused attributes",
+                          progress['attributes'])
+            return
+
+        Session.expire_all()
+        self.purge_progress = None
+        _LOGGER.info("Purged %s states, %s events and %s unused attributes "
+                     "created before %s", progress['states'],
+                     progress['events'], progress['attributes'],
+                     purge_before)
 
     @staticmethod
     def _commit(work):
@@ -352,6 +668,63 @@ class Recorder(threading.Thread):
         return False
 
 
+def migrate_schema(engine):
+    """Add the columns that create_all does not add to existing tables."""
+    from sqlalchemy import inspect
+
+    columns = [column['name'] for column
+               in inspect(engine).get_columns('states')]
+
+    if 'attributes_id' not in columns:
+        _LOGGER.warning("Adding attributes_id column to the states table")
+        engine.execute('ALTER TABLE states ADD COLUMN attributes_id INTEGER '
+                       'REFERENCES state_attributes (attributes_id)')
+        engine.execute('CREATE INDEX ix_states_attributes_id '
+                       'ON states (attributes_id)')
+
+    for table in ('states', 'events'):
+        index = 'ix_{}_created'.format(table)
+
+        if index not in [idx['name'] for idx
+                         in inspect(engine).get_indexes(table)]:
+            _LOGGER.warning("Adding index %s, this can take a while", index)
+            engine.execute('CREATE INDEX {} ON {} (created)'.format(
+                index, table))
+
+
+def incremental_vacuum_enabled(engine):
+    """Return if a SQLite database uses incremental auto_vacuum."""
+    # 2 is INCREMENTAL
+    return engine.execute('PRAGMA auto_vacuum').scalar() == 2
+
+
+def enable_incremental_vacuum(engine):
+    """Switch an existing SQLite database to incremental auto_vacuum.
+
+    Databases created before are only converted by a full VACUUM, which
+    locks the database and needs free disk space the size of it.
+    """
+    if incremental_vacuum_enabled(engine):
+        return
+
+    _LOGGER.warning("Enabling incremental vacuum, this can take a while")
+    with engine.connect() as conn:
+        conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        conn.execute('VACUUM')
+
+
+def _sqlite_pragma_listener(pragmas):
+    """Return a connect listener that sets pragmas on SQLite connections."""
+    def set_pragmas(dbapi_connection, connection_record):
+        """Set the pragmas on a new connection."""
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return set_pragmas
+
+
 def _verify_instance() -> None:
     """Throw error if recorder not initialized."""
     if _INSTANCE is None:
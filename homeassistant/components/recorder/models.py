@@ -1,5 +1,6 @@
 """Models for SQLAlchemy."""
 
+import hashlib
 import json
 from datetime import datetime
 import logging
@@ -7,9 +8,11 @@ import logging
 from sqlalchemy import (Boolean, Column, DateTime, ForeignKey, Index, Integer,
                         String, Text, distinct)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
-from homeassistant.core import Event, EventOrigin, State, split_entity_id
+from homeassistant.core import (
+    Event, EventOrigin, State, json_dumps, split_entity_id)
 from homeassistant.remote import JSONEncoder
 
 # SQLAlchemy Schema
@@ -28,13 +31,14 @@ class Events(Base):  # type: ignore
     event_data = Column(Text)
     origin = Column(String(32))
     time_fired = Column(DateTime(timezone=True))
-    created = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created = Column(DateTime(timezone=True), default=datetime.utcnow,
+                     index=True)
 
     @staticmethod
     def from_event(event):
         """Create an event database object from a native event."""
         return Events(event_type=event.event_type,
-                      event_data=json.dumps(event.data, cls=JSONEncoder),
+                      event_data=json_dumps(event.data),
                       origin=str(event.origin),
                       time_fired=event.time_fired)
 
@@ -53,6 +57,30 @@ class Events(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """State attributes shared by states, deduplicated by content hash."""
+
+    __tablename__ = 'state_attributes'
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(String(40), index=True, unique=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def from_event(event):
+        """Create shared attributes from a state_changed event."""
+        state = event.data.get('new_state')
+        attributes = {} if state is None else dict(state.attributes)
+        shared_attrs = json.dumps(attributes, cls=JSONEncoder,
+                                  sort_keys=True)
+        return StateAttributes(hash=StateAttributes.hash_shared_attrs(
+            shared_attrs), shared_attrs=shared_attrs)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the content hash of encoded attributes."""
+        return hashlib.sha1(shared_attrs.encode('utf-8')).hexdigest()
+
+
 class States(Base):   # type: ignore
     """State change history."""
 
@@ -61,20 +89,30 @@ class States(Base):   # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255))
     state = Column(String(255))
+    # Only set on rows recorded before attributes were shared
     attributes = Column(Text)
+    attributes_id = Column(Integer,
+                           ForeignKey('state_attributes.attributes_id'),
+                           index=True)
     event_id = Column(Integer, ForeignKey('events.event_id'))
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow)
-    created = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created = Column(DateTime(timezone=True), default=datetime.utcnow,
+                     index=True)
 
     __table_args__ = (Index('states__state_changes',
                             'last_changed', 'last_updated', 'entity_id'),
                       Index('states__significant_changes',
                             'domain', 'last_updated', 'entity_id'), )
 
+    state_attributes = relationship(StateAttributes)
+
     @staticmethod
     def from_event(event):
-        """Create object from a state_changed event."""
+        """Create object from a state_changed event.
+
+        The attributes are stored separately, see StateAttributes.
+        """
         entity_id = event.data['entity_id']
         state = event.data.get('new_state')
 
@@ -84,14 +122,11 @@ class States(Base):   # type: ignore
         if state is None:
             dbstate.state = ''
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = '{}'
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes),
-                                            cls=JSONEncoder)
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -99,10 +134,17 @@ class States(Base):   # type: ignore
 
     def to_native(self):
         """Convert to an HA state object."""
+        if self.attributes is not None:
+            attributes = self.attributes
+        elif self.state_attributes is not None:
+            attributes = self.state_attributes.shared_attrs
+        else:
+            attributes = '{}'
+
         try:
             return State(
                 self.entity_id, self.state,
-                json.loads(self.attributes),
+                json.loads(attributes),
                 _process_timestamp(self.last_changed),
                 _process_timestamp(self.last_updated)
             )
@@ -106,7 +106,7 @@ class SpeedtestSensor(Entity):
             states = recorder.get_model('States')
             try:
                 last_state = recorder.execute(
-                    recorder.query('States').filter(
+                    recorder.read_query('States').filter(
                         (states.entity_id == entity_id) &
                         (states.last_changed == states.last_updated) &
                         (states.state != 'unknown')
@@ -16,7 +16,8 @@ from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_SENSORS)
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.helpers.event import async_track_state_change
+from homeassistant.helpers.event import (
+    async_track_state_change, async_track_template_states)
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -41,8 +42,7 @@ def async_setup_platform(hass, config, async_add_devices, discovery_info=None):
 
     for device, device_config in config[CONF_SENSORS].items():
         state_template = device_config[CONF_VALUE_TEMPLATE]
-        entity_ids = (device_config.get(ATTR_ENTITY_ID) or
-                      state_template.extract_entities())
+        entity_ids = device_config.get(ATTR_ENTITY_ID)
         friendly_name = device_config.get(ATTR_FRIENDLY_NAME, device)
         unit_of_measurement = device_config.get(ATTR_UNIT_OF_MEASUREMENT)
 
@@ -84,8 +84,12 @@ class SensorTemplate(Entity):
             """Called when the target device changes state."""
             hass.async_add_job(self.async_update_ha_state, True)
 
-        async_track_state_change(
-            hass, entity_ids, template_sensor_state_listener)
+        if entity_ids:
+            async_track_state_change(
+                hass, entity_ids, template_sensor_state_listener)
+        else:
+            async_track_template_states(
+                hass, self._template, template_sensor_state_listener)
 
     @property
     def name(self):
@@ -11,8 +11,8 @@ import requests
 import voluptuous as vol
 
 from homeassistant.const import (
-    CONF_HOST, CONF_PORT, CONF_SSL, CONF_TOKEN, EVENT_STATE_CHANGED)
-from homeassistant.helpers import state as state_helper
+    CONF_HOST, CONF_PORT, CONF_SSL, CONF_TOKEN)
+from homeassistant.helpers import exporter, state as state_helper
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,6 +22,7 @@ DOMAIN = 'splunk'
 DEFAULT_HOST = 'localhost'
 DEFAULT_PORT = 8088
 DEFAULT_SSL = False
+TIMEOUT = 10
 
 CONFIG_SCHEMA = vol.Schema({
     DOMAIN: vol.Schema({
@@ -50,36 +51,43 @@ def setup(hass, config):
         uri_scheme, host, port)
     headers = {'Authorization': 'Splunk {}'.format(token)}
 
-    def splunk_event_listener(event):
-        """Listen for new messages on the bus and sends them to Splunk."""
-        state = event.data.get('new_state')
+    SplunkExporter(hass, event_collector, headers).register()
 
-        if state is None:
-            return
+    return True
+
+
+class SplunkExporter(exporter.Exporter):
+    """Send state changes to the Splunk HTTP event collector."""
+
+    retry_exceptions = (requests.exceptions.RequestException,)
+
+    def __init__(self, hass, event_collector, headers):
+        """Initialize the exporter."""
+        super().__init__(hass, DOMAIN)
+        self.event_collector = event_collector
+        self.headers = headers
 
-        try:
-            _state = state_helper.state_as_number(state)
-        except ValueError:
-            _state = state.state
+    def export(self, events):
+        """Send the events in one request."""
+        json_body = []
 
-        json_body = [
-            {
+        for event in events:
+            state = event.data['new_state']
+
+            try:
+                _state = state_helper.state_as_number(state)
+            except ValueError:
+                _state = state.state
+
+            json_body.append({
                 'domain': state.domain,
                 'entity_id': state.object_id,
                 'attributes': dict(state.attributes),
                 'time': str(event.time_fired),
                 'value': _state,
-            }
-        ]
-
-        try:
-            payload = {"host": event_collector,
-                       "event": json_body}
-            requests.post(event_collector, data=json.dumps(payload),
-                          headers=headers)
-        except requests.exceptions.RequestException as error:
-            _LOGGER.exception('Error saving event to Splunk: %s', error)
+            })
 
-    hass.bus.listen(EVENT_STATE_CHANGED, splunk_event_listener)
-
-    return True
+        payload = {"host": self.event_collector,
+                   "event": json_body}
+        requests.post(self.event_collector, data=json.dumps(payload),
+                      headers=self.headers, timeout=TIMEOUT)
@@ -9,9 +9,9 @@ import logging
 import voluptuous as vol
 
 from homeassistant.const import (
-    CONF_HOST, CONF_PORT, CONF_PREFIX, EVENT_STATE_CHANGED)
+    CONF_HOST, CONF_PORT, CONF_PREFIX)
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers import state as state_helper
+from homeassistant.helpers import exporter, state as state_helper
 
 REQUIREMENTS = ['statsd==3.2.1']
 
@@ -51,12 +51,31 @@ def setup(hass, config):
 
     statsd_client = statsd.StatsClient(host=host, port=port, prefix=prefix)
 
-    def statsd_event_listener(event):
-        """Listen for new messages on the bus and sends them to StatsD."""
-        state = event.data.get('new_state')
+    StatsdExporter(
+        hass, statsd_client, sample_rate, show_attribute_flag).register()
 
-        if state is None:
-            return
+    return True
+
+
+class StatsdExporter(exporter.Exporter):
+    """Send state changes to StatsD."""
+
+    def __init__(self, hass, statsd_client, sample_rate, show_attribute_flag):
+        """Initialize the exporter."""
+        super().__init__(hass, DOMAIN)
+        self.statsd_client = statsd_client
+        self.sample_rate = sample_rate
+        self.show_attribute_flag = show_attribute_flag
+
+    def export(self, events):
+        """Send the stats of the events in one pipeline."""
+        with self.statsd_client.pipeline() as pipe:
+            for event in events:
+                self._send_state(pipe, event.data['new_state'])
+
+    def _send_state(self, pipe, state):
+        """Add the stats of a state to the pipeline."""
+        sample_rate = self.sample_rate
 
         try:
             _state = state_helper.state_as_number(state)
@@ -68,9 +87,9 @@ def setup(hass, config):
 
         _LOGGER.debug('Sending %s', state.entity_id)
 
-        if show_attribute_flag is True:
+        if self.show_attribute_flag is True:
             if isinstance(_state, (float, int)):
-                statsd_client.gauge(
+                pipe.gauge(
                     "%s.state" % state.entity_id,
                     _state,
                     sample_rate
@@ -80,15 +99,11 @@ def setup(hass, config):
             for key, value in states.items():
                 if isinstance(value, (float, int)):
                     stat = "%s.%s" % (state.entity_id, key.replace(' ', '_'))
-                    statsd_client.gauge(stat, value, sample_rate)
+                    pipe.gauge(stat, value, sample_rate)
 
         else:
             if isinstance(_state, (float, int)):
-                statsd_client.gauge(state.entity_id, _state, sample_rate)
+                pipe.gauge(state.entity_id, _state, sample_rate)
 
         # Increment the count
-        statsd_client.incr(state.entity_id, rate=sample_rate)
-
-    hass.bus.listen(EVENT_STATE_CHANGED, statsd_event_listener)
-
-    return True
+        pipe.incr(state.entity_id, rate=sample_rate)
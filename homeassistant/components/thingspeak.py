@@ -11,9 +11,8 @@ import voluptuous as vol
 
 from homeassistant.const import (
     CONF_API_KEY, CONF_ID, CONF_WHITELIST, STATE_UNAVAILABLE, STATE_UNKNOWN)
-from homeassistant.helpers import state as state_helper
+from homeassistant.helpers import exporter, state as state_helper
 import homeassistant.helpers.config_validation as cv
-import homeassistant.helpers.event as event
 
 REQUIREMENTS = ['thingspeak==0.4.0']
 
@@ -51,23 +50,37 @@ def setup(hass, config):
                       "API key is correct.")
         return False
 
-    def thingspeak_listener(entity_id, old_state, new_state):
-        """Listen for new events and send them to thingspeak."""
-        if new_state is None or new_state.state in (
-                STATE_UNKNOWN, '', STATE_UNAVAILABLE):
-            return
-        try:
-            if new_state.entity_id != entity:
-                return
-            _state = state_helper.state_as_number(new_state)
-        except ValueError:
-            return
-        try:
-            channel.update({'field1': _state})
-        except RequestException:
-            _LOGGER.error("Error while sending value '%s' to Thingspeak",
-                          _state)
-
-    event.track_state_change(hass, entity, thingspeak_listener)
+    ThingspeakExporter(hass, channel, entity).register()
 
     return True
+
+
+class ThingspeakExporter(exporter.Exporter):
+    """Send the state of an entity to a ThingSpeak channel."""
+
+    retry_exceptions = (RequestException,)
+
+    def __init__(self, hass, channel, entity):
+        """Initialize the exporter."""
+        entity_filter = exporter.generate_filter(
+            include_entities=[entity.lower()])
+        super().__init__(hass, DOMAIN, entity_filter)
+        self.channel = channel
+
+    def export(self, events):
+        """Send the latest numeric state of the events.
+
+        ThingSpeak only accepts an update every few seconds, so older states
+        of a batch are skipped.
+        """
+        for event in reversed(events):
+            new_state = event.data['new_state']
+            if new_state.state in (STATE_UNKNOWN, '', STATE_UNAVAILABLE):
+                continue
+            try:
+                _state = state_helper.state_as_number(new_state)
+            except ValueError:
+                continue
+
+            self.channel.update({'field1': _state})
+            return
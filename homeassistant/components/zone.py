@@ -5,16 +5,19 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/zone/
 """
 import asyncio
+import bisect
 import logging
 
 import voluptuous as vol
 
 from homeassistant.const import (
     ATTR_HIDDEN, ATTR_LATITUDE, ATTR_LONGITUDE, CONF_NAME, CONF_LATITUDE,
-    CONF_LONGITUDE, CONF_ICON)
+    CONF_LONGITUDE, CONF_ICON, EVENT_STATE_CHANGED)
+from homeassistant.core import callback
 from homeassistant.helpers import config_per_platform
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
-from homeassistant.util.location import distance
+from homeassistant.util.location import (
+    HAVERSINE_SLACK, HAVERSINE_TOLERANCE, distance, haversine)
 import homeassistant.helpers.config_validation as cv
 
 _LOGGER = logging.getLogger(__name__)
@@ -30,6 +33,8 @@ DEFAULT_PASSIVE = False
 DEFAULT_RADIUS = 100
 DOMAIN = 'zone'
 
+DATA_ZONE_INDEX = 'zone_index'
+
 ENTITY_ID_FORMAT = 'zone.{}'
 ENTITY_ID_HOME = ENTITY_ID_FORMAT.format('home')
 
@@ -38,6 +43,9 @@ ICON_IMPORT = 'mdi:import'
 
 STATE = 'zoning'
 
+# Shortest length of a degree of latitude in meters, found at the equator
+METERS_PER_LATITUDE_DEGREE = 110574
+
 # The config that zone accepts is the same as if it has platforms.
 PLATFORM_SCHEMA = vol.Schema({
     vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
@@ -51,15 +59,22 @@ PLATFORM_SCHEMA = vol.Schema({
 
 def active_zone(hass, latitude, longitude, radius=0):
     """Find the active zone for given latitude, longitude."""
-    # Sort entity IDs so that we are deterministic if equal distance to 2 zones
-    zones = (hass.states.get(entity_id) for entity_id
-             in sorted(hass.states.entity_ids(DOMAIN)))
+    index = hass.data.get(DATA_ZONE_INDEX)
+
+    if index is not None:
+        zones = index.near(latitude, longitude, radius)
+    else:
+        # Sort entity IDs so that we are deterministic if equal distance to
+        # 2 zones
+        zones = (hass.states.get(entity_id) for entity_id
+                 in sorted(hass.states.entity_ids(DOMAIN)))
 
     min_dist = None
     closest = None
 
     for zone in zones:
-        if zone.attributes.get(ATTR_PASSIVE):
+        if zone.attributes.get(ATTR_PASSIVE) or \
+           _outside_zone(zone, latitude, longitude, radius):
             continue
 
         zone_dist = distance(
@@ -81,6 +96,9 @@ def active_zone(hass, latitude, longitude, radius=0):
 
 def in_zone(zone, latitude, longitude, radius=0):
     """Test if given latitude, longitude is in given zone."""
+    if _outside_zone(zone, latitude, longitude, radius):
+        return False
+
     zone_dist = distance(
         latitude, longitude,
         zone.attributes[ATTR_LATITUDE], zone.attributes[ATTR_LONGITUDE])
@@ -88,9 +106,88 @@ def in_zone(zone, latitude, longitude, radius=0):
     return zone_dist - radius < zone.attributes[ATTR_RADIUS]
 
 
+def _outside_zone(zone, latitude, longitude, radius):
+    """Return if the haversine distance rules out being in the zone."""
+    approximate = haversine(
+        latitude, longitude,
+        zone.attributes[ATTR_LATITUDE], zone.attributes[ATTR_LONGITUDE])
+
+    return ((approximate - HAVERSINE_SLACK) / (1 + HAVERSINE_TOLERANCE) -
+            radius >= zone.attributes[ATTR_RADIUS])
+
+
+class ZoneIndex(object):
+    """Active zones sorted by latitude to find the zones near a location."""
+
+    def __init__(self, hass):
+        """Initialize the index from the current zone states."""
+        self._zones = {state.entity_id: state for state
+                       in hass.states.async_sorted(DOMAIN)
+                       if self._indexable(state)}
+        self._index = None
+        self._build()
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    @staticmethod
+    def _indexable(state):
+        """Return if a zone state can be active."""
+        return (not state.attributes.get(ATTR_PASSIVE) and
+                ATTR_LATITUDE in state.attributes and
+                ATTR_LONGITUDE in state.attributes and
+                ATTR_RADIUS in state.attributes)
+
+    def _build(self):
+        """Sort the zones by latitude."""
+        zones = sorted(self._zones.values(),
+                       key=lambda state: state.attributes[ATTR_LATITUDE])
+        max_radius = max((state.attributes[ATTR_RADIUS] for state in zones),
+                         default=0)
+
+        # Replaced in one go so lookups from other threads stay consistent
+        self._index = (
+            [state.attributes[ATTR_LATITUDE] for state in zones], zones,
+            max_radius)
+
+    @callback
+    def _async_state_changed(self, event):
+        """Update the index when a zone changes."""
+        entity_id = event.data['entity_id']
+
+        if not entity_id.startswith(DOMAIN + '.'):
+            return
+
+        new_state = event.data.get('new_state')
+
+        if new_state is not None and self._indexable(new_state):
+            self._zones[entity_id] = new_state
+        elif self._zones.pop(entity_id, None) is None:
+            return
+
+        self._build()
+
+    def near(self, latitude, longitude, radius=0):
+        """Return the active zones a location may be in, by entity id.
+
+        Only the zones within a latitude band as wide as the largest zone
+        radius plus the location accuracy are returned.
+        """
+        latitudes, zones, max_radius = self._index
+        reach = ((max_radius + radius + HAVERSINE_SLACK) /
+                 METERS_PER_LATITUDE_DEGREE)
+
+        return sorted(
+            zones[bisect.bisect_left(latitudes, latitude - reach):
+                  bisect.bisect_right(latitudes, latitude + reach)],
+            key=lambda state: state.entity_id)
+
+
 @asyncio.coroutine
 def async_setup(hass, config):
     """Setup zone."""
+    if DATA_ZONE_INDEX not in hass.data:
+        hass.data[DATA_ZONE_INDEX] = ZoneIndex(hass)
+
     entities = set()
     tasks = []
     for _, entry in config_per_platform(config, DOMAIN):
@@ -14,10 +14,11 @@ from homeassistant.const import (
     CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME, CONF_UNIT_SYSTEM,
     CONF_TIME_ZONE, CONF_CUSTOMIZE, CONF_ELEVATION, CONF_UNIT_SYSTEM_METRIC,
     CONF_UNIT_SYSTEM_IMPERIAL, CONF_TEMPERATURE_UNIT, TEMP_CELSIUS,
-    __version__)
-from homeassistant.core import valid_entity_id
+    CONF_SETUP_CONCURRENCY, CONF_EXECUTOR_POOLS, __version__)
+from homeassistant.core import EXECUTOR_POOLS, valid_entity_id
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.util.yaml import load_yaml
+from homeassistant.util.yaml import (
+    load_node_cache, load_yaml, save_node_cache)
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity import set_customize
 from homeassistant.util import dt as date_util, location as loc_util
@@ -27,6 +28,7 @@ _LOGGER = logging.getLogger(__name__)
 
 YAML_CONFIG_FILE = 'configuration.yaml'
 VERSION_FILE = '.HA_VERSION'
+YAML_CACHE_FILE = '.yaml_cache'
 CONFIG_DIR_NAME = '.homeassistant'
 
 DEFAULT_CORE_CONFIG = (
@@ -103,6 +105,11 @@ CORE_CONFIG_SCHEMA = vol.Schema({
     CONF_TIME_ZONE: cv.time_zone,
     vol.Required(CONF_CUSTOMIZE,
                  default=MappingProxyType({})): _valid_customize,
+    vol.Optional(CONF_SETUP_CONCURRENCY):
+        vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(CONF_EXECUTOR_POOLS): {
+        vol.In(EXECUTOR_POOLS): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    },
 })
 
 
@@ -193,7 +200,7 @@ def async_hass_config_yaml(hass):
     """
     def _load_hass_yaml_config():
         path = find_config_file(hass.config.config_dir)
-        conf = load_yaml_config_file(path)
+        conf = load_hass_config_file(path, hass.config.config_dir)
         return conf
 
     conf = yield from hass.loop.run_in_executor(None, _load_hass_yaml_config)
@@ -226,6 +233,23 @@ def load_yaml_config_file(config_path):
     return conf_dict
 
 
+def load_hass_config_file(config_path, config_dir):
+    """Parse the configuration file of Home Assistant.
+
+    The parsed files in the config dir are cached in it, so only the files
+    that changed are parsed again.
+
+    This method needs to run in an executor.
+    """
+    cache_path = os.path.join(config_dir, YAML_CACHE_FILE)
+
+    load_node_cache(cache_path)
+    try:
+        return load_yaml_config_file(config_path)
+    finally:
+        save_node_cache(cache_path, config_dir)
+
+
 def process_ha_config_upgrade(hass):
     """Upgrade config if necessary.
 
@@ -279,10 +303,14 @@ def async_process_ha_core_config(hass, config):
     for key, attr in ((CONF_LATITUDE, 'latitude'),
                       (CONF_LONGITUDE, 'longitude'),
                       (CONF_NAME, 'location_name'),
-                      (CONF_ELEVATION, 'elevation')):
+                      (CONF_ELEVATION, 'elevation'),
+                      (CONF_SETUP_CONCURRENCY, 'setup_concurrency')):
         if key in config:
             setattr(hac, attr, config[key])
 
+    for name, max_workers in config.get(CONF_EXECUTOR_POOLS, {}).items():
+        hass.executors[name].resize(max_workers)
+
     if CONF_TIME_ZONE in config:
         set_time_zone(config.get(CONF_TIME_ZONE))
 
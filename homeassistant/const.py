@@ -86,6 +86,7 @@ CONF_EMAIL = 'email'
 CONF_ENTITY_ID = 'entity_id'
 CONF_ENTITY_NAMESPACE = 'entity_namespace'
 CONF_EVENT = 'event'
+CONF_EXECUTOR_POOLS = 'executor_pools'
 CONF_FILE_PATH = 'file_path'
 CONF_FILENAME = 'filename'
 CONF_FRIENDLY_NAME = 'friendly_name'
@@ -125,6 +126,7 @@ CONF_SCAN_INTERVAL = 'scan_interval'
 CONF_SENDER = 'sender'
 CONF_SENSOR_CLASS = 'sensor_class'
 CONF_SENSORS = 'sensors'
+CONF_SETUP_CONCURRENCY = 'setup_concurrency'
 CONF_SSL = 'ssl'
 CONF_STATE = 'state'
 CONF_STRUCTURE = 'structure'
@@ -330,10 +332,13 @@ URL_API_STATES = '/api/states'
 URL_API_STATES_ENTITY = '/api/states/{}'
 URL_API_EVENTS = '/api/events'
 URL_API_EVENTS_EVENT = '/api/events/{}'
+URL_API_EVENTS_BATCH = '/api/events_batch'
 URL_API_SERVICES = '/api/services'
 URL_API_SERVICES_SERVICE = '/api/services/{}/{}'
 URL_API_EVENT_FORWARD = '/api/event_forwarding'
 URL_API_COMPONENTS = '/api/components'
+URL_API_STARTUP_PROFILE = '/api/startup_profile'
+URL_API_EXECUTORS = '/api/executors'
 URL_API_ERROR_LOG = '/api/error_log'
 URL_API_LOG_OUT = '/api/log_out'
 URL_API_TEMPLATE = '/api/template'
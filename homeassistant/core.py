@@ -6,8 +6,14 @@ of entities and react to changes.
 """
 # pylint: disable=unused-import, too-many-lines
 import asyncio
+import bisect
 from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import enum
+import functools as ft
+import heapq
+import itertools
+import json
 import logging
 import os
 import re
@@ -18,7 +24,6 @@ import threading
 from types import MappingProxyType
 from typing import Optional, Any, Callable, List  # NOQA
 
-import aiohttp
 import voluptuous as vol
 from voluptuous.humanize import humanize_error
 
@@ -58,6 +63,26 @@ ENTITY_ID_PATTERN = re.compile(r"^(\w+)\.(\w+)$")
 # Size of a executor pool
 EXECUTOR_POOL_SIZE = 15
 
+# Named executor pools, so jobs of one kind can not occupy all workers
+POOL_DEFAULT = 'default'
+POOL_IO = 'io'
+POOL_DB = 'db'
+POOL_POLLING = 'polling'
+POOL_SERVICES = 'services'
+
+# Default number of workers of the executor pools
+EXECUTOR_POOLS = {
+    POOL_DEFAULT: EXECUTOR_POOL_SIZE,
+    POOL_IO: 5,
+    POOL_DB: 3,
+    POOL_POLLING: 10,
+    POOL_SERVICES: 5,
+}
+
+# Components set up at the same time during startup. Kept below the number
+# of executor workers as sync setups occupy one while running.
+DEFAULT_SETUP_CONCURRENCY = 3
+
 # Time for cleanup internal pending tasks
 TIME_INTERVAL_TASKS_CLEANUP = 10
 
@@ -99,6 +124,59 @@ class CoreState(enum.Enum):
         return self.value
 
 
+class ExecutorPool(ThreadPoolExecutor):
+    """Thread pool executor that counts its queued and running jobs."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        """Initialize the executor pool."""
+        super().__init__(max_workers=max_workers)
+        self.name = name
+        self.queued = 0
+        self.busy = 0
+        self._count_lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a job to the pool."""
+        with self._count_lock:
+            self.queued += 1
+
+        try:
+            return super().submit(self._run_job, fn, args, kwargs)
+        except RuntimeError:
+            with self._count_lock:
+                self.queued -= 1
+            raise
+
+    def _run_job(self, fn, args, kwargs):
+        """Run a job, counting it as busy while it runs."""
+        with self._count_lock:
+            self.queued -= 1
+            self.busy += 1
+
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._count_lock:
+                self.busy -= 1
+
+    def resize(self, max_workers: int) -> None:
+        """Change the maximum number of worker threads.
+
+        Threads are started on demand, so shrinking only takes effect for
+        threads that have not been started yet.
+        """
+        self._max_workers = max_workers
+
+    def metrics(self) -> dict:
+        """Return the load of the pool."""
+        return {
+            'max_workers': self._max_workers,
+            'threads': len(self._threads),
+            'busy': self.busy,
+            'queued': self.queued,
+        }
+
+
 class HomeAssistant(object):
     """Root object of the Home Assistant home automation."""
 
@@ -109,12 +187,13 @@ class HomeAssistant(object):
         else:
             self.loop = loop or asyncio.get_event_loop()
 
-        self.executor = ThreadPoolExecutor(max_workers=5)
-        self.loop.set_default_executor(self.executor)
+        self._create_executors()
         self.loop.set_exception_handler(self._async_exception_handler)
         self._pending_tasks = []
         self._pending_sheduler = None
         self.bus = EventBus(self)
+        self.scheduler = TimeScheduler(self.bus)
+        self.state_dispatcher = StateChangeDispatcher(self.bus, self.loop)
         self.services = ServiceRegistry(self.bus, self.async_add_job,
                                         self.loop)
         self.states = StateMachine(self.bus, self.loop)
@@ -125,6 +204,14 @@ class HomeAssistant(object):
         self.exit_code = None
         self._websession = None
 
+    def _create_executors(self):
+        """Create the executor pools and use the default one for the loop."""
+        self.executors = {
+            name: ExecutorPool(name, max_workers)
+            for name, max_workers in EXECUTOR_POOLS.items()}
+        self.executor = self.executors[POOL_DEFAULT]
+        self.loop.set_default_executor(self.executor)
+
     @property
     def is_running(self) -> bool:
         """Return if Home Assistant is running."""
@@ -134,6 +221,8 @@ class HomeAssistant(object):
     def websession(self):
         """Return an aiohttp session to make web requests."""
         if self._websession is None:
+            # Not imported at module level as it is slow to import
+            import aiohttp
             self._websession = aiohttp.ClientSession(loop=self.loop)
 
         return self._websession
@@ -204,23 +293,28 @@ class HomeAssistant(object):
         self._pending_sheduler = self.loop.call_later(
             TIME_INTERVAL_TASKS_CLEANUP, self._async_tasks_cleanup)
 
-    def add_job(self, target: Callable[..., None], *args: Any) -> None:
+    def add_job(self, target: Callable[..., None], *args: Any,
+                pool: Optional[str]=None) -> None:
         """Add job to the executor pool.
 
         target: target to call.
         args: parameters for method to call.
+        pool: name of the executor pool to run a sync target in.
         """
         run_callback_threadsafe(
-            self.loop, self.async_add_job, target, *args).result()
+            self.loop, ft.partial(self.async_add_job, target, *args,
+                                  pool=pool)).result()
 
     @callback
-    def async_add_job(self, target: Callable[..., None], *args: Any) -> None:
+    def async_add_job(self, target: Callable[..., None], *args: Any,
+                      pool: Optional[str]=None) -> None:
         """Add a job from within the eventloop.
 
         This method must be run in the event loop.
 
         target: target to call.
         args: parameters for method to call.
+        pool: name of the executor pool to run a sync target in.
         """
         task = None
 
@@ -231,7 +325,9 @@ class HomeAssistant(object):
         elif asyncio.iscoroutinefunction(target):
             task = self.loop.create_task(target(*args))
         else:
-            task = self.loop.run_in_executor(None, target, *args)
+            task = self.loop.run_in_executor(
+                None if pool is None else self.executors[pool],
+                target, *args)
 
         # if a task is sheduled
         if task is not None:
@@ -297,7 +393,8 @@ class HomeAssistant(object):
         if self._pending_sheduler is not None:
             self._pending_sheduler.cancel()
         yield from self.async_block_till_done()
-        self.executor.shutdown()
+        for executor in self.executors.values():
+            executor.shutdown()
         if self._websession is not None:
             yield from self._websession.close()
         self.state = CoreState.not_running
@@ -398,6 +495,7 @@ class EventBus(object):
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners = {}
+        self._dispatch = {}
         self._hass = hass
 
     @callback
@@ -432,11 +530,13 @@ class EventBus(object):
                 self._hass.state == CoreState.stopping:
             raise HomeAssistantError('Home Assistant is shutting down.')
 
-        # Copy the list of the current listeners because some listeners
-        # remove themselves as a listener while being executed which
-        # causes the iterator to be confused.
-        get = self._listeners.get
-        listeners = get(MATCH_ALL, []) + get(event_type, [])
+        # The dispatch table is an immutable snapshot that is only rebuilt
+        # after listeners subscribe or unsubscribe, so listeners that remove
+        # themselves while being executed do not confuse the iteration.
+        listeners = self._dispatch.get(event_type)
+
+        if listeners is None:
+            listeners = self._async_build_dispatch(event_type)
 
         event = Event(event_type, event_data, origin)
 
@@ -446,8 +546,31 @@ class EventBus(object):
         if not listeners:
             return
 
-        for func in listeners:
-            self._hass.async_add_job(func, event)
+        for func, run_inline in listeners:
+            if not run_inline:
+                self._hass.async_add_job(func, event)
+                continue
+
+            try:
+                func(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error running listener %s for %s',
+                                  func, event_type)
+
+    @callback
+    def _async_build_dispatch(self, event_type):
+        """Build the dispatch table for an event type.
+
+        Callback listeners are marked to run inline, others are scheduled
+        as a task or on the executor by async_add_job.
+
+        This method must be run in the event loop.
+        """
+        get = self._listeners.get
+        listeners = tuple((func, is_callback(func)) for func
+                          in get(MATCH_ALL, []) + get(event_type, []))
+        self._dispatch[event_type] = listeners
+        return listeners
 
     def listen(self, event_type, listener):
         """Listen for all events or events of a specific type.
@@ -479,6 +602,8 @@ class EventBus(object):
         else:
             self._listeners[event_type] = [listener]
 
+        self._dispatch.clear()
+
         def remove_listener():
             """Remove the listener."""
             self._async_remove_listener(event_type, listener)
@@ -544,6 +669,8 @@ class EventBus(object):
             # delete event_type list if empty
             if not self._listeners[event_type]:
                 self._listeners.pop(event_type)
+
+            self._dispatch.clear()
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
@@ -551,6 +678,205 @@ class EventBus(object):
                             listener)
 
 
+class TimeScheduler(object):
+    """Dispatch time changed events only to the listeners that are due.
+
+    Point in time listeners are kept in a heap ordered by their deadline and
+    pattern listeners in a wheel of 60 slots keyed by the second they can
+    match on. A tick only wakes the listeners that can possibly fire instead
+    of every time listener registered on the bus.
+    """
+
+    def __init__(self, bus: EventBus) -> None:
+        """Initialize the time scheduler."""
+        self._bus = bus
+        self._points = []
+        self._counter = itertools.count()
+        self._wheel = {}
+        self._every_tick = []
+        self._unsub_tick = None
+
+    @callback
+    def async_listeners(self):
+        """Dict with the number of scheduled listeners.
+
+        This method must be run in the event loop.
+        """
+        return {
+            'point_in_time': sum(1 for entry in self._points
+                                 if entry[2] is not None),
+            'pattern': sum(len(listeners) for listeners
+                           in self._wheel.values()),
+            'every_tick': len(self._every_tick),
+        }
+
+    @callback
+    def async_track_point_in_utc_time(self, point_in_time, listener):
+        """Call listener once with now when point_in_time has passed.
+
+        Returns a function that can be called to remove the listener.
+
+        This method must be run in the event loop.
+        """
+        entry = [point_in_time, next(self._counter), listener]
+        heapq.heappush(self._points, entry)
+        self._async_ensure_ticking()
+
+        @callback
+        def remove_listener():
+            """Remove the listener."""
+            entry[2] = None
+
+        return remove_listener
+
+    @callback
+    def async_track_seconds(self, seconds, listener):
+        """Call listener with now on each tick within seconds.
+
+        seconds is an iterable of seconds of the minute to wake up on or None
+        to wake up on every tick.
+
+        Returns a function that can be called to remove the listener.
+
+        This method must be run in the event loop.
+        """
+        if seconds is None:
+            slots = [self._every_tick]
+        else:
+            slots = [self._wheel.setdefault(second, [])
+                     for second in set(seconds)]
+
+        for slot in slots:
+            slot.append(listener)
+
+        self._async_ensure_ticking()
+
+        @callback
+        def remove_listener():
+            """Remove the listener."""
+            for slot in slots:
+                try:
+                    slot.remove(listener)
+                except ValueError:
+                    pass
+
+        return remove_listener
+
+    @callback
+    def _async_ensure_ticking(self):
+        """Listen for time changed events if not done yet."""
+        if self._unsub_tick is None:
+            self._unsub_tick = self._bus.async_listen(
+                EVENT_TIME_CHANGED, self._async_tick)
+
+    @callback
+    def _async_tick(self, event):
+        """Wake up the listeners that are due for this time changed event."""
+        now = event.data[ATTR_NOW]
+        points = self._points
+        due = []
+
+        while points and points[0][0] <= now:
+            entry = heapq.heappop(points)
+
+            if entry[2] is not None:
+                due.append(entry[2])
+                entry[2] = None
+
+        due.extend(self._every_tick)
+        due.extend(self._wheel.get(now.second, ()))
+
+        for listener in due:
+            try:
+                listener(now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error running time listener %s', listener)
+
+
+class StateChangeDispatcher(object):
+    """Dispatch state changed events to listeners by entity id.
+
+    A single state changed listener is registered on the bus. Each event
+    only invokes the listeners that track its entity id plus the ones that
+    track all entities.
+    """
+
+    def __init__(self, bus: EventBus, loop) -> None:
+        """Initialize the state change dispatcher."""
+        self._bus = bus
+        self._loop = loop
+        self._listeners = {}
+        self._unsub_state_changed = None
+
+    @callback
+    def async_listeners(self):
+        """Dict with entity ids and the number of listeners.
+
+        This method must be run in the event loop.
+        """
+        return {key: len(self._listeners[key])
+                for key in self._listeners}
+
+    @property
+    def listeners(self):
+        """Dict with entity ids and the number of listeners."""
+        return run_callback_threadsafe(
+            self._loop, self.async_listeners
+        ).result()
+
+    @callback
+    def async_track(self, entity_ids, listener):
+        """Call listener with the state changed events of entity_ids.
+
+        entity_ids is an iterable of lowercase entity ids or ``MATCH_ALL``
+        to receive the state changed events of all entities.
+
+        Returns a function that can be called to remove the listener.
+
+        This method must be run in the event loop.
+        """
+        keys = (MATCH_ALL,) if entity_ids == MATCH_ALL else set(entity_ids)
+
+        for key in keys:
+            if key in self._listeners:
+                self._listeners[key].append(listener)
+            else:
+                self._listeners[key] = [listener]
+
+        if self._unsub_state_changed is None:
+            self._unsub_state_changed = self._bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed)
+
+        @callback
+        def remove_listener():
+            """Remove the listener."""
+            for key in keys:
+                listeners = self._listeners.get(key)
+
+                if listeners is None or listener not in listeners:
+                    continue
+
+                listeners.remove(listener)
+
+                if not listeners:
+                    self._listeners.pop(key)
+
+        return remove_listener
+
+    @callback
+    def _async_state_changed(self, event):
+        """Invoke the listeners tracking the entity of the event."""
+        get = self._listeners.get
+        listeners = get(MATCH_ALL, []) + get(event.data.get('entity_id'), [])
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Error running state listener %s',
+                                  listener)
+
+
 class State(object):
     """Object to represent a state within the state machine.
 
@@ -561,8 +887,8 @@ class State(object):
     last_updated: last time this object was updated.
     """
 
-    __slots__ = ['entity_id', 'state', 'attributes',
-                 'last_changed', 'last_updated']
+    __slots__ = ['entity_id', 'state', 'attributes', 'domain', 'object_id',
+                 'last_changed', 'last_updated', '_as_json']
 
     def __init__(self, entity_id, state, attributes=None, last_changed=None,
                  last_updated=None):
@@ -573,21 +899,16 @@ class State(object):
                 "Format should be <domain>.<object_id>").format(entity_id))
 
         self.entity_id = entity_id.lower()
+        self.domain, self.object_id = split_entity_id(self.entity_id)
         self.state = str(state)
-        self.attributes = MappingProxyType(attributes or {})
+        if isinstance(attributes, MappingProxyType):
+            self.attributes = attributes
+        else:
+            self.attributes = MappingProxyType(attributes or {})
         self.last_updated = last_updated or dt_util.utcnow()
 
         self.last_changed = last_changed or self.last_updated
-
-    @property
-    def domain(self):
-        """Domain of this state."""
-        return split_entity_id(self.entity_id)[0]
-
-    @property
-    def object_id(self):
-        """Object id of this state."""
-        return split_entity_id(self.entity_id)[1]
+        self._as_json = None
 
     @property
     def name(self):
@@ -610,6 +931,19 @@ class State(object):
                 'last_changed': self.last_changed,
                 'last_updated': self.last_updated}
 
+    def as_json(self):
+        """Return the JSON representation of the State.
+
+        States are immutable so it is only encoded once.
+
+        Async friendly.
+        """
+        if self._as_json is None:
+            self._as_json = json.dumps(
+                self.as_dict(), sort_keys=True, cls=JSONEncoder)
+
+        return self._as_json
+
     @classmethod
     def from_dict(cls, json_dict):
         """Initialize a state from a dict.
@@ -652,12 +986,74 @@ class State(object):
             dt_util.as_local(self.last_changed).isoformat())
 
 
+class JSONEncoder(json.JSONEncoder):
+    """JSONEncoder that supports Home Assistant objects."""
+
+    # pylint: disable=method-hidden
+    def default(self, obj):
+        """Convert Home Assistant objects.
+
+        Hand other objects to the original method.
+        """
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        elif hasattr(obj, 'as_dict'):
+            return obj.as_dict()
+
+        try:
+            return json.JSONEncoder.default(self, obj)
+        except TypeError:
+            # If the JSON serializer couldn't serialize it
+            # it might be a generator, convert it to a list
+            try:
+                return [self.default(child_obj)
+                        for child_obj in obj]
+            except TypeError:
+                # Ok, we're lost, cause the original error
+                return json.JSONEncoder.default(self, obj)
+
+
+def _contains_state(values):
+    """Return if any of the values is a State or an Event."""
+    return any(isinstance(value, (State, Event)) for value in values)
+
+
+def json_dumps(obj):
+    """Encode obj as JSON with sorted keys.
+
+    States, also when they are part of an event or directly inside a list or
+    dict, use their memoized JSON. Everything else is encoded by JSONEncoder.
+
+    Async friendly.
+    """
+    if isinstance(obj, State):
+        return obj.as_json()
+    elif isinstance(obj, Event):
+        obj = obj.as_dict()
+        obj['data'] = json_dumps(obj['data'])
+        return '{' + ', '.join(
+            '{}: {}'.format(json.dumps(key), value if key == 'data' else
+                            json.dumps(value, cls=JSONEncoder))
+            for key, value in sorted(obj.items())) + '}'
+
+    if isinstance(obj, dict) and _contains_state(obj.values()):
+        return '{' + ', '.join(
+            '{}: {}'.format(json.dumps(str(key)), json_dumps(value))
+            for key, value in sorted(obj.items())) + '}'
+    elif isinstance(obj, (list, tuple)) and _contains_state(obj):
+        return '[' + ', '.join(json_dumps(item) for item in obj) + ']'
+
+    return json.dumps(obj, sort_keys=True, cls=JSONEncoder)
+
+
 class StateMachine(object):
     """Helper class that tracks the state of different entities."""
 
     def __init__(self, bus, loop):
         """Initialize state machine."""
         self._states = {}
+        # Sorted entity ids per domain
+        self._domains = {}
         self._bus = bus
         self._loop = loop
 
@@ -677,10 +1073,7 @@ class StateMachine(object):
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
-
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+        return list(self._domains.get(domain_filter.lower(), ()))
 
     def all(self):
         """Create a list of all states."""
@@ -694,6 +1087,20 @@ class StateMachine(object):
         """
         return list(self._states.values())
 
+    @callback
+    def async_sorted(self, domain_filter=None):
+        """Create a list of states sorted by entity id.
+
+        This method must be run in the event loop.
+        """
+        if domain_filter is not None:
+            domains = (domain_filter.lower(),)
+        else:
+            domains = sorted(self._domains)
+
+        return [self._states[entity_id] for domain in domains
+                for entity_id in self._domains.get(domain, ())]
+
     def get(self, entity_id):
         """Retrieve state of entity_id or None if not found.
 
@@ -742,6 +1149,8 @@ class StateMachine(object):
         if old_state is None:
             return False
 
+        self._index_remove(entity_id)
+
         event_data = {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -797,6 +1206,9 @@ class StateMachine(object):
         state = State(entity_id, new_state, attributes, last_changed)
         self._states[entity_id] = state
 
+        if not is_existing:
+            self._index_add(entity_id)
+
         event_data = {
             'entity_id': entity_id,
             'old_state': old_state,
@@ -805,6 +1217,20 @@ class StateMachine(object):
 
         self._bus.async_fire(EVENT_STATE_CHANGED, event_data)
 
+    def _index_add(self, entity_id):
+        """Add a new entity id to the domain index."""
+        domain = split_entity_id(entity_id)[0]
+        bisect.insort(self._domains.setdefault(domain, []), entity_id)
+
+    def _index_remove(self, entity_id):
+        """Remove an entity id from the domain index."""
+        domain = split_entity_id(entity_id)[0]
+        entity_ids = self._domains[domain]
+        del entity_ids[bisect.bisect_left(entity_ids, entity_id)]
+
+        if not entity_ids:
+            del self._domains[domain]
+
 
 class Service(object):
     """Represents a callable service."""
@@ -1059,7 +1485,7 @@ class ServiceRegistry(object):
                 service_handler.func(service_call)
                 fire_service_executed()
 
-            self._async_add_job(execute_service)
+            self._async_add_job(execute_service, pool=POOL_SERVICES)
 
     def _generate_unique_id(self):
         """Generate a unique service call id."""
@@ -1082,6 +1508,9 @@ class Config(object):
         # If True, pip install is skipped for requirements on startup
         self.skip_pip = False  # type: bool
 
+        # Number of components that are set up at the same time on startup
+        self.setup_concurrency = DEFAULT_SETUP_CONCURRENCY  # type: int
+
         # List of loaded components
         self.components = []
 
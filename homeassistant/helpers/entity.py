@@ -10,7 +10,7 @@ from homeassistant.const import (
     ATTR_UNIT_OF_MEASUREMENT, DEVICE_DEFAULT_NAME, STATE_OFF, STATE_ON,
     STATE_UNAVAILABLE, STATE_UNKNOWN, TEMP_CELSIUS, TEMP_FAHRENHEIT,
     ATTR_ENTITY_PICTURE)
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, POOL_POLLING
 from homeassistant.exceptions import NoEntitySpecifiedError
 from homeassistant.util import ensure_unique_string, slugify
 from homeassistant.util.async import (
@@ -207,9 +207,8 @@ class Entity(object):
                 # pylint: disable=no-member
                 yield from self.async_update()
             else:
-                # PS: Run this in our own thread pool once we have
-                #     future support?
-                yield from self.hass.loop.run_in_executor(None, self.update)
+                yield from self.hass.loop.run_in_executor(
+                    self.hass.executors[POOL_POLLING], self.update)
 
         start = timer()
 
@@ -7,7 +7,7 @@ from homeassistant.bootstrap import (
 from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_SCAN_INTERVAL, CONF_ENTITY_NAMESPACE,
     DEVICE_DEFAULT_NAME)
-from homeassistant.core import callback, valid_entity_id
+from homeassistant.core import POOL_POLLING, callback, valid_entity_id
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import get_component
 from homeassistant.helpers import config_per_platform, discovery
@@ -18,6 +18,10 @@ from homeassistant.util.async import (
     run_callback_threadsafe, run_coroutine_threadsafe)
 
 DEFAULT_SCAN_INTERVAL = 15
+# Sync entities of a platform that are updated at the same time
+DEFAULT_PARALLEL_UPDATES = 2
+# Seconds after which a slow update no longer holds up other entities
+UPDATE_TIMEOUT = 10
 
 
 class EntityComponent(object):
@@ -130,11 +134,14 @@ class EntityComponent(object):
                          self.scan_interval)
         entity_namespace = platform_config.get(CONF_ENTITY_NAMESPACE)
 
+        parallel_updates = getattr(
+            platform, 'PARALLEL_UPDATES', DEFAULT_PARALLEL_UPDATES)
+
         key = (platform_type, scan_interval, entity_namespace)
 
         if key not in self._platforms:
-            self._platforms[key] = EntityPlatform(self, scan_interval,
-                                                  entity_namespace)
+            self._platforms[key] = EntityPlatform(
+                self, scan_interval, entity_namespace, parallel_updates)
         entity_platform = self._platforms[key]
 
         try:
@@ -179,7 +186,8 @@ class EntityComponent(object):
             if hasattr(entity, 'async_update'):
                 yield from entity.async_update()
             else:
-                yield from self.hass.loop.run_in_executor(None, entity.update)
+                yield from self.hass.loop.run_in_executor(
+                    self.hass.executors[POOL_POLLING], entity.update)
 
         if getattr(entity, 'entity_id', None) is None:
             object_id = entity.name or DEVICE_DEFAULT_NAME
@@ -283,14 +291,23 @@ class EntityComponent(object):
 class EntityPlatform(object):
     """Keep track of entities for a single platform and stay in loop."""
 
-    def __init__(self, component, scan_interval, entity_namespace):
+    def __init__(self, component, scan_interval, entity_namespace,
+                 parallel_updates=DEFAULT_PARALLEL_UPDATES):
         """Initalize the entity platform."""
         self.component = component
         self.scan_interval = scan_interval
         self.entity_namespace = entity_namespace
         self.platform_entities = []
         self._async_unsub_polling = None
-        self._process_updates = False
+        # Entity ids with an update that is scheduled or still running
+        self._updating = set()
+        self._async_scheduled_updates = {}
+        self._update_slots = asyncio.Semaphore(
+            parallel_updates, loop=component.hass.loop)
+
+        # Updates are spread over the shortest time between two polls
+        seconds = range(0, 60, scan_interval)
+        self._poll_window = min(scan_interval, 60 - seconds[-1])
 
     def add_entities(self, new_entities, update_before_add=False):
         """Add entities for a single platform."""
@@ -321,7 +338,7 @@ class EntityPlatform(object):
             return
 
         self._async_unsub_polling = async_track_utc_time_change(
-            self.component.hass, self._update_entity_states,
+            self.component.hass, self._async_update_entity_states,
             second=range(0, 60, self.scan_interval))
 
     @asyncio.coroutine
@@ -350,37 +367,81 @@ class EntityPlatform(object):
             self._async_unsub_polling()
             self._async_unsub_polling = None
 
-    @asyncio.coroutine
-    def _update_entity_states(self, now):
-        """Update the states of all the polling entities.
+        for handle in self._async_scheduled_updates.values():
+            handle.cancel()
+        self._updating.difference_update(self._async_scheduled_updates)
+        self._async_scheduled_updates.clear()
+
+    @callback
+    def _async_update_entity_states(self, now):
+        """Start updating the states of all the polling entities.
 
-        To protect from flooding the executor, we will update async entities
-        in parallel and other entities sequential.
+        The updates are staggered over the poll window. Entities that are
+        still updating since the previous poll are skipped.
 
         This method must be run in the event loop.
         """
-        if self._process_updates:
-            return
-        self._process_updates = True
+        polling = [entity for entity in self.platform_entities
+                   if entity.should_poll]
+
+        for index, entity in enumerate(polling):
+            if entity.entity_id in self._updating:
+                self.component.logger.debug(
+                    'Skipping update of %s, previous update is still running',
+                    entity.entity_id)
+                continue
+
+            self._updating.add(entity.entity_id)
+            delay = self._poll_window * index / len(polling)
+
+            if delay:
+                self._async_scheduled_updates[entity.entity_id] = \
+                    self.component.hass.loop.call_later(
+                        delay, self._async_start_update, entity)
+            else:
+                self._async_start_update(entity)
 
-        try:
-            tasks = []
-            to_update = []
+    @callback
+    def _async_start_update(self, entity):
+        """Start the update of an entity.
+
+        This method must be run in the event loop.
+        """
+        self._async_scheduled_updates.pop(entity.entity_id, None)
+        self.component.hass.async_add_job(self._async_update_entity(entity))
 
-            for entity in self.platform_entities:
-                if not entity.should_poll:
-                    continue
+    @asyncio.coroutine
+    def _async_update_entity(self, entity):
+        """Update the state of an entity.
 
-                update_coro = entity.async_update_ha_state(True)
-                if hasattr(entity, 'async_update'):
-                    tasks.append(update_coro)
-                else:
-                    to_update.append(update_coro)
+        Sync entities wait for one of the update slots of the platform, so
+        they can not flood the executor. After UPDATE_TIMEOUT seconds the
+        slot is given to the next entity while the update continues.
 
-            for update_coro in to_update:
-                yield from update_coro
+        This method must be run in the event loop.
+        """
+        loop = self.component.hass.loop
 
-            if tasks:
-                yield from asyncio.wait(tasks, loop=self.component.hass.loop)
+        try:
+            if hasattr(entity, 'async_update'):
+                update = loop.create_task(entity.async_update_ha_state(True))
+                yield from asyncio.wait(
+                    [update], timeout=UPDATE_TIMEOUT, loop=loop)
+            else:
+                with (yield from self._update_slots):
+                    update = loop.create_task(
+                        entity.async_update_ha_state(True))
+                    yield from asyncio.wait(
+                        [update], timeout=UPDATE_TIMEOUT, loop=loop)
+
+            if not update.done():
+                self.component.logger.warning(
+                    'Update of %s is taking over %d seconds',
+                    entity.entity_id, UPDATE_TIMEOUT)
+
+            yield from update
+        except Exception:  # pylint: disable=broad-except
+            self.component.logger.exception(
+                'Error while updating %s', entity.entity_id)
         finally:
-            self._process_updates = False
+            self._updating.discard(entity.entity_id)
@@ -3,8 +3,7 @@ import functools as ft
 from datetime import timedelta
 
 from ..core import HomeAssistant, callback
-from ..const import (
-    ATTR_NOW, EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL)
+from ..const import MATCH_ALL
 from ..util import dt as dt_util
 from ..util.async import run_callback_threadsafe
 
@@ -59,10 +58,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     @callback
     def state_change_listener(event):
         """The listener that listens for specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         if event.data.get('old_state') is not None:
             old_state = event.data['old_state'].state
         else:
@@ -78,12 +73,75 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
                                event.data.get('old_state'),
                                event.data.get('new_state'))
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    return hass.state_dispatcher.async_track(entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+def async_track_template_states(hass, template, action):
+    """Track the states read by the last render of a template.
+
+    The tracked states are updated each time the template is rendered. Until
+    the template has been rendered, or while its render reads no states (for
+    example because it failed before reading any), all state changes are
+    tracked.
+
+    Returns a function that can be called to remove the listener.
+
+    Must be run within the event loop.
+    """
+    remove_states = None
+    info = None
+
+    @callback
+    def domain_listener(entity_id, old_state, new_state):
+        """Forward state changes of the read entities and domains."""
+        if entity_id in info.entities or \
+           entity_id.split('.', 1)[0] in info.domains:
+            hass.async_run_job(action, entity_id, old_state, new_state)
+
+    @callback
+    def async_track_render_info(render_info):
+        """Subscribe to the states read by the render."""
+        nonlocal remove_states, info
+
+        if render_info is not None and render_info == info:
+            return
+
+        if remove_states is not None:
+            remove_states()
+            remove_states = None
+
+        info = render_info
+
+        if info is None or info.all_states or \
+           not (info.domains or info.entities):
+            remove_states = async_track_state_change(hass, MATCH_ALL, action)
+        elif info.domains:
+            remove_states = async_track_state_change(
+                hass, MATCH_ALL, domain_listener)
+        else:
+            remove_states = async_track_state_change(
+                hass, info.entities, action)
+
+    async_track_render_info(template.render_info)
+    remove_render = template.async_add_render_listener(async_track_render_info)
+
+    @callback
+    def remove_listener():
+        """Remove the template state listener."""
+        remove_render()
+        if remove_states is not None:
+            remove_states()
+
+    return remove_listener
+
+
+track_template_states = threaded_listener_factory(
+    async_track_template_states)
+
+
 def async_track_point_in_time(hass, action, point_in_time):
     """Add a listener that fires once after a spefic point in time."""
     utc_point_in_time = dt_util.as_utc(point_in_time)
@@ -106,27 +164,12 @@ def async_track_point_in_utc_time(hass, action, point_in_time):
     point_in_time = dt_util.as_utc(point_in_time)
 
     @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
-            return
-
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
-
+    def point_in_time_listener(now):
+        """Run action once the point in time has passed."""
         hass.async_run_job(action, now)
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
-
-    return async_unsub
+    return hass.scheduler.async_track_point_in_utc_time(
+        point_in_time, point_in_time_listener)
 
 
 track_point_in_utc_time = threaded_listener_factory(
@@ -211,21 +254,19 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
     # if no pattern given
     if all(val is None for val in (year, month, day, hour, minute, second)):
         @callback
-        def time_change_listener(event):
+        def time_change_listener(now):
             """Fire every time event that comes in."""
-            hass.async_run_job(action, event.data[ATTR_NOW])
+            hass.async_run_job(action, now)
 
-        return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
+        return hass.scheduler.async_track_seconds(None, time_change_listener)
 
     pmp = _process_time_match
     year, month, day = pmp(year), pmp(month), pmp(day)
     hour, minute, second = pmp(hour), pmp(minute), pmp(second)
 
     @callback
-    def pattern_time_change_listener(event):
+    def pattern_time_change_listener(now):
         """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
         if local:
             now = dt_util.as_local(now)
         mat = _matcher
@@ -240,8 +281,8 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
 
             hass.async_run_job(action, now)
 
-    return hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                 pattern_time_change_listener)
+    return hass.scheduler.async_track_seconds(
+        _wheel_seconds(second), pattern_time_change_listener)
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
@@ -279,6 +320,18 @@ def _process_time_match(parameter):
         return tuple(parameter)
 
 
+def _wheel_seconds(pattern):
+    """Return the seconds a processed second pattern can match on.
+
+    Returns None if the pattern can match on any second.
+    """
+    if isinstance(pattern, tuple) and \
+       all(isinstance(second, int) for second in pattern):
+        return pattern
+
+    return None
+
+
 def _matcher(subject, pattern):
     """Return True if subject matches the pattern.
 
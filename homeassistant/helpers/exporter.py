@@ -0,0 +1,271 @@
+"""Helpers to export state changes to external services."""
+import logging
+import queue
+import threading
+import time
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_EXPORTERS = 'exporters'
+
+# What to drop when an exporter can not keep up and its queue is full
+DROP_NEWEST = 'newest'
+DROP_OLDEST = 'oldest'
+
+
+def generate_filter(include_entities=None, exclude_entities=None,
+                    include_domains=None, exclude_domains=None):
+    """Return a function that tells if a state of an entity is exported.
+
+    Excludes win over includes. Without includes all entities that are not
+    excluded are exported.
+    """
+    include_entities = frozenset(include_entities or ())
+    exclude_entities = frozenset(exclude_entities or ())
+    include_domains = frozenset(include_domains or ())
+    exclude_domains = frozenset(exclude_domains or ())
+
+    if not (include_entities or include_domains or
+            exclude_entities or exclude_domains):
+        return lambda entity_id: True
+
+    include_all = not (include_entities or include_domains)
+
+    def entity_filter(entity_id):
+        """Return True if the entity should be exported."""
+        if entity_id in exclude_entities:
+            return False
+
+        if entity_id in include_entities:
+            return True
+
+        if include_domains or exclude_domains:
+            domain = entity_id.split('.', 1)[0]
+
+            if domain in exclude_domains:
+                return False
+
+            if domain in include_domains:
+                return True
+
+        return include_all
+
+    return entity_filter
+
+
+class Exporter(threading.Thread):
+    """Export state changes to an external service from a worker thread.
+
+    State changes of entities passing the filter are queued from the event
+    loop and exported in batches by the worker, so a slow service only
+    delays its own exporter. Subclasses implement `export`.
+    """
+
+    # Maximum number of events waiting to be exported
+    queue_size = 10000
+    drop_policy = DROP_NEWEST
+    # Maximum number of events and seconds to collect for one export
+    batch_size = 100
+    flush_interval = 1
+    # Exceptions after which an export is retried retry_count times,
+    # doubling the delay each time
+    retry_exceptions = ()
+    retry_count = 3
+    retry_delay = 1
+    # Maximum number of seconds shutdown waits for the queue to be exported
+    shutdown_timeout = 10
+
+    def __init__(self, hass, name, entity_filter=None):
+        """Initialize the exporter."""
+        super().__init__(name=name, daemon=True)
+        self.hass = hass
+        self.entity_filter = entity_filter or generate_filter()
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._quit_object = object()
+        self._overflowing = False
+        self._stopping = threading.Event()
+
+    def register(self):
+        """Start the worker and export state changes until shutdown."""
+        exporters = self.hass.data.get(DATA_EXPORTERS)
+        if exporters is None:
+            exporters = self.hass.data[DATA_EXPORTERS] = {}
+        exporters[self.name] = self
+
+        self.hass.bus.listen(EVENT_STATE_CHANGED, self.event_listener)
+        self.hass.bus.listen_once(EVENT_HOMEASSISTANT_STOP, self.shutdown)
+        self.start()
+
+    @callback
+    def event_listener(self, event):
+        """Queue a state change if the filter passes the entity."""
+        state = event.data.get('new_state')
+
+        if state is not None and self.entity_filter(state.entity_id):
+            self.add(event)
+
+    def add(self, item):
+        """Queue an item without blocking, applying the drop policy."""
+        try:
+            self.queue.put_nowait(item)
+            self._overflowing = False
+            return
+        except queue.Full:
+            self.dropped += 1
+
+        if not self._overflowing:
+            self._overflowing = True
+            _LOGGER.warning('Export queue of %s is full, dropping %s events '
+                            '(%d dropped so far)', self.name,
+                            self.drop_policy, self.dropped)
+
+        if self.drop_policy != DROP_OLDEST:
+            return
+
+        try:
+            oldest = self.queue.get_nowait()
+        except queue.Empty:
+            oldest = None
+        else:
+            self.queue.task_done()
+
+        # Never drop the request to stop
+        if oldest is self._quit_object:
+            item = oldest
+
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            pass
+
+    def metrics(self):
+        """Return the backpressure metrics of the exporter."""
+        return {
+            'queued': self.queue.qsize(),
+            'exported': self.exported,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    def export(self, events):
+        """Export a batch of state changed events.
+
+        Called from the worker thread. Returns the number of events the
+        service rejected, if some of them were exported anyway.
+        """
+        raise NotImplementedError()
+
+    def stop(self):
+        """Stop the worker once the queued events are exported.
+
+        Failed exports are no longer retried. Never blocks, the oldest
+        events are dropped if the queue is full.
+        """
+        self._stopping.set()
+
+        while True:
+            try:
+                self.queue.put_nowait(self._quit_object)
+                return
+            except queue.Full:
+                pass
+
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                continue
+
+            self.queue.task_done()
+            self.dropped += 1
+
+    def shutdown(self, event):
+        """Export the queued events and stop the worker.
+
+        Waits at most shutdown_timeout seconds for the worker.
+        """
+        self.stop()
+        self.join(self.shutdown_timeout)
+
+        if self.is_alive():
+            _LOGGER.warning('Export to %s did not finish within %ds, '
+                            'dropping %d events', self.name,
+                            self.shutdown_timeout, self.queue.qsize())
+
+    def run(self):
+        """Export batches of events until stopped."""
+        while True:
+            items, count, stop = self._get_batch()
+
+            if items:
+                self._export(items)
+
+            for _ in range(count):
+                self.queue.task_done()
+
+            if stop:
+                return
+
+    def _get_batch(self):
+        """Wait for items and collect up to batch_size of them.
+
+        Returns the items, the number of queue items taken and if the
+        worker should stop.
+        """
+        item = self.queue.get()
+
+        if item is self._quit_object:
+            return [], 1, True
+
+        items = [item]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(items) < self.batch_size:
+            try:
+                item = self.queue.get(
+                    timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+
+            if item is self._quit_object:
+                return items, len(items) + 1, True
+
+            items.append(item)
+
+        return items, len(items), False
+
+    def _export(self, items):
+        """Export items, retrying with a backoff if the service is down."""
+        delay = self.retry_delay
+
+        for retry in range(self.retry_count + 1):
+            try:
+                rejected = self.export(items) or 0
+                self.exported += len(items) - rejected
+                self.failed += rejected
+                return
+            except self.retry_exceptions as err:
+                if retry == self.retry_count or self._stopping.is_set():
+                    _LOGGER.error('Error exporting to %s: %s', self.name, err)
+                    break
+
+                _LOGGER.warning('Error exporting to %s, retrying in %ds: %s',
+                                self.name, delay, err)
+                # Stop waiting when stopping, the next attempt is the last
+                self._stopping.wait(delay)
+                delay *= 2
+            except Exception:  # pylint: disable=broad-except
+                # Keep the worker alive, retrying will not help
+                _LOGGER.exception('Error exporting to %s', self.name)
+                break
+
+        self.failed += len(items)
+
+    def block_till_done(self):
+        """Block till all queued events are exported."""
+        self.queue.join()
@@ -19,12 +19,9 @@ def closest(latitude: float, longitude: float,
     """Return closest state to point."""
     with_location = [state for state in states if has_location(state)]
 
-    if not with_location:
-        return None
-
-    return min(
-        with_location,
-        key=lambda state: loc_util.distance(
-            latitude, longitude, state.attributes.get(ATTR_LATITUDE),
-            state.attributes.get(ATTR_LONGITUDE))
-    )
+    index, _ = loc_util.nearest(
+        latitude, longitude,
+        [(state.attributes[ATTR_LATITUDE], state.attributes[ATTR_LONGITUDE])
+         for state in with_location])
+
+    return None if index is None else with_location[index]
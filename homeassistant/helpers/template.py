@@ -1,7 +1,9 @@
 """Template helper methods for rendering strings with HA data."""
+from collections import OrderedDict
 import json
 import logging
 import re
+import threading
 
 import jinja2
 from jinja2.sandbox import ImmutableSandboxedEnvironment
@@ -17,7 +19,11 @@ from homeassistant.util.async import run_callback_threadsafe
 
 _LOGGER = logging.getLogger(__name__)
 _SENTINEL = object()
+# The RenderInfo of the template being rendered in the current thread
+_RENDERING = threading.local()
 DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Maximum number of compiled template sources kept in COMPILED_CACHE
+COMPILED_CACHE_SIZE = 512
 
 _RE_NONE_ENTITIES = re.compile(r"distance\(|closest\(", re.I | re.M)
 _RE_GET_ENTITIES = re.compile(
@@ -49,6 +55,49 @@ def extract_entities(template):
     return MATCH_ALL
 
 
+class RenderInfo(object):
+    """The states that were read while rendering a template."""
+
+    def __init__(self):
+        """Initialize an empty render info."""
+        self.entities = set()
+        self.domains = set()
+        self.all_states = False
+
+    def __eq__(self, other):
+        """Return if the same states were read."""
+        return (self.__class__ == other.__class__ and
+                self.entities == other.entities and
+                self.domains == other.domains and
+                self.all_states == other.all_states)
+
+    def __repr__(self):
+        """Return the representation of the render info."""
+        return '<RenderInfo entities={} domains={} all_states={}>'.format(
+            sorted(self.entities), sorted(self.domains), self.all_states)
+
+
+def _collect_entity(entity_id):
+    """Record that the state of entity_id is read by the render."""
+    info = getattr(_RENDERING, 'info', None)
+    if info is not None:
+        info.entities.add(entity_id.lower())
+
+
+def _collect_domain(domain):
+    """Record that the states of domain are read by the render."""
+    info = getattr(_RENDERING, 'info', None)
+    if info is not None:
+        info.domains.add(domain)
+
+
+def _collect_all_states():
+    """Record that all states are read by the render."""
+    info = getattr(_RENDERING, 'info', None)
+    if info is not None:
+        info.all_states = True
+
+
 class Template(object):
     """Class to hold a template and manage caching and rendering."""
 
@@ -60,6 +109,8 @@ class Template(object):
         self.template = template
         self._compiled_code = None
         self._compiled = None
+        self._render_listeners = []
+        self.render_info = None
         self.hass = hass
 
     def ensure_valid(self):
@@ -68,7 +119,7 @@ class Template(object):
             return
 
         try:
-            self._compiled_code = ENV.compile(self.template)
+            self._compiled_code = COMPILED_CACHE.compile(self.template)
         except jinja2.exceptions.TemplateSyntaxError as err:
             raise TemplateError(err)
 
@@ -76,6 +127,21 @@ class Template(object):
         """Extract all entities for state_changed listener."""
         return extract_entities(self.template)
 
+    def async_add_render_listener(self, listener):
+        """Call listener with the RenderInfo after each render.
+
+        Returns a function that can be called to remove the listener.
+
+        This method must be run in the event loop.
+        """
+        self._render_listeners.append(listener)
+
+        def remove_listener():
+            """Remove the render listener."""
+            self._render_listeners.remove(listener)
+
+        return remove_listener
+
     def render(self, variables=None, **kwargs):
         """Render given template."""
         if variables is not None:
@@ -95,7 +161,7 @@ class Template(object):
             kwargs.update(variables)
 
         try:
-            return self._compiled.render(kwargs).strip()
+            return self._render(kwargs)
         except jinja2.TemplateError as err:
             raise TemplateError(err)
 
@@ -128,12 +194,25 @@ class Template(object):
             pass
 
         try:
-            return self._compiled.render(variables).strip()
+            return self._render(variables)
         except jinja2.TemplateError as ex:
             _LOGGER.error('Error parsing value: %s (value: %s, template: %s)',
                           ex, value, self.template)
             return value if error_value is _SENTINEL else error_value
 
+    def _render(self, variables):
+        """Render the compiled template and record the states it read."""
+        info = RenderInfo()
+        _RENDERING.info = info
+
+        try:
+            return self._compiled.render(variables).strip()
+        finally:
+            _RENDERING.info = None
+            self.render_info = info
+            for listener in list(self._render_listeners):
+                listener(info)
+
     def _ensure_compiled(self):
         """Bind a template to a specific hass instance."""
         if self._compiled is not None:
@@ -148,8 +227,8 @@ class Template(object):
         global_vars = ENV.make_globals({
             'closest': location_methods.closest,
             'distance': location_methods.distance,
-            'is_state': self.hass.states.is_state,
-            'is_state_attr': self.hass.states.is_state_attr,
+            'is_state': self._is_state,
+            'is_state_attr': self._is_state_attr,
             'states': AllStates(self.hass),
         })
 
@@ -158,6 +237,16 @@ class Template(object):
 
         return self._compiled
 
+    def _is_state(self, entity_id, state):
+        """Test if entity exists and is in the specified state."""
+        _collect_entity(entity_id)
+        return self.hass.states.is_state(entity_id, state)
+
+    def _is_state_attr(self, entity_id, name, value):
+        """Test if entity exists and has the specified attribute value."""
+        _collect_entity(entity_id)
+        return self.hass.states.is_state_attr(entity_id, name, value)
+
     def __eq__(self, other):
         """Compare template with another."""
         return (self.__class__ == other.__class__ and
@@ -178,11 +267,12 @@ class AllStates(object):
 
     def __iter__(self):
         """Return all states."""
-        return iter(sorted(self._hass.states.async_all(),
-                           key=lambda state: state.entity_id))
+        _collect_all_states()
+        return iter(self._hass.states.async_sorted())
 
     def __call__(self, entity_id):
         """Return the states."""
+        _collect_entity(entity_id)
         state = self._hass.states.get(entity_id)
         return STATE_UNKNOWN if state is None else state.state
 
@@ -197,14 +287,14 @@ class DomainStates(object):
 
     def __getattr__(self, name):
         """Return the states."""
-        return self._hass.states.get('{}.{}'.format(self._domain, name))
+        entity_id = '{}.{}'.format(self._domain, name)
+        _collect_entity(entity_id)
+        return self._hass.states.get(entity_id)
 
     def __iter__(self):
         """Return the iteration over all the states."""
-        return iter(sorted(
-            (state for state in self._hass.states.async_all()
-             if state.domain == self._domain),
-            key=lambda state: state.entity_id))
+        _collect_domain(self._domain)
+        return iter(self._hass.states.async_sorted(self._domain))
 
 
 class LocationMethods(object):
@@ -271,9 +361,14 @@ class LocationMethods(object):
                 gr_entity_id = str(entities)
 
             group = get_component('group')
+            entity_ids = group.expand_entity_ids(self._hass, [gr_entity_id])
 
-            states = [self._hass.states.get(entity_id) for entity_id
-                      in group.expand_entity_ids(self._hass, [gr_entity_id])]
+            _collect_entity(gr_entity_id)
+            for entity_id in entity_ids:
+                _collect_entity(entity_id)
+
+            states = [self._hass.states.get(entity_id)
+                      for entity_id in entity_ids]
 
         return loc_helper.closest(latitude, longitude, states)
 
@@ -330,6 +425,7 @@ class LocationMethods(object):
         if isinstance(entity_id_or_state, State):
             return entity_id_or_state
         elif isinstance(entity_id_or_state, str):
+            _collect_entity(entity_id_or_state)
             return self._hass.states.get(entity_id_or_state)
         return None
 
@@ -408,6 +504,61 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         """Test if callback is safe."""
         return isinstance(obj, AllStates) or super().is_safe_callable(obj)
 
+
+class CompiledCache(object):
+    """LRU cache of compiled template code shared by all templates."""
+
+    def __init__(self, env, size):
+        """Initialize the cache."""
+        self._env = env
+        self._size = size
+        self._code = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, source):
+        """Return the compiled code of a template source."""
+        with self._lock:
+            code = self._code.get(source)
+
+            if code is not None:
+                self._code.move_to_end(source)
+                self.hits += 1
+                return code
+
+            self.misses += 1
+
+        # Compile outside the lock, an identical source compiling
+        # concurrently only results in a redundant compile.
+        code = self._env.compile(source)
+
+        with self._lock:
+            self._code[source] = code
+            self._code.move_to_end(source)
+
+            while len(self._code) > self._size:
+                self._code.popitem(last=False)
+
+        return code
+
+    def clear(self):
+        """Remove all compiled code and reset the counters."""
+        with self._lock:
+            self._code.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return the cache statistics."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._code),
+            'max_size': self._size,
+        }
+
+
 ENV = TemplateEnvironment()
 ENV.filters['round'] = forgiving_round
 ENV.filters['multiply'] = multiply
@@ -420,3 +571,5 @@ ENV.globals['now'] = dt_util.now
 ENV.globals['utcnow'] = dt_util.utcnow
 ENV.globals['as_timestamp'] = dt_util.as_timestamp
 ENV.globals['relative_time'] = dt_util.get_age
+
+COMPILED_CACHE = CompiledCache(ENV, COMPILED_CACHE_SIZE)
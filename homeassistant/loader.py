@@ -15,6 +15,7 @@ import logging
 import os
 import pkgutil
 import sys
+from time import monotonic
 
 from types import ModuleType
 # pylint: disable=unused-import
@@ -36,6 +37,9 @@ AVAILABLE_COMPONENTS = []  # type: List[str]
 # Dict of loaded components mapped name => module
 _COMPONENT_CACHE = {}  # type: Dict[str, ModuleType]
 
+# Seconds it took to import each loaded component
+IMPORT_TIMINGS = {}  # type: Dict[str, float]
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -136,6 +140,7 @@ def get_component(comp_name) -> Optional[ModuleType]:
             continue
 
         try:
+            start = monotonic()
             module = importlib.import_module(path)
 
             # In Python 3 you can import files from directories that do not
@@ -152,6 +157,7 @@ def get_component(comp_name) -> Optional[ModuleType]:
             _LOGGER.info("Loaded %s from %s", comp_name, path)
 
             _COMPONENT_CACHE[comp_name] = module
+            IMPORT_TIMINGS[comp_name] = monotonic() - start
 
             return module
 
@@ -8,10 +8,7 @@ For more details about the Python API, please refer to the documentation at
 https://home-assistant.io/developers/python_api/
 """
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
 import enum
-import json
 import logging
 import time
 import threading
@@ -25,7 +22,8 @@ import homeassistant.bootstrap as bootstrap
 import homeassistant.core as ha
 from homeassistant.const import (
     HTTP_HEADER_HA_AUTH, SERVER_PORT, URL_API, URL_API_EVENT_FORWARD,
-    URL_API_EVENTS, URL_API_EVENTS_EVENT, URL_API_SERVICES, URL_API_CONFIG,
+    URL_API_EVENTS, URL_API_EVENTS_BATCH, URL_API_EVENTS_EVENT,
+    URL_API_SERVICES, URL_API_CONFIG,
     URL_API_SERVICES_SERVICE, URL_API_STATES, URL_API_STATES_ENTITY,
     HTTP_HEADER_CONTENT_TYPE, CONTENT_TYPE_JSON)
 from homeassistant.exceptions import HomeAssistantError
@@ -34,6 +32,9 @@ METHOD_GET = "get"
 METHOD_POST = "post"
 METHOD_DELETE = "delete"
 
+# Seconds the event forwarder waits to collect events into one batch
+EVENT_FORWARD_WINDOW = 0.01
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -72,6 +73,11 @@ class API(object):
         if api_password is not None:
             self._headers[HTTP_HEADER_HA_AUTH] = api_password
 
+        # Keep-alive connections are pooled per API and thread, sessions
+        # are not thread safe
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
     def validate_api(self, force_validate: bool=False) -> bool:
         """Test if we can communicate with the API."""
         if self.status is None or force_validate:
@@ -79,19 +85,41 @@ class API(object):
 
         return self.status == APIStatus.OK
 
+    def close(self):
+        """Close the pooled connections."""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, {}
+
+        for session in sessions.values():
+            session.close()
+
+    def _get_session(self):
+        """Return the session of the calling thread."""
+        ident = threading.get_ident()
+        session = self._sessions.get(ident)
+
+        if session is None:
+            session = requests.Session()
+
+            with self._sessions_lock:
+                self._sessions[ident] = session
+
+        return session
+
     def __call__(self, method, path, data=None, timeout=5):
         """Make a call to the Home Assistant API."""
         if data is not None:
-            data = json.dumps(data, cls=JSONEncoder)
+            data = ha.json_dumps(data)
 
         url = urllib.parse.urljoin(self.base_url, path)
+        session = self._get_session()
 
         try:
             if method == METHOD_GET:
-                return requests.get(
+                return session.get(
                     url, params=data, timeout=timeout, headers=self._headers)
             else:
-                return requests.request(
+                return session.request(
                     method, url, data=data, timeout=timeout,
                     headers=self._headers)
 
@@ -124,13 +152,14 @@ class HomeAssistant(ha.HomeAssistant):
         self.remote_api = remote_api
 
         self.loop = loop or asyncio.get_event_loop()
-        self.executor = ThreadPoolExecutor(max_workers=5)
-        self.loop.set_default_executor(self.executor)
+        self._create_executors()
         self.loop.set_exception_handler(self._async_exception_handler)
         self._pending_tasks = []
         self._pending_sheduler = None
 
         self.bus = EventBus(remote_api, self)
+        self.scheduler = ha.TimeScheduler(self.bus)
+        self.state_dispatcher = ha.StateChangeDispatcher(self.bus, self.loop)
         self.services = ha.ServiceRegistry(self.bus, self.add_job, self.loop)
         self.states = StateMachine(self.bus, self.loop, self.remote_api)
         self.config = ha.Config()
@@ -219,6 +248,8 @@ class EventForwarder(object):
 
         self._lock = threading.Lock()
         self._async_unsub_listener = None
+        self._pending = []
+        self._forwarding = False
 
     @ha.callback
     def async_connect(self, api):
@@ -232,14 +263,22 @@ class EventForwarder(object):
 
         key = (api.host, api.port)
 
-        self._targets[key] = api
+        with self._lock:
+            self._targets[key] = api
 
     @ha.callback
     def async_disconnect(self, api):
         """Remove target from being forwarded to."""
         key = (api.host, api.port)
 
-        did_remove = self._targets.pop(key, None) is None
+        with self._lock:
+            target = self._targets.pop(key, None)
+
+        did_remove = target is None
+
+        if target is not None:
+            # Close the kept alive connections to the target
+            self.hass.async_add_job(target.close)
 
         if len(self._targets) == 0:
             # Remove event listener if no forwarding targets present
@@ -248,16 +287,68 @@ class EventForwarder(object):
 
         return did_remove
 
+    @ha.callback
     def _event_listener(self, event):
-        """Listen and forward all events."""
+        """Queue events and start forwarding them if not already busy."""
+        # We don't forward time events or, if enabled, non-local events
+        if event.event_type == ha.EVENT_TIME_CHANGED or \
+           (self.restrict_origin and event.origin != self.restrict_origin):
+            return
+
         with self._lock:
-            # We don't forward time events or, if enabled, non-local events
-            if event.event_type == ha.EVENT_TIME_CHANGED or \
-               (self.restrict_origin and event.origin != self.restrict_origin):
+            self._pending.append(event)
+
+            if self._forwarding:
                 return
 
-            for api in self._targets.values():
-                fire_event(api, event.event_type, event.data)
+            self._forwarding = True
+
+        self.hass.async_add_job(self._async_forward_events())
+
+    @asyncio.coroutine
+    def _async_forward_events(self):
+        """Wait a moment to collect a burst of events, then forward them.
+
+        This method is a coroutine.
+        """
+        yield from asyncio.sleep(EVENT_FORWARD_WINDOW, loop=self.hass.loop)
+        yield from self.hass.loop.run_in_executor(None, self._forward_events)
+
+    def _forward_events(self):
+        """Forward the queued events in batches until none are left.
+
+        Events that arrive while a batch is being sent are collected into
+        the next batch.
+        """
+        done = False
+
+        try:
+            while True:
+                with self._lock:
+                    events, self._pending = self._pending, []
+
+                    if not events:
+                        # Reset while holding the lock, so no new event is
+                        # left behind
+                        self._forwarding = False
+                        done = True
+                        return
+
+                    targets = list(self._targets.values())
+
+                data = [(event.event_type, event.data) for event in events]
+
+                for api in targets:
+                    try:
+                        fire_events(api, data)
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception(
+                            "Error forwarding %d events to %s",
+                            len(events), api.host)
+        finally:
+            if not done:
+                with self._lock:
+                    self._forwarding = False
 
 
 class StateMachine(ha.StateMachine):
@@ -286,40 +377,26 @@ class StateMachine(ha.StateMachine):
         """Discard current data and mirrors the remote state machine."""
         self._states = {state.entity_id: state for state
                         in get_states(self._api)}
+        self._domains = {}
+
+        for entity_id in self._states:
+            self._index_add(entity_id)
 
     def _state_changed_listener(self, event):
         """Listen for state changed events and applies them."""
+        entity_id = event.data['entity_id']
+
         if event.data['new_state'] is None:
-            self._states.pop(event.data['entity_id'], None)
+            if self._states.pop(entity_id, None) is not None:
+                self._index_remove(entity_id)
         else:
-            self._states[event.data['entity_id']] = event.data['new_state']
+            if entity_id not in self._states:
+                self._index_add(entity_id)
+            self._states[entity_id] = event.data['new_state']
 
 
-class JSONEncoder(json.JSONEncoder):
-    """JSONEncoder that supports Home Assistant objects."""
-
-    # pylint: disable=method-hidden
-    def default(self, obj):
-        """Convert Home Assistant objects.
-
-        Hand other objects to the original method.
-        """
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        elif hasattr(obj, 'as_dict'):
-            return obj.as_dict()
-
-        try:
-            return json.JSONEncoder.default(self, obj)
-        except TypeError:
-            # If the JSON serializer couldn't serialize it
-            # it might be a generator, convert it to a list
-            try:
-                return [self.default(child_obj)
-                        for child_obj in obj]
-            except TypeError:
-                # Ok, we're lost, cause the original error
-                return json.JSONEncoder.default(self, obj)
+# Kept here for backwards compatibility
+JSONEncoder = ha.JSONEncoder
 
 
 def validate_api(api):
@@ -416,6 +493,30 @@ def fire_event(api, event_type, data=None):
         _LOGGER.exception("Error firing event")
 
 
+def fire_events(api, events):
+    """Fire a list of (event_type, data) tuples at remote API in one call.
+
+    Falls back to firing the events one by one if the remote API does not
+    support batches.
+    """
+    data = [{'event_type': event_type, 'event_data': event_data}
+            for event_type, event_data in events]
+
+    try:
+        req = api(METHOD_POST, URL_API_EVENTS_BATCH, data)
+
+        if req.status_code == 404:
+            for event_type, event_data in events:
+                fire_event(api, event_type, event_data)
+
+        elif req.status_code != 200:
+            _LOGGER.error("Error firing events: %d - %s",
+                          req.status_code, req.text)
+
+    except HomeAssistantError:
+        _LOGGER.exception("Error firing events")
+
+
 def get_state(api, entity_id):
     """Query given API for state of entity_id."""
     try:
@@ -7,7 +7,7 @@ import logging
 from typing import List
 
 from homeassistant.config import get_default_config_dir
-from homeassistant.util.package import install_package
+from homeassistant.util.package import install_packages
 from homeassistant.bootstrap import mount_local_lib_path
 
 
@@ -39,10 +39,12 @@ def run(args: List) -> int:
     deps_dir = mount_local_lib_path(config_dir)
 
     logging.basicConfig(stream=sys.stdout, level=logging.INFO)
-    for req in getattr(script, 'REQUIREMENTS', []):
-        if not install_package(req, target=deps_dir):
-            print('Aborting scipt, could not install dependency', req)
-            return 1
+    failed = install_packages(getattr(script, 'REQUIREMENTS', []),
+                              target=deps_dir)
+    if failed:
+        print('Aborting scipt, could not install dependency',
+              ', '.join(failed))
+        return 1
 
     return script.run(args[1:])  # type: ignore
 
@@ -0,0 +1,106 @@
+"""Script to run benchmarks against the Home Assistant core."""
+import argparse
+import asyncio
+import logging
+from timeit import default_timer as timer
+
+from homeassistant import core
+from homeassistant.const import EVENT_STATE_CHANGED, MATCH_ALL
+
+BENCHMARKS = {}
+
+
+def run(args):
+    """Handle benchmark commandline script."""
+    parser = argparse.ArgumentParser(
+        description=("Run a Home Assistant benchmark."))
+    parser.add_argument(
+        '--script', choices=['benchmark'])
+    parser.add_argument('name', choices=BENCHMARKS)
+    parser.add_argument(
+        '--events', type=int, default=100000,
+        help="Number of events to fire")
+    parser.add_argument(
+        '--listeners', type=int, default=10,
+        help="Number of callback listeners per event type")
+
+    args = parser.parse_args(args)
+
+    # The bus logs every event it handles on info level.
+    logging.getLogger().setLevel(logging.WARNING)
+
+    loop = asyncio.new_event_loop()
+    hass = core.HomeAssistant(loop)
+    try:
+        duration = loop.run_until_complete(
+            BENCHMARKS[args.name](hass, args.events, args.listeners))
+    finally:
+        loop.run_until_complete(hass.async_stop())
+        loop.close()
+
+    print('Benchmark {} done in {:.3f}s: {:.0f} events/sec'.format(
+        args.name, duration, args.events / duration))
+    return 0
+
+
+def benchmark(func):
+    """Decorator to mark a benchmark."""
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+@benchmark
+@asyncio.coroutine
+def fire_events(hass, events, listeners):
+    """Fire events with callback listeners and return the duration."""
+    count = 0
+    event_done = asyncio.Event(loop=hass.loop)
+
+    @core.callback
+    def listener(event):
+        """Count the handled events."""
+        nonlocal count
+        count += 1
+        if count == events * listeners:
+            event_done.set()
+
+    for _ in range(listeners):
+        hass.bus.async_listen('benchmark_event', listener)
+
+    start = timer()
+
+    for _ in range(events):
+        hass.bus.async_fire('benchmark_event')
+
+    yield from event_done.wait()
+
+    return timer() - start
+
+
+@benchmark
+@asyncio.coroutine
+def state_changed_events(hass, events, listeners):
+    """Fire state changed events with MATCH_ALL listeners."""
+    count = 0
+    event_done = asyncio.Event(loop=hass.loop)
+
+    @core.callback
+    def listener(event):
+        """Count the handled events."""
+        nonlocal count
+        count += 1
+        if count == events * listeners * 2:
+            event_done.set()
+
+    for _ in range(listeners):
+        hass.bus.async_listen(EVENT_STATE_CHANGED, listener)
+        hass.bus.async_listen(MATCH_ALL, listener)
+
+    start = timer()
+
+    for i in range(events):
+        hass.states.async_set('sensor.benchmark', i)
+
+    yield from event_done.wait()
+
+    return timer() - start
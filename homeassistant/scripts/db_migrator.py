@@ -1,12 +1,13 @@
 """Script to convert an old-format home-assistant.db to a new format one."""
 
 import argparse
+import json
 import os.path
 import sqlite3
 import sys
 
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 import homeassistant.config as config_util
 import homeassistant.util.dt as dt_util
@@ -46,12 +47,82 @@ def print_progress(iteration: int, total: int, prefix: str='', suffix: str='',
         print("\n")
 
 
+def get_attributes_id(session, attributes_ids: Dict[str, int],
+                      attributes: str) -> int:
+    """Return the id of the shared attributes row, add it if needed."""
+    from homeassistant.components.recorder import models
+
+    shared_attrs = json.dumps(json.loads(attributes), sort_keys=True)
+    attributes_hash = models.StateAttributes.hash_shared_attrs(shared_attrs)
+
+    if attributes_hash not in attributes_ids:
+        row = session.query(models.StateAttributes).filter_by(
+            hash=attributes_hash).first()
+
+        if row is None:
+            row = models.StateAttributes(hash=attributes_hash,
+                                         shared_attrs=shared_attrs)
+            session.add(row)
+            session.flush()
+
+        attributes_ids[attributes_hash] = row.attributes_id
+
+    return attributes_ids[attributes_hash]
+
+
+def normalize_attributes(session) -> None:
+    """Move the attributes of states into the state_attributes table."""
+    from homeassistant.components.recorder import models
+
+    query = session.query(models.States).filter(
+        models.States.attributes.isnot(None))
+    num_rows = query.count()
+    print("Normalizing attributes of {} states".format(num_rows))
+
+    if not num_rows:
+        return
+
+    attributes_ids = {}  # type: Dict[str, int]
+    n = 0
+    skipped = 0
+    last_state_id = 0
+    while True:
+        # Skipped rows keep their attributes, page by id to move past them
+        rows = query.filter(models.States.state_id > last_state_id).order_by(
+            models.States.state_id).limit(1000).all()
+
+        if not rows:
+            break
+
+        for row in rows:
+            n += 1
+            last_state_id = row.state_id
+
+            try:
+                row.attributes_id = get_attributes_id(
+                    session, attributes_ids, row.attributes)
+            except ValueError as err:
+                skipped += 1
+                print("Skipping state {} with invalid attributes: {}".format(
+                    row.state_id, err))
+                continue
+
+            row.attributes = None
+
+        session.commit()
+        print_progress(n, num_rows)
+
+    if skipped:
+        print("Skipped {} states with invalid attributes".format(skipped))
+
+
 def run(script_args: List) -> int:
     """The actual script body."""
     # pylint: disable=invalid-name
     from sqlalchemy import create_engine
     from sqlalchemy.orm import sessionmaker
-    from homeassistant.components.recorder import models
+    from homeassistant.components.recorder import (
+        models, migrate_schema, enable_incremental_vacuum)
 
     parser = argparse.ArgumentParser(
         description="Migrate legacy DB to SQLAlchemy format.")
@@ -70,6 +141,18 @@ def run(script_args: List) -> int:
         type=str,
         help="Connect to URI and import (implies --append)"
              "eg: mysql://localhost/homeassistant")
+    parser.add_argument(
+        '--normalize-attributes',
+        action='store_true',
+        default=False,
+        help="Move state attributes of an existing new format database "
+             "into the shared state_attributes table")
+    parser.add_argument(
+        '--incremental-vacuum',
+        action='store_true',
+        default=False,
+        help="Convert an existing new format SQLite database to incremental "
+             "auto vacuum. Needs free disk space the size of the database")
     parser.add_argument(
         '--script',
         choices=['db_migrator'])
@@ -88,6 +171,30 @@ def run(script_args: List) -> int:
     src_db = '{}/home-assistant.db'.format(config_dir)
     dst_db = '{}/home-assistant_v2.db'.format(config_dir)
 
+    if args.normalize_attributes:
+        if not args.uri and not os.path.exists(dst_db):
+            print("Fatal Error: New format database '{}' does not "
+                  "exist".format(dst_db))
+            return 1
+
+        engine = create_engine(args.uri or "sqlite:///{}".format(dst_db),
+                               echo=False)
+        models.Base.metadata.create_all(engine)
+        migrate_schema(engine)
+        normalize_attributes(sessionmaker(bind=engine)())
+        return 0
+
+    if args.incremental_vacuum:
+        if not os.path.exists(dst_db):
+            print("Fatal Error: New format database '{}' does not "
+                  "exist".format(dst_db))
+            return 1
+
+        print("Converting {} to incremental vacuum".format(dst_db))
+        enable_incremental_vacuum(
+            create_engine("sqlite:///{}".format(dst_db), echo=False))
+        return 0
+
     if not os.path.exists(src_db):
         print("Fatal Error: Old format database '{}' does not exist".format(
             src_db))
@@ -104,6 +211,7 @@ def run(script_args: List) -> int:
 
     engine = create_engine(uri, echo=False)
     models.Base.metadata.create_all(engine)
+    migrate_schema(engine)
     session_factory = sessionmaker(bind=engine)
     session = session_factory()
 
@@ -168,14 +276,26 @@ def run(script_args: List) -> int:
     print("Converting {} states".format(num_rows))
     c.close()
 
+    attributes_ids = {}  # type: Dict[str, int]
+
     c = conn.cursor()
     n = 0
+    skipped = 0
     for row in c.execute("SELECT * FROM states"):  # type: ignore
         n += 1
+
+        try:
+            attributes_id = get_attributes_id(session, attributes_ids, row[3])
+        except (TypeError, ValueError) as err:
+            skipped += 1
+            print("Skipping state {} with invalid attributes: {}".format(
+                row[0], err))
+            continue
+
         session.add(models.States(
             entity_id=row[1],
             state=row[2],
-            attributes=row[3],
+            attributes_id=attributes_id,
             last_changed=ts_to_dt(row[4]),
             last_updated=ts_to_dt(row[5]),
             event_id=id_mapping.get(row[6], row[6]),
@@ -187,4 +307,7 @@ def run(script_args: List) -> int:
     print_progress(n, num_rows)
     session.commit()
     c.close()
+
+    if skipped:
+        print("Skipped {} states with invalid attributes".format(skipped))
     return 0
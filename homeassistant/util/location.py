@@ -5,7 +5,7 @@ detect_location_info and elevation are mocked by default during tests.
 """
 import collections
 import math
-from typing import Any, Optional, Tuple, Dict
+from typing import Any, Optional, Sequence, Tuple, Dict
 
 import requests
 
@@ -24,6 +24,12 @@ FLATTENING = 1 / 298.257223563
 AXIS_B = 6356752.314245
 
 MILES_PER_KILOMETER = 0.621371
+# Mean radius of the earth in meters, used by the haversine formula
+MEAN_EARTH_RADIUS = 6371008.8
+# The haversine distance differs at most this fraction from the vincenty
+# distance, plus HAVERSINE_SLACK meters as vincenty is rounded to millimeters
+HAVERSINE_TOLERANCE = 0.006
+HAVERSINE_SLACK = 1
 MAX_ITERATIONS = 200
 CONVERGENCE_THRESHOLD = 1e-12
 
@@ -55,6 +61,55 @@ def distance(lat1, lon1, lat2, lon2):
     return vincenty((lat1, lon1), (lat2, lon2)) * 1000
 
 
+def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculate the approximate distance in meters between two points.
+
+    Much cheaper than distance, within HAVERSINE_TOLERANCE of it.
+    """
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlon = math.radians(lon2 - lon1) / 2
+
+    hav = (math.sin(half_dlat) ** 2 +
+           math.cos(lat1) * math.cos(lat2) * math.sin(half_dlon) ** 2)
+
+    return 2 * MEAN_EARTH_RADIUS * math.asin(min(1.0, math.sqrt(hav)))
+
+
+def nearest(latitude: float, longitude: float,
+            points: Sequence[Tuple[float, float]]) \
+        -> Tuple[Optional[int], Optional[float]]:
+    """Find the point nearest to latitude, longitude.
+
+    Returns the index of the nearest point and its distance in meters, or
+    (None, None) if there are no points. The exact distance is only
+    calculated for the points that the haversine distance cannot rule out.
+    """
+    if not points:
+        return None, None
+
+    approximate = [haversine(latitude, longitude, lat, lon)
+                   for lat, lon in points]
+    bound = (min(approximate) + HAVERSINE_SLACK) * \
+        (1 + HAVERSINE_TOLERANCE) / (1 - HAVERSINE_TOLERANCE) + \
+        HAVERSINE_SLACK
+
+    nearest_index = nearest_distance = None
+
+    for index, approximate_distance in enumerate(approximate):
+        if approximate_distance > bound:
+            continue
+
+        point_distance = distance(latitude, longitude, *points[index])
+
+        if nearest_distance is None or point_distance < nearest_distance:
+            nearest_index = index
+            nearest_distance = point_distance
+
+    return nearest_index, nearest_distance
+
+
 def elevation(latitude, longitude):
     """Return elevation for given latitude and longitude."""
     try:
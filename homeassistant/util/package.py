@@ -1,4 +1,5 @@
 """Helpers to install PyPi packages."""
+import json
 import logging
 import os
 import subprocess
@@ -6,9 +7,7 @@ import sys
 import threading
 from urllib.parse import urlparse
 
-from typing import Optional
-
-import pkg_resources
+from typing import List, Optional, Sequence  # NOQA
 
 _LOGGER = logging.getLogger(__name__)
 INSTALL_LOCK = threading.Lock()
@@ -25,18 +24,62 @@ def install_package(package: str, upgrade: bool=True,
         if check_package_exists(package, target):
             return True
 
-        _LOGGER.info('Attempting install of %s', package)
-        args = [sys.executable, '-m', 'pip', 'install', '--quiet', package]
-        if upgrade:
-            args.append('--upgrade')
-        if target:
-            args += ['--target', os.path.abspath(target)]
+        return _pip_install([package], upgrade, target)
 
-        try:
-            return subprocess.call(args) == 0
-        except subprocess.SubprocessError:
-            _LOGGER.exception('Unable to install pacakge %s', package)
-            return False
+
+def install_packages(packages: Sequence[str], upgrade: bool=True,
+                     target: Optional[str]=None,
+                     cache: Optional['RequirementsCache']=None) -> List[str]:
+    """Install the missing packages with a single pip invocation.
+
+    Packages the cache knows to be installed are not checked. If the batch
+    fails, the packages are installed one by one to find the failing ones.
+
+    Return the packages that could not be installed.
+    """
+    if cache is not None:
+        packages = [package for package in packages
+                    if not cache.is_installed(package)]
+
+    if not packages:
+        return []
+
+    with INSTALL_LOCK:
+        missing = [package for package in packages
+                   if not check_package_exists(package, target)]
+
+        if missing and not _pip_install(missing, upgrade, target):
+            missing = [package for package in missing
+                       if not _pip_install([package], upgrade, target)]
+        else:
+            missing = []
+
+        if cache is not None:
+            cache.add(package for package in packages
+                      if package not in missing)
+
+    return missing
+
+
+def _pip_install(packages: Sequence[str], upgrade: bool,
+                 target: Optional[str]) -> bool:
+    """Run pip to install packages.
+
+    Return boolean if install successful.
+    """
+    _LOGGER.info('Attempting install of %s', ', '.join(packages))
+    args = [sys.executable, '-m', 'pip', 'install', '--quiet']
+    args.extend(packages)
+    if upgrade:
+        args.append('--upgrade')
+    if target:
+        args += ['--target', os.path.abspath(target)]
+
+    try:
+        return subprocess.call(args) == 0
+    except subprocess.SubprocessError:
+        _LOGGER.exception('Unable to install pacakge %s', ', '.join(packages))
+        return False
 
 
 def check_package_exists(package: str, lib_dir: str) -> bool:
@@ -45,6 +88,9 @@ def check_package_exists(package: str, lib_dir: str) -> bool:
     Returns True when the requirement is met.
     Returns False when the package is not installed or doesn't meet req.
     """
+    # Not imported at module level as it is slow to import
+    import pkg_resources
+
     try:
         req = pkg_resources.Requirement.parse(package)
     except ValueError:
@@ -60,3 +106,64 @@ def check_package_exists(package: str, lib_dir: str) -> bool:
     # Check packages from global + virtual environment
     # pylint: disable=not-an-iterable
     return any(dist in req for dist in pkg_resources.working_set)
+
+
+class RequirementsCache(object):
+    """Persistent set of requirements that were found to be installed.
+
+    The set is only valid while the modification times of the lib dir and
+    the site-packages dirs are the same as when it was saved.
+    """
+
+    def __init__(self, path: str, lib_dir: Optional[str]=None):
+        """Initialize the cache stored at path."""
+        self.path = path
+        self.lib_dir = lib_dir
+        self._lock = threading.Lock()
+        self._installed = None
+
+    def _fingerprint(self) -> List:
+        """Return the modification times of the package dirs."""
+        dirs = [path for path in sys.path if path.endswith('site-packages')]
+        if self.lib_dir is not None:
+            dirs.append(self.lib_dir)
+
+        return [[path, os.path.getmtime(path)] for path in sorted(set(dirs))
+                if os.path.isdir(path)]
+
+    def _load(self):
+        """Load the requirements saved for the current package dirs."""
+        self._installed = set()
+
+        try:
+            with open(self.path) as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+
+        if data.get('fingerprint') == self._fingerprint():
+            self._installed.update(data.get('requirements', []))
+
+    def is_installed(self, package: str) -> bool:
+        """Return if the package was found to be installed."""
+        with self._lock:
+            if self._installed is None:
+                self._load()
+            return package in self._installed
+
+    def add(self, packages):
+        """Add installed packages and save the cache."""
+        with self._lock:
+            if self._installed is None:
+                self._load()
+            self._installed.update(packages)
+
+            try:
+                with open(self.path, 'w') as cache_file:
+                    json.dump({
+                        'fingerprint': self._fingerprint(),
+                        'requirements': sorted(self._installed),
+                    }, cache_file)
+            except OSError:
+                _LOGGER.warning('Unable to save requirements cache to %s',
+                                self.path)
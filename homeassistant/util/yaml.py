@@ -1,8 +1,11 @@
 """YAML utility functions."""
 import logging
 import os
+import pickle
 import sys
 import fnmatch
+import threading
+import time
 from collections import OrderedDict
 from typing import Union, List, Dict
 
@@ -19,6 +22,15 @@ _SECRET_NAMESPACE = 'homeassistant'
 _SECRET_YAML = 'secrets.yaml'
 __SECRET_CACHE = {}  # type: Dict
 
+# Parsed YAML nodes per absolute path with the mtime and size of the file
+_NODE_CACHE = {}  # type: Dict
+_NODE_CACHE_DIRTY = set()
+_NODE_CACHE_LOADED = set()
+_NODE_CACHE_LOCK = threading.Lock()
+_NODE_CACHE_VERSION = 1
+# Files changed more recently may change again without a new mtime
+_NODE_CACHE_MIN_AGE = 2
+
 
 # pylint: disable=too-many-ancestors
 class SafeLineLoader(yaml.SafeLoader):
@@ -33,13 +45,15 @@ class SafeLineLoader(yaml.SafeLoader):
         return node
 
 
+# The C parser is a lot faster but can only be used to compose the nodes
+_NodeLoader = getattr(yaml, 'CSafeLoader', SafeLineLoader)
+
+
 def load_yaml(fname: str) -> Union[List, Dict]:
     """Load a YAML file."""
     try:
         with open(fname, encoding='utf-8') as conf_file:
-            # If configuration file is empty YAML returns None
-            # We convert that to an empty dict
-            return yaml.load(conf_file, Loader=SafeLineLoader) or {}
+            node = _compose_yaml(fname, conf_file)
     except yaml.YAMLError as exc:
         _LOGGER.error(exc)
         raise HomeAssistantError(exc)
@@ -47,6 +61,138 @@ def load_yaml(fname: str) -> Union[List, Dict]:
         _LOGGER.error('Unable to read file %s: %s', fname, exc)
         raise HomeAssistantError(exc)
 
+    # If configuration file is empty YAML returns None
+    # We convert that to an empty dict
+    if node is None:
+        return {}
+
+    loader = SafeLineLoader('')
+    loader.name = fname
+    try:
+        return loader.construct_document(node) or {}
+    except yaml.YAMLError as exc:
+        _LOGGER.error(exc)
+        raise HomeAssistantError(exc)
+    finally:
+        loader.dispose()
+
+
+def _compose_yaml(fname: str, conf_file) -> yaml.nodes.Node:
+    """Return the node tree of a file, parsing it if it changed."""
+    try:
+        stat = os.fstat(conf_file.fileno())
+    except (AttributeError, OSError):
+        # Not a regular file, nothing to key the cache on
+        stat = None
+
+    path = os.path.abspath(fname)
+
+    if stat is not None:
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = _NODE_CACHE.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+    loader = _NodeLoader(conf_file)
+    try:
+        node = loader.get_single_node()
+    finally:
+        loader.dispose()
+
+    if stat is not None and \
+       stat.st_mtime < time.time() - _NODE_CACHE_MIN_AGE:
+        with _NODE_CACHE_LOCK:
+            _NODE_CACHE[path] = (key, node)
+            _NODE_CACHE_DIRTY.add(path)
+
+    return node
+
+
+def load_node_cache(cache_path: str) -> None:
+    """Load the parsed files stored at cache_path.
+
+    Files that were parsed since are kept. Each path is only loaded once.
+    """
+    with _NODE_CACHE_LOCK:
+        if cache_path in _NODE_CACHE_LOADED:
+            return
+        _NODE_CACHE_LOADED.add(cache_path)
+
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            data = pickle.load(cache_file)
+    except FileNotFoundError:
+        return
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.warning('Unable to load YAML cache %s', cache_path)
+        return
+
+    if not isinstance(data, dict) or \
+       data.get('version') != (_NODE_CACHE_VERSION, yaml.__version__):
+        return
+
+    with _NODE_CACHE_LOCK:
+        for path, entry in data['nodes'].items():
+            _NODE_CACHE.setdefault(path, entry)
+
+
+def save_node_cache(cache_path: str, directory: str) -> None:
+    """Store the parsed files in directory at cache_path if any changed."""
+    directory = os.path.join(os.path.abspath(directory), '')
+
+    with _NODE_CACHE_LOCK:
+        changed = [path for path in _NODE_CACHE_DIRTY
+                   if path.startswith(directory)]
+        if not changed:
+            return
+
+        _NODE_CACHE_DIRTY.difference_update(changed)
+        nodes = {path: entry for path, entry in _NODE_CACHE.items()
+                 if path.startswith(directory)}
+
+    tmp_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+
+    try:
+        with _NODE_CACHE_LOCK:
+            visited = set()
+            for _, node in nodes.values():
+                _convert_marks(node, visited)
+
+        with open(tmp_path, 'wb') as cache_file:
+            pickle.dump({
+                'version': (_NODE_CACHE_VERSION, yaml.__version__),
+                'nodes': nodes,
+            }, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.warning('Unable to save YAML cache %s', cache_path,
+                        exc_info=True)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def _convert_marks(node: yaml.nodes.Node, visited: set) -> None:
+    """Replace the marks of the C parser, which can not be pickled."""
+    if node is None or id(node) in visited:
+        return
+    visited.add(id(node))
+
+    for attr in ('start_mark', 'end_mark'):
+        mark = getattr(node, attr, None)
+        if mark is not None and not isinstance(mark, yaml.Mark):
+            setattr(node, attr, yaml.Mark(
+                mark.name, mark.index, mark.line, mark.column, None, None))
+
+    if isinstance(node, yaml.MappingNode):
+        for key_node, value_node in node.value:
+            _convert_marks(key_node, visited)
+            _convert_marks(value_node, visited)
+    elif isinstance(node, yaml.SequenceNode):
+        for item_node in node.value:
+            _convert_marks(item_node, visited)
+
 
 def dump(_dict: dict) -> str:
     """Dump yaml to a string and remove null."""
@@ -149,14 +295,14 @@ def _ordered_dict(loader: SafeLineLoader,
         try:
             hash(key)
         except TypeError:
-            fname = getattr(loader.stream, 'name', '')
+            fname = loader.name
             raise yaml.MarkedYAMLError(
                 context="invalid key: \"{}\"".format(key),
                 context_mark=yaml.Mark(fname, 0, line, -1, None, None)
             )
 
         if key in seen:
-            fname = getattr(loader.stream, 'name', '')
+            fname = loader.name
             first_mark = yaml.Mark(fname, 0, seen[key], -1, None, None)
             second_mark = yaml.Mark(fname, 0, line, -1, None, None)
             raise yaml.MarkedYAMLError(
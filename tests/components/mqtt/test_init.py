@@ -12,6 +12,7 @@ import homeassistant.components.mqtt as mqtt
 from homeassistant.const import (
     EVENT_CALL_SERVICE, ATTR_DOMAIN, ATTR_SERVICE, EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP)
+from homeassistant.exceptions import HomeAssistantError
 
 from tests.common import (
     get_test_home_assistant, mock_mqtt_component, fire_mqtt_message)
@@ -213,6 +214,71 @@ class TestMQTT(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(0, len(self.calls))
 
+    def test_subscribe_topic_multiple_matches(self):
+        """Test a message is dispatched to every matching subscription."""
+        mqtt.subscribe(self.hass, 'test/+/on', self.record_calls)
+        mqtt.subscribe(self.hass, 'test/#', self.record_calls)
+        mqtt.subscribe(self.hass, '#', self.record_calls)
+        mqtt.subscribe(self.hass, 'test/kitchen/off', self.record_calls)
+
+        fire_mqtt_message(self.hass, 'test/kitchen/on', 'test-payload')
+
+        self.hass.block_till_done()
+        self.assertEqual(3, len(self.calls))
+
+    def test_subscribe_is_reference_counted(self):
+        """Test the broker is unsubscribed when the last listener leaves."""
+        unsub_1 = mqtt.subscribe(self.hass, 'test-topic', self.record_calls)
+        unsub_2 = mqtt.subscribe(self.hass, 'test-topic', self.record_calls)
+        self.assertEqual(1, mqtt.MQTT_CLIENT.subscribe.call_count)
+
+        unsub_1()
+        unsub_1()
+        self.assertFalse(mqtt.MQTT_CLIENT.unsubscribe.called)
+
+        fire_mqtt_message(self.hass, 'test-topic', 'test-payload')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(self.calls))
+
+        unsub_2()
+        mqtt.MQTT_CLIENT.unsubscribe.assert_called_once_with('test-topic')
+        self.assertEqual(
+            {}, self.hass.data[mqtt.DATA_SUBSCRIPTIONS]._root.children)
+
+    def test_subscribe_broker_error(self):
+        """Test a failed broker subscription leaves no subscription."""
+        mqtt.MQTT_CLIENT.subscribe.side_effect = HomeAssistantError
+
+        with self.assertRaises(HomeAssistantError):
+            mqtt.subscribe(self.hass, 'test-topic', self.record_calls)
+
+        subscriptions = self.hass.data[mqtt.DATA_SUBSCRIPTIONS]
+        self.assertEqual({}, subscriptions._root.children)
+        self.assertEqual({}, subscriptions._counts)
+
+        mqtt.MQTT_CLIENT.subscribe.side_effect = None
+        mqtt.subscribe(self.hass, 'test-topic', self.record_calls)
+        self.assertEqual(2, mqtt.MQTT_CLIENT.subscribe.call_count)
+
+    def test_unsubscribe_broker_error(self):
+        """Test a failed broker unsubscribe keeps the subscription."""
+        unsub = mqtt.subscribe(self.hass, 'test-topic', self.record_calls)
+        mqtt.MQTT_CLIENT.unsubscribe.side_effect = HomeAssistantError
+
+        with self.assertRaises(HomeAssistantError):
+            unsub()
+
+        subscriptions = self.hass.data[mqtt.DATA_SUBSCRIPTIONS]
+        self.assertEqual({'test-topic': 1}, subscriptions._counts)
+
+        fire_mqtt_message(self.hass, 'test-topic', 'test-payload')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(self.calls))
+
+        mqtt.MQTT_CLIENT.unsubscribe.side_effect = None
+        unsub()
+        self.assertEqual({}, subscriptions._counts)
+
 
 class TestMQTTCallbacks(unittest.TestCase):
     """Test the MQTT callbacks."""
@@ -291,6 +357,27 @@ class TestMQTTCallbacks(unittest.TestCase):
             3: 'home/sensor',
         }, mqtt.MQTT_CLIENT.progress)
 
+    def test_unsubscribe_and_resubscribe_before_ack(self):
+        """Test subscribing again before the unsubscribe is acknowledged."""
+        mqttc = mqtt.MQTT_CLIENT._mqttc
+        # Return values for (un)subscribe calls (rc, mid)
+        mqttc.subscribe.side_effect = ((0, 1), (0, 3))
+        mqttc.unsubscribe.return_value = (0, 2)
+
+        unsub = mqtt.subscribe(self.hass, 'test/topic', lambda *args: None)
+        mqtt.MQTT_CLIENT._mqtt_on_subscribe(None, None, 1, [0])
+        unsub()
+        mqtt.subscribe(self.hass, 'test/topic', lambda *args: None)
+        mqtt.MQTT_CLIENT._mqtt_on_unsubscribe(None, None, 2, None)
+        mqtt.MQTT_CLIENT._mqtt_on_subscribe(None, None, 3, [0])
+
+        self.assertEqual(2, mqttc.subscribe.call_count)
+        self.assertEqual({'test/topic': 0}, mqtt.MQTT_CLIENT.topics)
+        self.assertEqual({}, mqtt.MQTT_CLIENT.progress)
+        self.assertEqual(
+            {'test/topic': 1},
+            self.hass.data[mqtt.DATA_SUBSCRIPTIONS]._counts)
+
     def test_mqtt_disconnect_tries_no_reconnect_on_stop(self):
         """Test the disconnect tries."""
         mqtt.MQTT_CLIENT._mqtt_on_disconnect(None, None, 0)
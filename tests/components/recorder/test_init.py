@@ -1,10 +1,13 @@
 """The tests for the Recorder component."""
 # pylint: disable=protected-access
 import json
+import os
+import tempfile
 from datetime import datetime, timedelta
 import unittest
+from unittest.mock import MagicMock, patch
 
-from homeassistant.core import callback
+from homeassistant.core import Event, callback
 from homeassistant.const import MATCH_ALL
 from homeassistant.components import recorder
 from homeassistant.bootstrap import setup_component
@@ -170,6 +173,91 @@ class TestRecorder(unittest.TestCase):
         # now we should only have 3 events left
         self.assertEqual(events.count(), 3)
 
+    def test_purge_in_batches(self):
+        """Test purging deletes bounded batches and reports progress."""
+        self._add_test_states()
+        states = recorder.query('States')
+        instance = recorder._INSTANCE
+        instance.purge_days = 4
+
+        with patch.object(recorder, 'PURGE_BATCH_SIZE', 2):
+            instance._start_purge()
+            instance._purge_step()
+            self.assertEqual(states.count(), 3)
+            self.assertEqual(2, instance.purge_progress['states'])
+
+            instance._purge_step()
+            instance._purge_step()
+
+        self.assertIsNone(instance.purge_progress)
+        self.assertEqual(states.count(), 2)
+
+    def test_purge_events_with_states(self):
+        """Test purging deletes the states still referencing old events."""
+        self._add_test_events()
+        events = recorder.query('Events').filter(
+            recorder.get_model('Events').event_type == 'EVENT_TEST_PURGE')
+        now = datetime.now()
+
+        # A recent state of an old event
+        self.session.add(recorder.get_model('States')(
+            entity_id='test.recorder2', domain='test', state='on',
+            last_changed=now, last_updated=now, created=now,
+            event_id=events.first().event_id))
+        self.session.commit()
+        states = recorder.query('States').filter_by(
+            entity_id='test.recorder2')
+
+        recorder._INSTANCE.purge_days = 4
+        recorder._INSTANCE._purge_old_data()
+
+        self.assertEqual(events.count(), 0)
+        self.assertEqual(states.count(), 0)
+
+    def test_purge_removes_unused_attributes(self):
+        """Test purging deletes shared attributes no state uses."""
+        self.hass.states.set('test.purge', 'on', {'old': True})
+        self.hass.block_till_done()
+        recorder._INSTANCE.block_till_done()
+
+        old_created = datetime.now() - timedelta(days=5)
+        for row in self.session.query(recorder.get_model('States')):
+            row.created = old_created
+        self.session.commit()
+
+        recorder._INSTANCE.purge_days = 4
+        recorder._INSTANCE._purge_old_data()
+
+        self.assertEqual(
+            0, recorder.query('StateAttributes').filter_by(
+                shared_attrs='{"old": true}').count())
+
+    def test_purge_attributes_in_batches(self):
+        """Test unused shared attributes are purged in bounded batches."""
+        state_attributes = recorder.get_model('StateAttributes')
+        for index in range(3):
+            shared_attrs = '{{"unused": {}}}'.format(index)
+            self.session.add(state_attributes(
+                shared_attrs=shared_attrs,
+                hash=state_attributes.hash_shared_attrs(shared_attrs)))
+        self.session.commit()
+        unused = recorder.query('StateAttributes').filter(
+            state_attributes.shared_attrs.like('{"unused%'))
+        instance = recorder._INSTANCE
+        instance.purge_days = 4
+
+        with patch.object(recorder, 'PURGE_BATCH_SIZE', 2):
+            instance._start_purge()
+            instance._purge_step()
+            self.assertEqual(1, unused.count())
+            self.assertIsNotNone(instance.purge_progress)
+
+            instance._purge_step()
+            instance._purge_step()
+
+        self.assertEqual(0, unused.count())
+        self.assertIsNone(instance.purge_progress)
+
     def test_purge_disabled(self):
         """Test leaving purge_days disabled."""
         self._add_test_states()
@@ -188,3 +276,139 @@ class TestRecorder(unittest.TestCase):
         # we should have all of our states still
         self.assertEqual(states.count(), 5)
         self.assertEqual(events.count(), 5)
+
+    def test_saving_batch(self):
+        """Test saving a burst of states in one batch."""
+        for value in range(10):
+            self.hass.states.set('test.recorder_batch', value)
+
+        self.hass.block_till_done()
+        recorder._INSTANCE.block_till_done()
+
+        states = recorder.execute(recorder.query('States').filter_by(
+            entity_id='test.recorder_batch'))
+
+        self.assertEqual([str(value) for value in range(10)],
+                         sorted(state.state for state in states))
+        self.assertEqual(0, recorder._INSTANCE.queue_depth)
+        self.assertIsNotNone(recorder._INSTANCE.last_commit_latency)
+
+    def test_saving_state_shares_attributes(self):
+        """Test states with identical attributes share a row."""
+        attributes = {'unit_of_measurement': 'C', 'friendly_name': 'Temp'}
+
+        for value in range(3):
+            self.hass.states.set('test.shared', value, attributes)
+            self.hass.block_till_done()
+            recorder._INSTANCE.block_till_done()
+
+        self.hass.states.set('test.shared', 4, {'friendly_name': 'Other'})
+        self.hass.block_till_done()
+        recorder._INSTANCE.block_till_done()
+
+        db_states = list(recorder.query('States').filter_by(
+            entity_id='test.shared'))
+        self.assertEqual(4, len(db_states))
+        self.assertEqual(2, len(set(
+            db_state.attributes_id for db_state in db_states)))
+        self.assertEqual(
+            attributes,
+            recorder.execute(recorder.query('States').filter_by(
+                entity_id='test.shared', state='0'))[0].attributes)
+
+
+def test_get_batch_bounded_by_size():
+    """Test batches are bounded by max_batch_size."""
+    instance = recorder.Recorder(MagicMock(), purge_days=None, uri='',
+                                 max_batch_size=3)
+
+    for _ in range(4):
+        instance.queue.put(Event('test'))
+    instance.queue.put(None)
+
+    events, stop = instance._get_batch()
+    assert len(events) == 3
+    assert not stop
+
+    events, stop = instance._get_batch()
+    assert len(events) == 1
+    assert stop
+
+
+class TestRecorderSQLiteFile(unittest.TestCase):
+    """Test the recorder with a SQLite database file."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Setup things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        db_uri = 'sqlite:///{}'.format(
+            os.path.join(self.tmp_dir.name, 'recorder.db'))
+        setup_component(self.hass, recorder.DOMAIN, {
+            recorder.DOMAIN: {recorder.CONF_DB_URL: db_uri}})
+        self.hass.start()
+        recorder._verify_instance()
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        recorder._INSTANCE.shutdown(None)
+        self.hass.stop()
+        self.tmp_dir.cleanup()
+
+    def test_enable_incremental_vacuum(self):
+        """Test an existing database is converted to incremental vacuum."""
+        engine = recorder._INSTANCE.engine
+        with engine.connect() as conn:
+            conn.execute('PRAGMA auto_vacuum=NONE')
+            conn.execute('VACUUM')
+        assert engine.execute('PRAGMA auto_vacuum').scalar() == 0
+
+        recorder.enable_incremental_vacuum(engine)
+
+        assert engine.execute('PRAGMA auto_vacuum').scalar() == 2
+
+    def test_wal_and_read_pool(self):
+        """Test the SQLite engine profile."""
+        instance = recorder._INSTANCE
+        assert instance.read_engine is not instance.engine
+        assert instance.engine.execute(
+            'PRAGMA journal_mode').scalar() == 'wal'
+        assert instance.read_engine.execute(
+            'PRAGMA query_only').scalar() == 1
+
+        self.hass.states.set('test.recorder', 'on')
+        self.hass.block_till_done()
+        instance.block_till_done()
+
+        states = recorder.execute(recorder.read_query('States'))
+        assert [state.state for state in states] == ['on']
+
+
+def test_get_batch_purge_request():
+    """Test a purge request starts purging without blocking on the queue."""
+    instance = recorder.Recorder(MagicMock(), purge_days=1, uri='')
+    event = Event('test')
+
+    instance.queue.put(recorder.PURGE_REQUEST)
+    instance.queue.put(event)
+
+    assert instance._get_batch() == ([event], False)
+    assert instance.purge_progress is not None
+    assert instance._get_batch() == ([], False)
+
+
+def test_migrate_schema():
+    """Test migrating a states table without attributes_id and indexes."""
+    from sqlalchemy import create_engine, inspect
+
+    engine = create_engine('sqlite://')
+    engine.execute('CREATE TABLE states (state_id INTEGER PRIMARY KEY, '
+                   'attributes TEXT, created DATETIME)')
+    recorder.get_model('Base').metadata.create_all(engine)
+
+    recorder.migrate_schema(engine)
+
+    assert 'attributes_id' in [
+        column['name'] for column in inspect(engine).get_columns('states')]
+    assert 'ix_states_created' in [
+        index['name'] for index in inspect(engine).get_indexes('states')]
@@ -9,7 +9,7 @@ import homeassistant.core as ha
 from homeassistant.const import EVENT_STATE_CHANGED
 from homeassistant.util import dt
 from homeassistant.components.recorder.models import (
-    Base, Events, States, RecorderRuns)
+    Base, Events, States, StateAttributes, RecorderRuns)
 
 ENGINE = None
 SESSION = None
@@ -63,6 +63,33 @@ class TestStates(unittest.TestCase):
         })
         assert state == States.from_event(event).to_native()
 
+    def test_from_event_with_shared_attributes(self):
+        """Test converting event to db state with shared attributes."""
+        state = ha.State('sensor.temperature', '18',
+                         {'unit_of_measurement': 'C', 'icon': 'mdi:oven'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'sensor.temperature',
+            'old_state': None,
+            'new_state': state,
+        })
+        db_state = States.from_event(event)
+        db_state.state_attributes = StateAttributes.from_event(event)
+
+        assert db_state.attributes is None
+        assert state == db_state.to_native()
+
+    def test_shared_attributes_hash_ignores_order(self):
+        """Test identical attributes share the same hash."""
+        hashes = set()
+        for attributes in ({'a': 1, 'b': 2}, {'b': 2, 'a': 1}):
+            hashes.add(StateAttributes.from_event(ha.Event(
+                EVENT_STATE_CHANGED, {
+                    'entity_id': 'sensor.temperature',
+                    'new_state': ha.State('sensor.temperature', '18',
+                                          attributes)})).hash)
+
+        assert len(hashes) == 1
+
     def test_from_event_to_delete_state(self):
         """Test converting deleting state event to db state."""
         event = ha.Event(EVENT_STATE_CHANGED, {
@@ -11,7 +11,10 @@ import requests
 
 from homeassistant import bootstrap, const
 import homeassistant.core as ha
+from homeassistant.components import api
 import homeassistant.components.http as http
+from homeassistant.util.async import (
+    run_callback_threadsafe, run_coroutine_threadsafe)
 
 from tests.common import get_test_instance_port, get_test_home_assistant
 
@@ -175,6 +178,44 @@ class TestAPI(unittest.TestCase):
 
         self.assertEqual(1, len(test_value))
 
+    def test_api_fire_events_batch(self):
+        """Test if the API fires a batch of events in order."""
+        test_value = []
+
+        @ha.callback
+        def listener(event):
+            """Helper method that will verify our events got called."""
+            test_value.append((event.event_type, event.data))
+
+        hass.bus.listen("test.batch_1", listener)
+        hass.bus.listen("test.batch_2", listener)
+
+        req = requests.post(
+            _url(const.URL_API_EVENTS_BATCH),
+            data=json.dumps([
+                {'event_type': 'test.batch_1', 'event_data': {'n': 1}},
+                {'event_type': 'test.batch_2'},
+                {'event_type': 'test.batch_1', 'event_data': {'n': 2}},
+            ]),
+            headers=HA_HEADERS)
+
+        hass.block_till_done()
+
+        self.assertEqual(200, req.status_code)
+        self.assertEqual([('test.batch_1', {'n': 1}), ('test.batch_2', {}),
+                          ('test.batch_1', {'n': 2})], test_value)
+
+    def test_api_fire_events_batch_invalid(self):
+        """Test if the API rejects invalid event batches."""
+        for data in ({'event_type': 'test'}, ['test'],
+                     [{'event_data': {}}],
+                     [{'event_type': 'test', 'event_data': [1]}]):
+            req = requests.post(
+                _url(const.URL_API_EVENTS_BATCH), data=json.dumps(data),
+                headers=HA_HEADERS)
+
+            self.assertEqual(400, req.status_code)
+
     # pylint: disable=invalid-name
     def test_api_fire_event_with_data(self):
         """Test if the API allows us to fire an event."""
@@ -243,6 +284,24 @@ class TestAPI(unittest.TestCase):
                            headers=HA_HEADERS)
         self.assertEqual(hass.config.components, req.json())
 
+    def test_api_get_startup_profile(self):
+        """Test the return of the startup profile."""
+        req = requests.get(_url(const.URL_API_STARTUP_PROFILE),
+                           headers=HA_HEADERS)
+        profile = req.json()
+        self.assertIn('setup', profile['api'])
+        self.assertIn('import', profile['api'])
+
+    def test_api_get_executors(self):
+        """Test the return of the executor pool metrics."""
+        req = requests.get(_url(const.URL_API_EXECUTORS),
+                           headers=HA_HEADERS)
+        executors = req.json()
+        self.assertEqual(set(hass.executors), set(executors))
+        self.assertEqual(
+            {'max_workers', 'threads', 'busy', 'queued'},
+            set(executors['polling']))
+
     def test_api_get_error_log(self):
         """Test the return of the error log."""
         test_string = 'Test String°'
@@ -461,6 +520,85 @@ class TestAPI(unittest.TestCase):
             data = self._stream_next_event(stream)
             self.assertEqual('test_event3', data['event_type'])
 
+    def test_stream_hub_encodes_once_and_coalesces(self):
+        """Test the stream hub shares encoding and coalesces states."""
+        hub = api.StreamHub(hass)
+        first = run_callback_threadsafe(hass.loop, hub.async_add).result()
+        second = run_callback_threadsafe(hass.loop, hub.async_add).result()
+        restricted = run_callback_threadsafe(
+            hass.loop, hub.async_add, ['test_hub_event']).result()
+
+        with patch('homeassistant.core.json_dumps',
+                   wraps=ha.json_dumps) as mock_dumps:
+            hass.states.set('test.coalesce', 'one')
+            hass.states.set('test.coalesce', 'two')
+            hass.block_till_done()
+
+        self.assertEqual(2, sum(1 for call in mock_dumps.call_args_list
+                                if isinstance(call[0][0], ha.Event)))
+
+        for client in (first, second):
+            payloads = run_coroutine_threadsafe(
+                client.get(), hass.loop).result()
+            self.assertEqual(1, len(payloads))
+            data = json.loads(payloads[0].decode('utf-8')[6:])
+            self.assertEqual('two', data['data']['new_state']['state'])
+
+        hass.bus.fire('test_hub_event')
+        hass.block_till_done()
+
+        payloads = run_coroutine_threadsafe(
+            restricted.get(), hass.loop).result()
+        self.assertEqual(1, len(payloads))
+        self.assertIn(b'test_hub_event', payloads[0])
+
+        for client in (first, second, restricted):
+            run_callback_threadsafe(
+                hass.loop, hub.async_remove, client).result()
+
+        self.assertIsNone(hub._unsub_events)
+
+    def test_stream_client_drops_oldest(self):
+        """Test a full stream client drops the oldest messages."""
+        client = api.StreamClient(hass.loop, None, 2)
+
+        for payload in (b'1', b'2', b'3'):
+            run_callback_threadsafe(hass.loop, client.put, payload).result()
+
+        self.assertEqual(1, client.dropped)
+        self.assertEqual(
+            [b'2', b'3'],
+            run_coroutine_threadsafe(client.get(), hass.loop).result())
+
+        run_callback_threadsafe(hass.loop, client.close).result()
+        self.assertIsNone(
+            run_coroutine_threadsafe(client.get(), hass.loop).result())
+
+    def test_stream_client_coalesce_keeps_order(self):
+        """Test a coalesced message moves to the end of the queue."""
+        client = api.StreamClient(hass.loop, None, 3)
+
+        for payload, key in ((b'a1', 'a'), (b'b1', 'b'), (b'a2', 'a')):
+            run_callback_threadsafe(
+                hass.loop, client.put, payload, key).result()
+
+        self.assertEqual(0, client.dropped)
+        self.assertEqual(
+            [b'b1', b'a2'],
+            run_coroutine_threadsafe(client.get(), hass.loop).result())
+
+    def test_stream_hub_duplicate_restrict(self):
+        """Test a restriction listing an event type twice."""
+        hub = api.StreamHub(hass)
+        client = run_callback_threadsafe(
+            hass.loop, hub.async_add,
+            ['test_hub_dup', 'test_hub_dup']).result()
+
+        run_callback_threadsafe(hass.loop, hub.async_remove, client).result()
+
+        self.assertEqual({}, hub._restricted)
+        self.assertIsNone(hub._unsub_events)
+
     def _stream_next_event(self, stream):
         """Read the stream for next event while ignoring ping."""
         while True:
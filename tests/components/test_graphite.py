@@ -8,8 +8,8 @@ from homeassistant.bootstrap import setup_component
 import homeassistant.core as ha
 import homeassistant.components.graphite as graphite
 from homeassistant.const import (
-    EVENT_STATE_CHANGED, EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP,
-    STATE_ON, STATE_OFF)
+    EVENT_STATE_CHANGED, EVENT_HOMEASSISTANT_STOP, STATE_ON, STATE_OFF)
+import homeassistant.util.dt as dt_util
 from tests.common import get_test_home_assistant
 
 
@@ -77,47 +77,25 @@ class TestGraphite(unittest.TestCase):
             mock.call(socket.AF_INET, socket.SOCK_STREAM)
         )
 
-    def test_subscribe(self):
-        """Test the subscription."""
-        fake_hass = mock.MagicMock()
+    def test_register(self):
+        """Test the registration."""
+        fake_hass = mock.MagicMock(data={})
         gf = graphite.GraphiteFeeder(fake_hass, 'foo', 123, 'ha')
-        fake_hass.bus.listen_once.has_calls([
-            mock.call(EVENT_HOMEASSISTANT_START, gf.start_listen),
-            mock.call(EVENT_HOMEASSISTANT_STOP, gf.shutdown),
-        ])
+        with mock.patch.object(gf, 'start') as mock_start:
+            gf.register()
+        self.assertEqual(mock_start.call_count, 1)
         self.assertEqual(fake_hass.bus.listen.call_count, 1)
         self.assertEqual(
             fake_hass.bus.listen.call_args,
             mock.call(EVENT_STATE_CHANGED, gf.event_listener)
         )
+        self.assertEqual(
+            fake_hass.bus.listen_once.call_args,
+            mock.call(EVENT_HOMEASSISTANT_STOP, gf.shutdown)
+        )
 
-    def test_start(self):
-        """Test the start."""
-        with mock.patch.object(self.gf, 'start') as mock_start:
-            self.gf.start_listen('event')
-            self.assertEqual(mock_start.call_count, 1)
-            self.assertEqual(mock_start.call_args, mock.call())
-
-    def test_shutdown(self):
-        """Test the shutdown."""
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            self.gf.shutdown('event')
-            self.assertEqual(mock_queue.put.call_count, 1)
-            self.assertEqual(
-                mock_queue.put.call_args, mock.call(self.gf._quit_object)
-            )
-
-    def test_event_listener(self):
-        """Test the event listener."""
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            self.gf.event_listener('foo')
-            self.assertEqual(mock_queue.put.call_count, 1)
-            self.assertEqual(mock_queue.put.call_args, mock.call('foo'))
-
-    @patch('time.time')
-    def test_report_attributes(self, mock_time):
+    def test_report_attributes(self):
         """Test the reporting with attributes."""
-        mock_time.return_value = 12345
         attrs = {'foo': 1,
                  'bar': 2.0,
                  'baz': True,
@@ -132,56 +110,66 @@ class TestGraphite(unittest.TestCase):
             ]
 
         state = mock.MagicMock(state=0, attributes=attrs)
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
+        actual = self.gf._report_attributes('entity', state, 12345)
+        self.assertEqual(sorted(expected), sorted(actual))
 
-    @patch('time.time')
-    def test_report_with_string_state(self, mock_time):
+    def test_report_with_string_state(self):
         """Test the reporting with strings."""
-        mock_time.return_value = 12345
         expected = [
             'ha.entity.foo 1.000000 12345',
             'ha.entity.state 1.000000 12345',
             ]
 
         state = mock.MagicMock(state='above_horizon', attributes={'foo': 1.0})
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
+        actual = self.gf._report_attributes('entity', state, 12345)
+        self.assertEqual(sorted(expected), sorted(actual))
 
-    @patch('time.time')
-    def test_report_with_binary_state(self, mock_time):
+    def test_report_with_binary_state(self):
         """Test the reporting with binary state."""
-        mock_time.return_value = 12345
         state = ha.State('domain.entity', STATE_ON, {'foo': 1.0})
-        with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            expected = ['ha.entity.foo 1.000000 12345',
-                        'ha.entity.state 1.000000 12345']
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
+        expected = ['ha.entity.foo 1.000000 12345',
+                    'ha.entity.state 1.000000 12345']
+        actual = self.gf._report_attributes('entity', state, 12345)
+        self.assertEqual(sorted(expected), sorted(actual))
+
+        state = ha.State('domain.entity', STATE_OFF, {'foo': 1.0})
+        expected = ['ha.entity.foo 1.000000 12345',
+                    'ha.entity.state 0.000000 12345']
+        actual = self.gf._report_attributes('entity', state, 12345)
+        self.assertEqual(sorted(expected), sorted(actual))
+
+    def test_export(self):
+        """Test the events of a batch are sent at once."""
+        time_fired = dt_util.utc_from_timestamp(12345)
+        events = [
+            ha.Event(EVENT_STATE_CHANGED, {
+                'entity_id': entity_id,
+                'new_state': ha.State(entity_id, STATE_ON, {'foo': 1.0})},
+                time_fired=time_fired)
+            for entity_id in ('domain.one', 'domain.two')]
+        expected = ['ha.domain.one.foo 1.000000 12345',
+                    'ha.domain.one.state 1.000000 12345',
+                    'ha.domain.two.foo 1.000000 12345',
+                    'ha.domain.two.state 1.000000 12345']
 
-        state.state = STATE_OFF
         with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            self.gf._report_attributes('entity', state)
-            expected = ['ha.entity.foo 1.000000 12345',
-                        'ha.entity.state 0.000000 12345']
-            actual = mock_send.call_args_list[0][0][0].split('\n')
-            self.assertEqual(sorted(expected), sorted(actual))
-
-    @patch('time.time')
-    def test_send_to_graphite_errors(self, mock_time):
-        """Test the sending with errors."""
-        mock_time.return_value = 12345
-        state = ha.State('domain.entity', STATE_ON, {'foo': 1.0})
+            self.gf.export(events)
+        self.assertEqual(mock_send.call_count, 1)
+        actual = mock_send.call_args[0][0].split('\n')
+        self.assertEqual(sorted(expected), sorted(actual))
+
+    @patch.object(graphite.GraphiteFeeder, 'retry_delay', 0)
+    def test_send_to_graphite_errors(self):
+        """Test the sending is retried after errors."""
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'domain.entity',
+            'new_state': ha.State('domain.entity', STATE_ON, {'foo': 1.0})})
         with mock.patch.object(self.gf, '_send_to_graphite') as mock_send:
-            mock_send.side_effect = socket.error
-            self.gf._report_attributes('entity', state)
-            mock_send.side_effect = socket.gaierror
-            self.gf._report_attributes('entity', state)
+            mock_send.side_effect = [socket.error, socket.gaierror, None]
+            self.gf._export([event])
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertEqual(self.gf.exported, 1)
+        self.assertEqual(self.gf.failed, 0)
 
     @patch('socket.socket')
     def test_send_to_graphite(self, mock_socket):
@@ -203,43 +191,3 @@ class TestGraphite(unittest.TestCase):
         self.assertEqual(sock.send.call_args, mock.call('\n'.encode('ascii')))
         self.assertEqual(sock.close.call_count, 1)
         self.assertEqual(sock.close.call_args, mock.call())
-
-    def test_run_stops(self):
-        """Test the stops."""
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            mock_queue.get.return_value = self.gf._quit_object
-            self.assertEqual(None, self.gf.run())
-            self.assertEqual(mock_queue.get.call_count, 1)
-            self.assertEqual(mock_queue.get.call_args, mock.call())
-            self.assertEqual(mock_queue.task_done.call_count, 1)
-            self.assertEqual(mock_queue.task_done.call_args, mock.call())
-
-    def test_run(self):
-        """Test the running."""
-        runs = []
-        event = mock.MagicMock(event_type=EVENT_STATE_CHANGED,
-                               data={'entity_id': 'entity',
-                                     'new_state': mock.MagicMock()})
-
-        def fake_get():
-            if len(runs) >= 2:
-                return self.gf._quit_object
-            elif runs:
-                runs.append(1)
-                return mock.MagicMock(event_type='somethingelse',
-                                      data={'new_event': None})
-            else:
-                runs.append(1)
-                return event
-
-        with mock.patch.object(self.gf, '_queue') as mock_queue:
-            with mock.patch.object(self.gf, '_report_attributes') as mock_r:
-                mock_queue.get.side_effect = fake_get
-                self.gf.run()
-                # Twice for two events, once for the stop
-                self.assertEqual(3, mock_queue.task_done.call_count)
-                self.assertEqual(mock_r.call_count, 1)
-                self.assertEqual(
-                    mock_r.call_args,
-                    mock.call('entity', event.data['new_state'])
-                )
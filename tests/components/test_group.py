@@ -332,7 +332,8 @@ class TestComponentsGroup(unittest.TestCase):
 
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.empty_group', 'group.second_group', 'group.test_group']
-        assert self.hass.bus.listeners['state_changed'] == 3
+        assert self.hass.state_dispatcher.listeners == {
+            'light.bowl': 1, 'hello.world': 1, 'sensor.happy': 1}
 
         with patch('homeassistant.config.load_yaml_config_file', return_value={
                 'group': {
@@ -345,7 +346,7 @@ class TestComponentsGroup(unittest.TestCase):
             self.hass.block_till_done()
 
         assert self.hass.states.entity_ids() == ['group.hello']
-        assert self.hass.bus.listeners['state_changed'] == 1
+        assert self.hass.state_dispatcher.listeners == {'light.bowl': 1}
 
     def test_stopping_a_group(self):
         """Test that a group correctly removes itself."""
@@ -4,13 +4,20 @@ from datetime import timedelta
 import unittest
 from unittest.mock import patch, sentinel
 
+import requests
+
 from homeassistant.bootstrap import setup_component
 import homeassistant.core as ha
+from homeassistant.const import HTTP_HEADER_HA_AUTH
 import homeassistant.util.dt as dt_util
-from homeassistant.components import history, recorder
+from homeassistant.components import history, http, recorder
 
 from tests.common import (
-    mock_http_component, mock_state_change_event, get_test_home_assistant)
+    mock_http_component, mock_state_change_event, get_test_home_assistant,
+    get_test_instance_port)
+
+API_PASSWORD = 'test1234'
+HA_HEADERS = {HTTP_HEADER_HA_AUTH: API_PASSWORD}
 
 
 class TestComponentHistory(unittest.TestCase):
@@ -359,6 +366,16 @@ class TestComponentHistory(unittest.TestCase):
                     history.CONF_ENTITIES: ['media_player.test']}}})
         self.check_significant_states(zero, four, states, config)
 
+    def test_stream_significant_states(self):
+        """Test streaming returns the same states per entity."""
+        zero, four, states = self.record_states()
+
+        hist = {
+            entity_states[0].entity_id: entity_states
+            for entity_states in history.stream_significant_states(
+                zero, four, filters=history.Filters())}
+        assert states == hist
+
     def check_significant_states(self, zero, four, states, config):
         """Check if significant states are retrieved."""
         filters = history.Filters()
@@ -442,3 +459,152 @@ class TestComponentHistory(unittest.TestCase):
             set_state(therm, 22, attributes={'current_temperature': 21,
                                              'hidden': True})
         return zero, four, states
+
+
+class TestHistoryPeriodView(unittest.TestCase):
+    """Test the history period view."""
+
+    # pylint: disable=invalid-name
+    def setUp(self):
+        """Setup the history and http components."""
+        self.hass = get_test_home_assistant()
+        port = get_test_instance_port()
+
+        assert setup_component(self.hass, http.DOMAIN, {
+            http.DOMAIN: {http.CONF_API_PASSWORD: API_PASSWORD,
+                          http.CONF_SERVER_PORT: port}})
+
+        db_uri = 'sqlite://'
+        with patch('homeassistant.core.Config.path', return_value=db_uri):
+            setup_component(self.hass, recorder.DOMAIN, {
+                "recorder": {
+                    "db_url": db_uri}})
+        assert setup_component(self.hass, history.DOMAIN, {
+            history.DOMAIN: {}})
+        self.hass.start()
+        recorder._INSTANCE.block_till_db_ready()
+
+        start = dt_util.utcnow() - timedelta(seconds=1)
+        self.url = 'http://127.0.0.1:{}/api/history/period/{}'.format(
+            port, start.isoformat())
+
+        for value in (10, 20, 'unknown'):
+            self.hass.states.set('sensor.power', value)
+            self.hass.block_till_done()
+            recorder._INSTANCE.block_till_done()
+
+    # pylint: disable=invalid-name
+    def tearDown(self):
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def get(self, **params):
+        """Request the history of the test sensor."""
+        params['filter_entity_id'] = 'sensor.power'
+        return requests.get(self.url, headers=HA_HEADERS, params=params,
+                            timeout=5)
+
+    def test_stream(self):
+        """Test the streamed history matches the regular response."""
+        req = self.get(stream='')
+        self.assertEqual(200, req.status_code)
+        self.assertEqual(self.get().json(), req.json())
+        self.assertEqual(['10', '20', 'unknown'],
+                         [state['state'] for state in req.json()[0]])
+
+    def test_stream_downsampled(self):
+        """Test the streamed history can be downsampled."""
+        req = self.get(stream='', max_points=1)
+        self.assertEqual(200, req.status_code)
+        self.assertEqual(['15.0', 'unknown'],
+                         [state['state'] for state in req.json()[0]])
+
+    def test_stream_compact(self):
+        """Test the streamed history can be in compact form."""
+        req = self.get(stream='', max_points=1, format='compact')
+        self.assertEqual(200, req.status_code)
+        self.assertEqual(self.get(max_points=1, format='compact').json(),
+                         req.json())
+        self.assertEqual(['15.0', 'unknown'], req.json()[0]['states'])
+
+    @patch('homeassistant.components.history.stream_significant_states',
+           side_effect=ValueError)
+    def test_stream_error_before_first_entity(self, mock_stream):
+        """Test an error before anything was streamed is reported."""
+        req = self.get(stream='')
+        self.assertEqual(500, req.status_code)
+        self.assertEqual(1, mock_stream.call_count)
+
+    @patch('homeassistant.components.history.stream_significant_states')
+    def test_stream_error_after_first_entity(self, mock_stream):
+        """Test an error while streaming does not end the response."""
+        def stream(*args):
+            """Fail after the first entity."""
+            yield [ha.State('sensor.power', '10')]
+            raise ValueError
+
+        mock_stream.side_effect = stream
+
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.get(stream='')
+
+
+def test_downsample_states():
+    """Test numeric states are merged into min/max/mean buckets."""
+    start = dt_util.utcnow()
+    end = start + timedelta(seconds=40)
+    states = [
+        ha.State('sensor.power', value, last_updated=start + timedelta(
+            seconds=offset))
+        for offset, value in ((1, 10), (2, 20), (3, 'unknown'), (4, 'nan'),
+                              (5, 30), (6, 'unknown'), (25, 1), (26, 5))]
+
+    result = list(history.downsample_states(states, start, end, 2))
+
+    assert result[0]['state'] == '20.0'
+    assert (result[0]['min'], result[0]['max']) == (10, 30)
+    assert result[0]['last_updated'] == states[0].last_updated
+    assert result[1] is states[2]
+    assert result[2] is states[3]
+    assert result[3]['state'] == '3.0'
+    assert (result[3]['min'], result[3]['max']) == (1, 5)
+    assert result[3]['last_updated'] == states[6].last_updated
+    assert len(result) == 4
+
+
+def test_compact_states():
+    """Test states are encoded in columns with only changed attributes."""
+    start = dt_util.utcnow()
+    states = [
+        ha.State('sensor.power', value, attributes, last_updated=start +
+                 timedelta(seconds=offset))
+        for offset, value, attributes in (
+            (1, '10', {'unit': 'W'}), (2, '20', {'unit': 'W'}),
+            (3, '30', {'unit': 'kW'}))]
+
+    result = history.compact_states(states)
+
+    assert result['entity_id'] == 'sensor.power'
+    assert result['attributes'] == {'unit': 'W'}
+    assert result['attribute_changes'] == {2: {'unit': 'kW'}}
+    assert result['states'] == ['10', '20', '30']
+    assert result['last_updated'] == [
+        state.last_updated.timestamp() for state in states]
+    assert 'min' not in result
+
+
+def test_compact_downsampled_states():
+    """Test min and max of downsampled states are kept in compact form."""
+    start = dt_util.utcnow()
+    end = start + timedelta(seconds=40)
+    states = [
+        ha.State('sensor.power', value, last_updated=start + timedelta(
+            seconds=offset))
+        for offset, value in ((1, 10), (2, 20), (3, 'unknown'))]
+
+    result = history.compact_states(
+        history.downsample_states(states, start, end, 2))
+
+    assert result['states'] == ['15.0', 'unknown']
+    assert result['min'] == {0: 10}
+    assert result['max'] == {0: 20}
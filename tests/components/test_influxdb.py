@@ -6,11 +6,13 @@ import influxdb as influx_client
 
 from homeassistant.bootstrap import setup_component
 import homeassistant.components.influxdb as influxdb
+from homeassistant.helpers import exporter
 from homeassistant.const import EVENT_STATE_CHANGED, STATE_OFF, STATE_ON
 
 from tests.common import get_test_home_assistant
 
 
+@mock.patch.object(influxdb.InfluxThread, 'flush_interval', 0)
 @mock.patch('influxdb.InfluxDBClient')
 class TestInfluxDB(unittest.TestCase):
     """Test the InfluxDB component."""
@@ -101,6 +103,8 @@ class TestInfluxDB(unittest.TestCase):
         }
         assert setup_component(self.hass, influxdb.DOMAIN, config)
         self.handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        self.influx_thread = \
+            self.hass.data[exporter.DATA_EXPORTERS][influxdb.DOMAIN]
 
     def test_event_listener(self, mock_client):
         """Test the event listener."""
@@ -136,6 +140,7 @@ class TestInfluxDB(unittest.TestCase):
                 },
             }]
             self.handler_method(event)
+            self.influx_thread.block_till_done()
             self.assertEqual(
                 mock_client.return_value.write_points.call_count, 1
             )
@@ -170,6 +175,7 @@ class TestInfluxDB(unittest.TestCase):
                 },
             }]
             self.handler_method(event)
+            self.influx_thread.block_till_done()
             self.assertEqual(
                 mock_client.return_value.write_points.call_count, 1
             )
@@ -190,6 +196,96 @@ class TestInfluxDB(unittest.TestCase):
         mock_client.return_value.write_points.side_effect = \
             influx_client.exceptions.InfluxDBClientError('foo')
         self.handler_method(event)
+        self.influx_thread.block_till_done()
+
+        self.assertEqual(1, mock_client.return_value.write_points.call_count)
+        self.assertEqual(1, self.influx_thread.failed)
+
+    @mock.patch.object(influxdb.InfluxThread, 'retry_delay', 0)
+    def test_event_listener_retry_write(self, mock_client):
+        """Test the event listener retries failed writes."""
+        self._setup()
+
+        state = mock.MagicMock(
+            state=1, domain='fake', entity_id='entity-id', object_id='entity',
+            attributes={})
+        event = mock.MagicMock(data={'new_state': state}, time_fired=12345)
+        mock_client.return_value.write_points.side_effect = [
+            influx_client.exceptions.InfluxDBServerError('foo'),
+            IOError('bar'),
+            None,
+        ]
+        self.handler_method(event)
+        self.influx_thread.block_till_done()
+
+        self.assertEqual(3, mock_client.return_value.write_points.call_count)
+        self.assertEqual(0, self.influx_thread.failed)
+
+    def test_queued_points_written_in_one_batch(self, mock_client):
+        """Test the queued points are written in one batch."""
+        influx_thread = influxdb.InfluxThread(
+            self.hass, mock_client.return_value, influx_client.exceptions,
+            None, {})
+        points = []
+
+        for index in range(3):
+            state = mock.MagicMock(
+                state=index, domain='fake', object_id='entity',
+                entity_id='fake.entity', attributes={})
+            influx_thread.add(mock.MagicMock(
+                data={'new_state': state}, time_fired=index))
+            points.append({
+                'measurement': 'fake.entity',
+                'tags': {
+                    'domain': 'fake',
+                    'entity_id': 'entity',
+                },
+                'time': index,
+                'fields': {
+                    'value': index,
+                },
+            })
+
+        influx_thread.start()
+        influx_thread.block_till_done()
+        influx_thread.stop()
+        influx_thread.join()
+
+        self.assertEqual(
+            [mock.call(points)],
+            mock_client.return_value.write_points.call_args_list)
+
+    def test_rejected_point_of_batch(self, mock_client):
+        """Test only the rejected point of a batch is lost."""
+        influx_thread = influxdb.InfluxThread(
+            self.hass, mock_client.return_value, influx_client.exceptions,
+            None, {})
+        written = []
+
+        def write_points(points):
+            """Reject batches and the point of the bad state."""
+            if len(points) > 1 or points[0]['fields']['value'] == 1:
+                raise influx_client.exceptions.InfluxDBClientError('bad')
+            written.extend(points)
+
+        mock_client.return_value.write_points.side_effect = write_points
+
+        for index in range(3):
+            state = mock.MagicMock(
+                state=index, domain='fake', object_id='entity',
+                entity_id='fake.entity', attributes={})
+            influx_thread.add(mock.MagicMock(
+                data={'new_state': state}, time_fired=index))
+
+        influx_thread.start()
+        influx_thread.block_till_done()
+        influx_thread.stop()
+        influx_thread.join()
+
+        self.assertEqual([0, 2],
+                         [point['fields']['value'] for point in written])
+        self.assertEqual(2, influx_thread.exported)
+        self.assertEqual(1, influx_thread.failed)
 
     def test_event_listener_states(self, mock_client):
         """Test the event listener against ignored states."""
@@ -212,6 +308,7 @@ class TestInfluxDB(unittest.TestCase):
                 },
             }]
             self.handler_method(event)
+            self.influx_thread.block_till_done()
             if state_state == 1:
                 self.assertEqual(
                     mock_client.return_value.write_points.call_count, 1
@@ -245,6 +342,7 @@ class TestInfluxDB(unittest.TestCase):
                 },
             }]
             self.handler_method(event)
+            self.influx_thread.block_till_done()
             if entity_id == 'ok':
                 self.assertEqual(
                     mock_client.return_value.write_points.call_count, 1
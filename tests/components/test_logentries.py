@@ -5,11 +5,13 @@ from unittest import mock
 
 from homeassistant.bootstrap import setup_component
 import homeassistant.components.logentries as logentries
+from homeassistant.helpers import exporter
 from homeassistant.const import STATE_ON, STATE_OFF, EVENT_STATE_CHANGED
 
 from tests.common import get_test_home_assistant
 
 
+@mock.patch.object(logentries.LogentriesExporter, 'flush_interval', 0)
 class TestLogentries(unittest.TestCase):
     """Test the Logentries component."""
 
@@ -60,6 +62,8 @@ class TestLogentries(unittest.TestCase):
         self.hass.bus.listen = mock.MagicMock()
         setup_component(self.hass, logentries.DOMAIN, config)
         self.handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        self.exporter = \
+            self.hass.data[exporter.DATA_EXPORTERS][logentries.DOMAIN]
 
     @mock.patch.object(logentries, 'requests')
     @mock.patch('json.dumps')
@@ -91,6 +95,7 @@ class TestLogentries(unittest.TestCase):
                        'logs/token',
                        'event': body}
             self.handler_method(event)
+            self.exporter.block_till_done()
             self.assertEqual(self.mock_post.call_count, 1)
             self.assertEqual(
                 self.mock_post.call_args,
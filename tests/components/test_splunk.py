@@ -4,11 +4,13 @@ from unittest import mock
 
 from homeassistant.bootstrap import setup_component
 import homeassistant.components.splunk as splunk
+from homeassistant.helpers import exporter
 from homeassistant.const import STATE_ON, STATE_OFF, EVENT_STATE_CHANGED
 
 from tests.common import get_test_home_assistant
 
 
+@mock.patch.object(splunk.SplunkExporter, 'flush_interval', 0)
 class TestSplunk(unittest.TestCase):
     """Test the Splunk component."""
 
@@ -68,6 +70,8 @@ class TestSplunk(unittest.TestCase):
         self.hass.bus.listen = mock.MagicMock()
         setup_component(self.hass, splunk.DOMAIN, config)
         self.handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        self.exporter = \
+            self.hass.data[exporter.DATA_EXPORTERS][splunk.DOMAIN]
 
     @mock.patch.object(splunk, 'requests')
     @mock.patch('json.dumps')
@@ -101,12 +105,13 @@ class TestSplunk(unittest.TestCase):
             payload = {'host': 'http://host:8088/services/collector/event',
                        'event': body}
             self.handler_method(event)
+            self.exporter.block_till_done()
             self.assertEqual(self.mock_post.call_count, 1)
             self.assertEqual(
                 self.mock_post.call_args,
                 mock.call(
                     payload['host'], data=payload,
-                    headers={'Authorization': 'Splunk secret'}
+                    headers={'Authorization': 'Splunk secret'}, timeout=10
                 )
             )
             self.mock_post.reset_mock()
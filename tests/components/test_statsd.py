@@ -7,11 +7,13 @@ import voluptuous as vol
 from homeassistant.bootstrap import setup_component
 import homeassistant.core as ha
 import homeassistant.components.statsd as statsd
+from homeassistant.helpers import exporter
 from homeassistant.const import (STATE_ON, STATE_OFF, EVENT_STATE_CHANGED)
 
 from tests.common import get_test_home_assistant
 
 
+@mock.patch.object(statsd.StatsdExporter, 'flush_interval', 0)
 class TestStatsd(unittest.TestCase):
     """Test the StatsD component."""
 
@@ -95,6 +97,10 @@ class TestStatsd(unittest.TestCase):
         setup_component(self.hass, statsd.DOMAIN, config)
         self.assertTrue(self.hass.bus.listen.called)
         handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        statsd_exporter = \
+            self.hass.data[exporter.DATA_EXPORTERS][statsd.DOMAIN]
+        pipe = mock_client.return_value.pipeline.return_value.__enter__.\
+            return_value
 
         valid = {'1': 1,
                  '1.0': 1.0,
@@ -104,24 +110,26 @@ class TestStatsd(unittest.TestCase):
             state = mock.MagicMock(state=in_,
                                    attributes={"attribute key": 3.2})
             handler_method(mock.MagicMock(data={'new_state': state}))
-            mock_client.return_value.gauge.assert_has_calls([
+            statsd_exporter.block_till_done()
+            pipe.gauge.assert_has_calls([
                 mock.call(state.entity_id, out, statsd.DEFAULT_RATE),
             ])
 
-            mock_client.return_value.gauge.reset_mock()
+            pipe.gauge.reset_mock()
 
-            self.assertEqual(mock_client.return_value.incr.call_count, 1)
+            self.assertEqual(pipe.incr.call_count, 1)
             self.assertEqual(
-                mock_client.return_value.incr.call_args,
+                pipe.incr.call_args,
                 mock.call(state.entity_id, rate=statsd.DEFAULT_RATE)
             )
-            mock_client.return_value.incr.reset_mock()
+            pipe.incr.reset_mock()
 
         for invalid in ('foo', '', object):
             handler_method(mock.MagicMock(data={
                 'new_state': ha.State('domain.test', invalid, {})}))
-            self.assertFalse(mock_client.return_value.gauge.called)
-            self.assertTrue(mock_client.return_value.incr.called)
+            statsd_exporter.block_till_done()
+            self.assertFalse(pipe.gauge.called)
+            self.assertTrue(pipe.incr.called)
 
     @mock.patch('statsd.StatsClient')
     def test_event_listener_attr_details(self, mock_client):
@@ -139,6 +147,10 @@ class TestStatsd(unittest.TestCase):
         setup_component(self.hass, statsd.DOMAIN, config)
         self.assertTrue(self.hass.bus.listen.called)
         handler_method = self.hass.bus.listen.call_args_list[0][0][1]
+        statsd_exporter = \
+            self.hass.data[exporter.DATA_EXPORTERS][statsd.DOMAIN]
+        pipe = mock_client.return_value.pipeline.return_value.__enter__.\
+            return_value
 
         valid = {'1': 1,
                  '1.0': 1.0,
@@ -148,24 +160,26 @@ class TestStatsd(unittest.TestCase):
             state = mock.MagicMock(state=in_,
                                    attributes={"attribute key": 3.2})
             handler_method(mock.MagicMock(data={'new_state': state}))
-            mock_client.return_value.gauge.assert_has_calls([
+            statsd_exporter.block_till_done()
+            pipe.gauge.assert_has_calls([
                 mock.call("%s.state" % state.entity_id,
                           out, statsd.DEFAULT_RATE),
                 mock.call("%s.attribute_key" % state.entity_id,
                           3.2, statsd.DEFAULT_RATE),
             ])
 
-            mock_client.return_value.gauge.reset_mock()
+            pipe.gauge.reset_mock()
 
-            self.assertEqual(mock_client.return_value.incr.call_count, 1)
+            self.assertEqual(pipe.incr.call_count, 1)
             self.assertEqual(
-                mock_client.return_value.incr.call_args,
+                pipe.incr.call_args,
                 mock.call(state.entity_id, rate=statsd.DEFAULT_RATE)
             )
-            mock_client.return_value.incr.reset_mock()
+            pipe.incr.reset_mock()
 
         for invalid in ('foo', '', object):
             handler_method(mock.MagicMock(data={
                 'new_state': ha.State('domain.test', invalid, {})}))
-            self.assertFalse(mock_client.return_value.gauge.called)
-            self.assertTrue(mock_client.return_value.incr.called)
+            statsd_exporter.block_till_done()
+            self.assertFalse(pipe.gauge.called)
+            self.assertTrue(pipe.incr.called)
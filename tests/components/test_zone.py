@@ -139,3 +139,47 @@ class TestComponentZone(unittest.TestCase):
 
         assert zone.in_zone(self.hass.states.get('zone.passive_zone'),
                             latitude, longitude)
+
+    def test_zone_index_follows_zone_states(self):
+        """Test the zone index follows the zone states."""
+        latitude = 32.880600
+        longitude = -117.237561
+        assert bootstrap.setup_component(self.hass, zone.DOMAIN, {
+            'zone': [
+                {
+                    'name': 'Near Zone',
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'radius': 250,
+                },
+                {
+                    'name': 'Far Zone',
+                    'latitude': latitude + 1,
+                    'longitude': longitude,
+                    'radius': 250,
+                },
+            ]
+        })
+
+        index = self.hass.data[zone.DATA_ZONE_INDEX]
+        assert ['zone.near_zone'] == [
+            state.entity_id for state in index.near(latitude, longitude)]
+
+        self.hass.states.set('zone.added_zone', zone.STATE, {
+            'latitude': latitude + 0.001,
+            'longitude': longitude,
+            'radius': 50,
+        })
+        self.hass.block_till_done()
+
+        assert ['zone.added_zone', 'zone.near_zone'] == [
+            state.entity_id for state in index.near(latitude, longitude)]
+        assert 'zone.added_zone' == zone.active_zone(
+            self.hass, latitude + 0.001, longitude).entity_id
+
+        self.hass.states.remove('zone.added_zone')
+        self.hass.block_till_done()
+
+        assert 'zone.near_zone' == zone.active_zone(
+            self.hass, latitude + 0.001, longitude).entity_id
+        assert zone.active_zone(self.hass, latitude + 0.5, longitude) is None
@@ -7,6 +7,7 @@ import pytest
 
 import homeassistant.helpers.entity as entity
 from homeassistant.const import ATTR_HIDDEN
+from homeassistant.core import POOL_POLLING
 
 from tests.common import get_test_home_assistant
 
@@ -43,6 +44,8 @@ def test_async_update_support(event_loop):
 
     ent = AsyncEntity()
     ent.hass.loop = event_loop
+    # Run sync updates in the default executor of the loop
+    ent.hass.executors = {POOL_POLLING: None}
 
     @asyncio.coroutine
     def test():
@@ -1,7 +1,9 @@
 """The tests for the Entity component helper."""
 # pylint: disable=protected-access
+import asyncio
 from collections import OrderedDict
 import logging
+import threading
 import unittest
 from unittest.mock import patch, Mock
 
@@ -11,6 +13,7 @@ from homeassistant.components import group
 from homeassistant.helpers.entity import Entity, generate_entity_id
 from homeassistant.helpers.entity_component import EntityComponent
 from homeassistant.helpers import discovery
+from homeassistant.util.async import run_callback_threadsafe
 import homeassistant.util.dt as dt_util
 
 from tests.common import (
@@ -127,6 +130,83 @@ class TestHelpersEntityComponent(unittest.TestCase):
 
         assert 2 == len(self.hass.states.entity_ids())
 
+    def test_polling_staggers_updates(self):
+        """Test the updates are spread over the poll window."""
+        component = EntityComponent(_LOGGER, DOMAIN, self.hass, 20)
+        component.add_entities(
+            [EntityTest(should_poll=True) for _ in range(3)])
+        platform = component._platforms['core']
+
+        with patch.object(self.hass.loop, 'call_later') as mock_later, \
+                patch.object(platform, '_async_start_update') as mock_start:
+            run_callback_threadsafe(
+                self.hass.loop, platform._async_update_entity_states,
+                dt_util.utcnow()).result()
+
+        assert mock_start.call_count == 1
+        assert [20 / 3, 40 / 3] == \
+            [call[0][0] for call in mock_later.call_args_list]
+
+    def test_polling_skips_entity_still_updating(self):
+        """Test an entity is not polled again while it is updating."""
+        component = EntityComponent(_LOGGER, DOMAIN, self.hass, 20)
+        release = asyncio.Event(loop=self.hass.loop)
+        calls = []
+
+        @asyncio.coroutine
+        def async_update():
+            """Wait till released."""
+            calls.append(1)
+            yield from release.wait()
+
+        ent = EntityTest(should_poll=True)
+        component.add_entities([ent])
+        ent.async_update = async_update
+        platform = component._platforms['core']
+
+        for _ in range(2):
+            run_callback_threadsafe(
+                self.hass.loop, platform._async_update_entity_states,
+                dt_util.utcnow()).result()
+
+        self.hass.loop.call_soon_threadsafe(release.set)
+        self.hass.block_till_done()
+        assert len(calls) == 1
+        assert not platform._updating
+
+        run_callback_threadsafe(
+            self.hass.loop, platform._async_update_entity_states,
+            dt_util.utcnow()).result()
+        self.hass.block_till_done()
+        assert len(calls) == 2
+
+    @patch('homeassistant.helpers.entity_component.UPDATE_TIMEOUT', 0.01)
+    def test_slow_update_does_not_block_platform(self):
+        """Test a slow sync update gives up its slot after the timeout."""
+        component = EntityComponent(_LOGGER, DOMAIN, self.hass)
+        platform = component._platforms['core']
+        platform._update_slots = asyncio.Semaphore(1, loop=self.hass.loop)
+        release = threading.Event()
+        fast_updated = threading.Event()
+
+        slow = EntityTest(should_poll=True)
+        fast = EntityTest(should_poll=True)
+        component.add_entities([slow, fast])
+        slow.update = release.wait
+        fast.update = fast_updated.set
+
+        try:
+            for ent in (slow, fast):
+                run_callback_threadsafe(
+                    self.hass.loop, platform._async_start_update, ent).result()
+
+            assert fast_updated.wait(2)
+        finally:
+            release.set()
+
+        self.hass.block_till_done()
+        assert not platform._updating
+
     def test_update_state_adds_entities_with_update_befor_add_true(self):
         """Test if call update befor add to state machine."""
         component = EntityComponent(_LOGGER, DOMAIN, self.hass)
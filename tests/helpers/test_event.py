@@ -15,10 +15,12 @@ from homeassistant.helpers.event import (
     track_utc_time_change,
     track_time_change,
     track_state_change,
+    track_template_states,
     track_sunrise,
     track_sunset,
 )
 from homeassistant.components import sun
+from homeassistant.helpers.template import Template
 import homeassistant.util.dt as dt_util
 
 from tests.common import get_test_home_assistant
@@ -187,6 +189,86 @@ class TestEventHelpers(unittest.TestCase):
         self.assertEqual(5, len(wildcard_runs))
         self.assertEqual(6, len(wildercard_runs))
 
+    def test_track_template_states(self):
+        """Test track_template_states follows the states last rendered."""
+        runs = []
+
+        @ha.callback
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        tpl = Template(
+            '{% if is_state("switch.test", "on") %}'
+            '{{ states.sensor.on.state }}{% else %}'
+            '{{ states.sensor.off.state }}{% endif %}', self.hass)
+
+        remove = track_template_states(self.hass, tpl, run_callback)
+
+        # Not rendered yet, all states are tracked
+        self.hass.states.set('light.other', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['light.other'], runs)
+
+        tpl.render()
+        self.hass.states.set('light.other', 'off')
+        self.hass.states.set('sensor.on', '1')
+        self.hass.states.set('sensor.off', '1')
+        self.hass.block_till_done()
+        self.assertEqual(['light.other', 'sensor.off'], runs)
+
+        self.hass.states.set('switch.test', 'on')
+        tpl.render()
+        self.hass.states.set('sensor.on', '2')
+        self.hass.states.set('sensor.off', '2')
+        self.hass.block_till_done()
+        self.assertEqual(
+            ['light.other', 'sensor.off', 'switch.test', 'sensor.on'], runs)
+
+        remove()
+        self.hass.states.set('sensor.on', '3')
+        self.hass.states.set('switch.test', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(4, len(runs))
+
+    def test_track_template_states_domain(self):
+        """Test track_template_states follows iterated domains."""
+        runs = []
+
+        @ha.callback
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        tpl = Template(
+            '{{ states.switch.test.state }}'
+            '{% for state in states.sensor %}{{ state.state }}{% endfor %}',
+            self.hass)
+        tpl.render()
+
+        track_template_states(self.hass, tpl, run_callback)
+
+        self.hass.states.set('light.other', 'on')
+        self.hass.states.set('sensor.new', '1')
+        self.hass.states.set('switch.test', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['sensor.new', 'switch.test'], runs)
+
+    def test_track_template_states_no_states(self):
+        """Test a render reading no states keeps tracking all states."""
+        runs = []
+
+        @ha.callback
+        def run_callback(entity_id, old_state, new_state):
+            runs.append(entity_id)
+
+        tpl = Template('{{ 1 + 1 }}', self.hass)
+        tpl.render()
+
+        track_template_states(self.hass, tpl, run_callback)
+
+        self.hass.states.set('light.other', 'on')
+        self.hass.block_till_done()
+        self.assertEqual(['light.other'], runs)
+
     def test_track_sunrise(self):
         """Test track the sunrise."""
         latitude = 32.87336
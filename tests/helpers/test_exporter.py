@@ -0,0 +1,225 @@
+"""Test the exporter helpers."""
+import unittest
+from unittest import mock
+
+import homeassistant.core as ha
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.helpers import exporter
+
+from tests.common import get_test_home_assistant
+
+
+class MockExporter(exporter.Exporter):
+    """Exporter that records the exported batches."""
+
+    flush_interval = 0
+    retry_exceptions = (IOError,)
+    retry_delay = 0
+
+    def __init__(self, hass, name='mock', entity_filter=None):
+        """Initialize the mock exporter."""
+        super().__init__(hass, name, entity_filter)
+        self.batches = []
+        self.side_effect = []
+
+    def export(self, events):
+        """Record the batch or raise the next side effect."""
+        if self.side_effect:
+            raise self.side_effect.pop(0)
+        self.batches.append(
+            [event.data['entity_id'] for event in events])
+
+
+def test_generate_filter_all():
+    """Test a filter without rules passes all entities."""
+    entity_filter = exporter.generate_filter()
+
+    assert entity_filter('light.kitchen')
+    assert entity_filter('sensor.outside')
+
+
+def test_generate_filter_include_exclude():
+    """Test a filter with includes and excludes."""
+    entity_filter = exporter.generate_filter(
+        include_entities=['sensor.outside'],
+        exclude_entities=['light.kitchen'],
+        include_domains=['light', 'switch'],
+        exclude_domains=['switch'])
+
+    assert entity_filter('sensor.outside')
+    assert entity_filter('light.living_room')
+    assert not entity_filter('light.kitchen')
+    assert not entity_filter('switch.ac')
+    assert not entity_filter('sensor.inside')
+
+
+def test_generate_filter_exclude_only():
+    """Test a filter with only excludes passes the rest."""
+    entity_filter = exporter.generate_filter(
+        exclude_entities=['light.kitchen'], exclude_domains=['switch'])
+
+    assert entity_filter('light.living_room')
+    assert not entity_filter('light.kitchen')
+    assert not entity_filter('switch.ac')
+
+
+class TestExporter(unittest.TestCase):
+    """Test the Exporter class."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Setup things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def test_export_state_changes(self):
+        """Test state changes passing the filter are exported."""
+        export = MockExporter(
+            self.hass, entity_filter=exporter.generate_filter(
+                exclude_domains=['switch']))
+        export.register()
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.states.set('switch.ac', 'on')
+        self.hass.states.remove('light.kitchen')
+        self.hass.block_till_done()
+        export.block_till_done()
+
+        self.assertEqual([['light.kitchen']], export.batches)
+        self.assertIs(export, self.hass.data[exporter.DATA_EXPORTERS]['mock'])
+        self.assertEqual({
+            'queued': 0,
+            'exported': 1,
+            'dropped': 0,
+            'failed': 0,
+        }, export.metrics())
+
+    def test_export_in_batches(self):
+        """Test queued events are exported in batches of batch_size."""
+        export = MockExporter(self.hass)
+        export.batch_size = 2
+
+        for index in range(3):
+            export.add(ha.Event('state_changed', {
+                'entity_id': 'light.{}'.format(index)}))
+
+        export.start()
+        export.block_till_done()
+
+        self.assertEqual([['light.0', 'light.1'], ['light.2']],
+                         export.batches)
+
+    def test_shutdown_exports_queued_events(self):
+        """Test the queued events are exported on shutdown."""
+        export = MockExporter(self.hass)
+        export.register()
+
+        self.hass.states.set('light.kitchen', 'on')
+        self.hass.block_till_done()
+        self.hass.bus.fire(EVENT_HOMEASSISTANT_STOP)
+        self.hass.block_till_done()
+
+        self.assertFalse(export.is_alive())
+        self.assertEqual([['light.kitchen']], export.batches)
+
+    def test_retry_export(self):
+        """Test an export is retried after a retry exception."""
+        export = MockExporter(self.hass)
+        export.side_effect = [IOError('down'), IOError('down')]
+
+        export.add(ha.Event('state_changed', {'entity_id': 'light.kitchen'}))
+        export.start()
+        export.block_till_done()
+
+        self.assertEqual([['light.kitchen']], export.batches)
+        self.assertEqual(1, export.exported)
+        self.assertEqual(0, export.failed)
+
+    def test_failed_export(self):
+        """Test a batch fails after retries or an unexpected exception."""
+        export = MockExporter(self.hass)
+        export.retry_count = 1
+        export.side_effect = [IOError('down'), IOError('down'),
+                              ValueError('bad')]
+
+        export.add(ha.Event('state_changed', {'entity_id': 'light.kitchen'}))
+        export.start()
+        export.block_till_done()
+        export.add(ha.Event('state_changed', {'entity_id': 'light.kitchen'}))
+        export.block_till_done()
+
+        self.assertEqual([], export.batches)
+        self.assertEqual(0, export.exported)
+        self.assertEqual(2, export.failed)
+        self.assertTrue(export.is_alive())
+
+    @mock.patch.object(MockExporter, 'queue_size', 2)
+    def test_drop_newest(self):
+        """Test new events are dropped when the queue is full."""
+        export = MockExporter(self.hass)
+
+        for index in range(3):
+            export.add(index)
+
+        self.assertEqual(1, export.dropped)
+        self.assertEqual([0, 1], list(export.queue.queue))
+
+    @mock.patch.object(MockExporter, 'queue_size', 2)
+    @mock.patch.object(MockExporter, 'drop_policy', exporter.DROP_OLDEST)
+    def test_drop_oldest(self):
+        """Test old events are dropped when the queue is full."""
+        export = MockExporter(self.hass)
+
+        for index in range(3):
+            export.add(index)
+
+        self.assertEqual(1, export.dropped)
+        self.assertEqual([1, 2], list(export.queue.queue))
+
+    @mock.patch.object(MockExporter, 'queue_size', 1)
+    @mock.patch.object(MockExporter, 'drop_policy', exporter.DROP_OLDEST)
+    def test_drop_oldest_keeps_stop(self):
+        """Test the request to stop is never dropped."""
+        export = MockExporter(self.hass)
+
+        export.stop()
+        export.add(1)
+
+        self.assertEqual(1, export.dropped)
+        self.assertEqual([export._quit_object], list(export.queue.queue))
+
+    @mock.patch.object(MockExporter, 'queue_size', 1)
+    def test_stop_full_queue(self):
+        """Test stopping never blocks on a full queue."""
+        export = MockExporter(self.hass)
+
+        export.add(1)
+        export.stop()
+
+        self.assertEqual(1, export.dropped)
+        self.assertEqual([export._quit_object], list(export.queue.queue))
+
+    def test_stop_ends_retries(self):
+        """Test a failed export is not retried after stop is requested."""
+        export = MockExporter(self.hass)
+        export.retry_delay = 60
+        export.side_effect = [IOError('down'), IOError('down')]
+
+        export.add(ha.Event('state_changed', {'entity_id': 'light.kitchen'}))
+        export.start()
+        export.shutdown(None)
+
+        self.assertFalse(export.is_alive())
+        self.assertEqual(1, export.failed)
+
+    def test_shutdown_timeout(self):
+        """Test shutdown waits at most shutdown_timeout for the worker."""
+        export = MockExporter(self.hass)
+        export.shutdown_timeout = 0
+
+        with mock.patch.object(export, 'join') as mock_join:
+            export.shutdown(None)
+
+        mock_join.assert_called_once_with(0)
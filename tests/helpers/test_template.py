@@ -461,6 +461,113 @@ class TestHelpersTemplate(unittest.TestCase):
                 '{{ closest(states.group.location_group).entity_id }}',
                 self.hass).render())
 
+    def test_identical_templates_share_compiled_code(self):
+        """Test templates with the same source share compiled code."""
+        source = '{{ states("sensor.shared_compiled_code") }}'
+        info = template.COMPILED_CACHE.info()
+
+        first = template.Template(source, self.hass)
+        second = template.Template(source, self.hass)
+        first.ensure_valid()
+        second.ensure_valid()
+
+        self.assertIs(first._compiled_code, second._compiled_code)
+        self.assertEqual(info['misses'] + 1,
+                         template.COMPILED_CACHE.info()['misses'])
+        self.assertEqual(info['hits'] + 1,
+                         template.COMPILED_CACHE.info()['hits'])
+
+    def test_compiled_cache_evicts_least_recently_used(self):
+        """Test the compiled cache evicts the least recently used source."""
+        cache = template.CompiledCache(template.ENV, 2)
+
+        first = cache.compile('{{ 1 }}')
+        cache.compile('{{ 2 }}')
+        self.assertIs(first, cache.compile('{{ 1 }}'))
+        cache.compile('{{ 3 }}')
+
+        self.assertEqual({'hits': 1, 'misses': 3, 'size': 2, 'max_size': 2},
+                         cache.info())
+        self.assertIs(first, cache.compile('{{ 1 }}'))
+        cache.compile('{{ 2 }}')
+        self.assertEqual(4, cache.info()['misses'])
+
+        cache.clear()
+        self.assertEqual({'hits': 0, 'misses': 0, 'size': 0, 'max_size': 2},
+                         cache.info())
+
+    def test_render_info_entities(self):
+        """Test render info records the entities read by the render."""
+        tpl = template.Template(
+            '{{ states.sensor.one.state }} {{ states("sensor.two") }} '
+            '{{ is_state("sensor.three", "on") }} '
+            '{{ is_state_attr("sensor.four", "unit", "W") }}', self.hass)
+        self.assertIsNone(tpl.render_info)
+
+        tpl.render()
+
+        self.assertEqual({'sensor.one', 'sensor.two', 'sensor.three',
+                          'sensor.four'}, tpl.render_info.entities)
+        self.assertEqual(set(), tpl.render_info.domains)
+        self.assertFalse(tpl.render_info.all_states)
+
+    def test_render_info_only_branch_taken(self):
+        """Test render info only records the states actually read."""
+        tpl = template.Template(
+            '{% if is_state("switch.test", "on") %}'
+            '{{ states.sensor.on.state }}{% else %}'
+            '{{ states.sensor.off.state }}{% endif %}', self.hass)
+
+        tpl.render()
+        self.assertEqual({'switch.test', 'sensor.off'},
+                         tpl.render_info.entities)
+
+        self.hass.states.set('switch.test', 'on')
+        tpl.render()
+        self.assertEqual({'switch.test', 'sensor.on'},
+                         tpl.render_info.entities)
+
+    def test_render_info_domains_and_all_states(self):
+        """Test render info records iterated domains and all states."""
+        tpl = template.Template(
+            '{% for state in states.sensor %}{{ state.state }}{% endfor %}',
+            self.hass)
+        tpl.render()
+        self.assertEqual({'sensor'}, tpl.render_info.domains)
+        self.assertFalse(tpl.render_info.all_states)
+
+        tpl = template.Template(
+            '{% for state in states %}{{ state.state }}{% endfor %}',
+            self.hass)
+        tpl.render()
+        self.assertTrue(tpl.render_info.all_states)
+
+    def test_render_info_closest_group(self):
+        """Test render info records the group and its members."""
+        group.Group.create_group(
+            self.hass, 'location group', ['test_domain.object'])
+
+        tpl = template.Template(
+            '{{ closest("group.location_group") }}', self.hass)
+        tpl.render()
+
+        self.assertEqual({'group.location_group', 'test_domain.object'},
+                         tpl.render_info.entities)
+
+    def test_render_listener(self):
+        """Test render listeners are called after each render."""
+        infos = []
+        tpl = template.Template('{{ states.sensor.one.state }}', self.hass)
+        remove = tpl.async_add_render_listener(infos.append)
+
+        tpl.render()
+        self.assertEqual(1, len(infos))
+        self.assertIs(tpl.render_info, infos[0])
+
+        remove()
+        tpl.render()
+        self.assertEqual(1, len(infos))
+
     def test_closest_function_to_coord(self):
         """Test closest function to coord."""
         self.hass.states.set('test_domain.closest_home', 'happy', {
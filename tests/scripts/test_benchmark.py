@@ -0,0 +1,18 @@
+"""Test benchmark script."""
+import unittest
+from unittest.mock import patch
+
+import homeassistant.scripts.benchmark as benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    """Tests homeassistant.scripts.benchmark module."""
+
+    @patch('builtins.print')
+    def test_benchmarks_run(self, mock_print):
+        """Test all benchmarks run to completion."""
+        for name in benchmark.BENCHMARKS:
+            self.assertEqual(0, benchmark.run(
+                [name, '--events', '10', '--listeners', '2']))
+
+        self.assertEqual(len(benchmark.BENCHMARKS), mock_print.call_count)
@@ -0,0 +1,99 @@
+"""Test the database migrator script."""
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from homeassistant.components.recorder import models
+import homeassistant.scripts.db_migrator as db_migrator
+
+
+class TestNormalizeAttributes(unittest.TestCase):
+    """Tests moving attributes into the state_attributes table."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Setup an in memory database."""
+        engine = create_engine('sqlite://')
+        models.Base.metadata.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Close the database."""
+        self.session.close()
+
+    @patch('sys.stdout')
+    @patch('builtins.print')
+    def test_skip_invalid_attributes(self, mock_print, mock_stdout):
+        """Test states with invalid attributes are skipped."""
+        for attributes in ('{"a": 1}', 'not json', '{"a": 1}'):
+            self.session.add(models.States(
+                entity_id='test.migrate', state='on', attributes=attributes))
+        self.session.commit()
+
+        db_migrator.normalize_attributes(self.session)
+
+        states = self.session.query(models.States).order_by(
+            models.States.state_id).all()
+        self.assertEqual([None, 'not json', None],
+                         [state.attributes for state in states])
+        self.assertEqual(states[0].attributes_id, states[2].attributes_id)
+        self.assertIsNone(states[1].attributes_id)
+        self.assertEqual(1, self.session.query(models.StateAttributes).count())
+
+
+class TestConvertLegacy(unittest.TestCase):
+    """Tests converting a legacy database."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Create a legacy database."""
+        self.config_dir = tempfile.TemporaryDirectory()
+        conn = sqlite3.connect(
+            os.path.join(self.config_dir.name, 'home-assistant.db'))
+        conn.execute("CREATE TABLE recorder_runs (run_id INTEGER PRIMARY "
+                     "KEY, start INTEGER, end INTEGER, closed_incorrect "
+                     "INTEGER, created INTEGER)")
+        conn.execute("CREATE TABLE events (event_id INTEGER PRIMARY KEY, "
+                     "event_type TEXT, event_data TEXT, origin TEXT, "
+                     "created INTEGER, time_fired INTEGER)")
+        conn.execute("CREATE TABLE states (state_id INTEGER PRIMARY KEY, "
+                     "entity_id TEXT, state TEXT, attributes TEXT, "
+                     "last_changed INTEGER, last_updated INTEGER, "
+                     "event_id INTEGER, domain TEXT)")
+        conn.execute("INSERT INTO recorder_runs (start, end, "
+                     "closed_incorrect, created) VALUES (0, 1, 0, 0)")
+        conn.execute("INSERT INTO events (event_type, event_data, origin, "
+                     "created, time_fired) VALUES ('state_changed', '{}', "
+                     "'LOCAL', 0, 0)")
+        for attributes in ('{"a": 1}', 'not json', None, '{"a": 1}'):
+            conn.execute("INSERT INTO states (entity_id, state, attributes, "
+                         "last_changed, last_updated, event_id, domain) "
+                         "VALUES ('test.migrate', 'on', ?, 0, 0, 1, 'test')",
+                         (attributes,))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Remove the databases."""
+        self.config_dir.cleanup()
+
+    @patch('sys.stdout')
+    @patch('builtins.print')
+    def test_skip_invalid_attributes(self, mock_print, mock_stdout):
+        """Test legacy states with invalid attributes are skipped."""
+        with patch('sys.argv', ['db_migrator', '-c', self.config_dir.name]):
+            self.assertEqual(0, db_migrator.run([]))
+
+        engine = create_engine('sqlite:///{}'.format(
+            os.path.join(self.config_dir.name, 'home-assistant_v2.db')))
+        session = sessionmaker(bind=engine)()
+        states = session.query(models.States).all()
+        self.assertEqual(2, len(states))
+        self.assertEqual(states[0].attributes_id, states[1].attributes_id)
+        self.assertEqual(1, session.query(models.StateAttributes).count())
+        session.close()
+        mock_print.assert_any_call(
+            "Skipped 2 states with invalid attributes")
@@ -3,11 +3,14 @@
 from unittest import mock
 import threading
 import logging
+import time
 
 import voluptuous as vol
 
 from homeassistant import bootstrap, loader
 import homeassistant.util.dt as dt_util
+from homeassistant.util.async import (
+    run_callback_threadsafe, run_coroutine_threadsafe)
 from homeassistant.helpers.config_validation import PLATFORM_SCHEMA
 
 from tests.common import \
@@ -217,8 +220,8 @@ class TestBootstrap:
         assert bootstrap.setup_component(self.hass, 'comp')
         assert not mock_setup.called
 
-    @mock.patch('homeassistant.util.package.install_package',
-                return_value=False)
+    @mock.patch('homeassistant.util.package.install_packages',
+                return_value=['package==0.0.1'])
     def test_component_not_installed_if_requirement_fails(self, mock_install):
         """Component setup should fail if requirement can't install."""
         self.hass.config.skip_pip = False
@@ -381,3 +384,107 @@ class TestBootstrap:
         assert bootstrap.setup_component(self.hass, 'disabled_component')
         assert loader.get_component('disabled_component') is not None
         assert 'disabled_component' in self.hass.config.components
+
+    def test_setup_components_concurrently(self):
+        """Test independent components are set up at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        order = []
+
+        def setup_waiting(domain):
+            """Return a setup that needs another setup to run alongside."""
+            def setup(hass, config):
+                """Wait for the other component."""
+                barrier.wait()
+                order.append(domain)
+                return True
+            return setup
+
+        def setup_dependent(hass, config):
+            """Setup a component that depends on comp_a."""
+            order.append('comp_c')
+            return True
+
+        loader.set_component(
+            'comp_a', MockModule('comp_a', setup=setup_waiting('comp_a')))
+        loader.set_component(
+            'comp_b', MockModule('comp_b', setup=setup_waiting('comp_b')))
+        loader.set_component(
+            'comp_c', MockModule('comp_c', ['comp_a'], setup=setup_dependent))
+
+        run_coroutine_threadsafe(bootstrap._async_setup_components(
+            self.hass, ['comp_c', 'comp_a', 'comp_b'], {}),
+            self.hass.loop).result()
+
+        assert sorted(self.hass.config.components) == \
+            ['comp_a', 'comp_b', 'comp_c']
+        assert order[-1] == 'comp_c'
+        assert sorted(self.hass.data['setup_timings']) == \
+            ['comp_a', 'comp_b', 'comp_c']
+
+    def test_setup_component_waits_for_running_setup(self):
+        """Test a component being set up is not set up twice."""
+        event = threading.Event()
+        mock_setup = mock.MagicMock(
+            side_effect=lambda hass, config: event.wait(5))
+
+        loader.set_component('comp', MockModule('comp', setup=mock_setup))
+
+        first = run_coroutine_threadsafe(
+            bootstrap.async_setup_component(self.hass, 'comp'),
+            self.hass.loop)
+        second = run_coroutine_threadsafe(
+            bootstrap.async_setup_component(self.hass, 'comp'),
+            self.hass.loop)
+
+        while not mock_setup.called:
+            time.sleep(0.01)
+        # Let the second setup reach the running one
+        run_callback_threadsafe(self.hass.loop, lambda: None).result()
+        event.set()
+
+        assert first.result() and second.result()
+        assert mock_setup.call_count == 1
+
+    def test_setup_component_rejects_cross_thread_cycle(self):
+        """Test setups waiting on each other from two threads fail fast."""
+        barrier = threading.Barrier(2, timeout=5)
+        results = {}
+
+        def setup_other(domain, other):
+            """Return a setup that sets up the other component."""
+            def setup(hass, config):
+                """Set up the other component while it is set up."""
+                barrier.wait()
+                results[domain] = bootstrap.setup_component(hass, other)
+                return True
+            return setup
+
+        loader.set_component('comp_a', MockModule(
+            'comp_a', setup=setup_other('comp_a', 'comp_b')))
+        loader.set_component('comp_b', MockModule(
+            'comp_b', setup=setup_other('comp_b', 'comp_a')))
+
+        run_coroutine_threadsafe(bootstrap._async_setup_components(
+            self.hass, ['comp_a', 'comp_b'], {}),
+            self.hass.loop).result(10)
+
+        assert sorted(results.values()) == [False, True]
+        assert sorted(self.hass.config.components) == ['comp_a', 'comp_b']
+        assert self.hass.data['setup_waits'] == {}
+
+    @mock.patch('homeassistant.util.package.install_packages',
+                return_value=[])
+    def test_setup_profile(self, mock_install):
+        """Test the time it took to setup components is profiled."""
+        self.hass.config.skip_pip = False
+        loader.set_component(
+            'comp', MockModule('comp', requirements=['package==0.0.1']))
+
+        assert bootstrap.setup_component(self.hass, 'comp')
+
+        with mock.patch.dict(loader.IMPORT_TIMINGS, {'comp': 0.5}):
+            profile = bootstrap.setup_profile(self.hass)
+
+        assert profile['comp']['import'] == 0.5
+        assert profile['comp']['requirements'] >= 0
+        assert profile['comp']['setup'] >= profile['comp']['requirements']
@@ -7,7 +7,8 @@ import unittest.mock as mock
 import pytest
 from voluptuous import MultipleInvalid
 
-from homeassistant.core import DOMAIN, HomeAssistantError, Config
+from homeassistant.core import (
+    DOMAIN, EXECUTOR_POOLS, HomeAssistantError, Config)
 import homeassistant.config as config_util
 from homeassistant.const import (
     CONF_LATITUDE, CONF_LONGITUDE, CONF_UNIT_SYSTEM, CONF_NAME,
@@ -180,6 +181,8 @@ class TestConfig(unittest.TestCase):
             {'customize': 'bla'},
             {'customize': {'invalid_entity_id': {}}},
             {'customize': {'light.sensor': 100}},
+            {'executor_pools': {'unknown': 5}},
+            {'executor_pools': {'io': 0}},
         ):
             with pytest.raises(MultipleInvalid):
                 config_util.CORE_CONFIG_SCHEMA(value)
@@ -194,6 +197,10 @@ class TestConfig(unittest.TestCase):
                     'hidden': True,
                 },
             },
+            'executor_pools': {
+                'default': 20,
+                'polling': '30',
+            },
         })
 
     def test_entity_customization(self):
@@ -288,6 +295,23 @@ class TestConfig(unittest.TestCase):
         assert self.hass.config.units.name == CONF_UNIT_SYSTEM_IMPERIAL
         assert self.hass.config.time_zone.zone == 'America/New_York'
 
+    def test_loading_configuration_executor_pools(self):
+        """Test the executor pools are resized from the core config."""
+        run_coroutine_threadsafe(
+            config_util.async_process_ha_core_config(self.hass, {
+                'latitude': 60,
+                'longitude': 50,
+                'elevation': 25,
+                'time_zone': 'America/New_York',
+                'executor_pools': {
+                    'polling': 30,
+                },
+            }), self.hass.loop).result()
+
+        assert self.hass.executors['polling'].metrics()['max_workers'] == 30
+        assert self.hass.executors['io'].metrics()['max_workers'] == \
+            EXECUTOR_POOLS['io']
+
     def test_loading_configuration_temperature_unit(self):
         """Test backward compatibility when loading core config."""
         self.hass.config = mock.Mock()
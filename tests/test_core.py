@@ -1,6 +1,8 @@
 """Test to verify that Home Assistant core works."""
 # pylint: disable=protected-access
 import asyncio
+import json
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
@@ -192,6 +194,82 @@ class TestHomeAssistant(unittest.TestCase):
         self.hass.block_till_done()
         assert len(call_count) == 40
 
+    def test_add_job_to_named_pool(self):
+        """Test a sync job runs in the requested executor pool."""
+        threads = []
+
+        def test_executor():
+            """Test executor."""
+            threads.append(threading.current_thread())
+
+        self.hass.add_job(test_executor, pool=ha.POOL_IO)
+        self.hass.block_till_done()
+
+        assert threads[0] in self.hass.executors[ha.POOL_IO]._threads
+
+
+class TestExecutorPool(unittest.TestCase):
+    """Test the ExecutorPool class."""
+
+    # pylint: disable=invalid-name
+    def setUp(self):
+        """Setup things to be run when tests are started."""
+        self.executor = ha.ExecutorPool('test', 1)
+
+    # pylint: disable=invalid-name
+    def tearDown(self):
+        """Stop down stuff we started."""
+        self.executor.shutdown()
+
+    def test_metrics(self):
+        """Test the queued and busy jobs are counted."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_job():
+            """Block the only worker."""
+            started.set()
+            release.wait()
+
+        running = self.executor.submit(blocking_job)
+        started.wait()
+        waiting = self.executor.submit(lambda: 'done')
+
+        self.assertEqual({
+            'max_workers': 1,
+            'threads': 1,
+            'busy': 1,
+            'queued': 1,
+        }, self.executor.metrics())
+
+        release.set()
+        running.result()
+        self.assertEqual('done', waiting.result())
+        self.assertEqual(0, self.executor.metrics()['busy'])
+        self.assertEqual(0, self.executor.metrics()['queued'])
+
+    def test_resize(self):
+        """Test growing the pool starts more threads."""
+        self.executor.resize(2)
+        started = threading.Barrier(3)
+
+        futures = [self.executor.submit(started.wait) for _ in range(2)]
+        started.wait(timeout=5)
+
+        for future in futures:
+            future.result()
+        self.assertEqual(2, self.executor.metrics()['threads'])
+
+    def test_exception_in_job(self):
+        """Test a failing job is not counted as busy."""
+        def failing_job():
+            """Raise an exception."""
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            self.executor.submit(failing_job).result()
+        self.assertEqual(0, self.executor.metrics()['busy'])
+
 
 class TestEvent(unittest.TestCase):
     """A Test Event class."""
@@ -365,6 +443,25 @@ class TestEventBus(unittest.TestCase):
         self.hass.block_till_done()
         assert len(callback_calls) == 1
 
+    def test_callback_event_listener_inline(self):
+        """Test callback listeners run inline and errors are isolated."""
+        callback_calls = []
+
+        @ha.callback
+        def failing_listener(event):
+            raise ValueError('Boom')
+
+        @ha.callback
+        def callback_listener(event):
+            callback_calls.append(event)
+
+        self.bus.listen('test_callback', failing_listener)
+        self.bus.listen('test_callback', callback_listener)
+
+        run_callback_threadsafe(
+            self.hass.loop, self.bus.async_fire, 'test_callback').result()
+        assert len(callback_calls) == 1
+
     def test_coroutine_event_listener(self):
         """Test a  event listener listeners."""
         coroutine_calls = []
@@ -415,6 +512,30 @@ class TestState(unittest.TestCase):
         state = ha.State('domain.hello', 'world', {'some': 'attr'})
         self.assertEqual(state, ha.State.from_dict(state.as_dict()))
 
+    def test_as_json(self):
+        """Test the JSON representation is memoized."""
+        state = ha.State('domain.hello', 'world', {'some': 'attr'})
+
+        self.assertEqual(
+            json.dumps(state.as_dict(), sort_keys=True, cls=ha.JSONEncoder),
+            state.as_json())
+        self.assertIs(state.as_json(), state.as_json())
+
+    def test_json_dumps(self):
+        """Test json_dumps matches the JSONEncoder output."""
+        state = ha.State('domain.hello', 'world', {'some': 'attr'})
+        event = ha.Event(EVENT_STATE_CHANGED, {
+            'entity_id': 'domain.hello',
+            'old_state': None,
+            'new_state': state,
+        })
+
+        for obj in (state, [state, state], {'state': state, 'other': 1},
+                    event, {'no': ['states']}):
+            self.assertEqual(
+                json.dumps(obj, sort_keys=True, cls=ha.JSONEncoder),
+                ha.json_dumps(obj))
+
     def test_dict_conversion_with_wrong_data(self):
         """Test conversion with wrong data."""
         self.assertIsNone(ha.State.from_dict(None))
@@ -480,6 +601,33 @@ class TestStateMachine(unittest.TestCase):
         self.assertEqual(1, len(ent_ids))
         self.assertTrue('light.bowl' in ent_ids)
 
+    def test_sorted_domain_index(self):
+        """Test the sorted states follow sets and removals."""
+        self.states.set('light.Attic', 'off')
+        self.states.set('light_ext.a', 'off')
+        self.states.set('light.Bowl', 'off')
+
+        self.assertEqual(
+            ['light.attic', 'light.bowl', 'light_ext.a', 'switch.ac'],
+            [state.entity_id for state in self.hass.states.async_sorted()])
+        self.assertEqual(
+            ['light.attic', 'light.bowl'],
+            [state.entity_id for state
+             in self.hass.states.async_sorted('LIGHT')])
+        self.assertEqual(['light.attic', 'light.bowl'],
+                         self.states.entity_ids('light'))
+        self.assertEqual(
+            'off', self.hass.states.async_sorted('light')[1].state)
+
+        self.states.remove('light.attic')
+        self.states.remove('light_ext.a')
+
+        self.assertEqual(['light.bowl'], self.states.entity_ids('light'))
+        self.assertEqual([], self.states.entity_ids('light_ext'))
+        self.assertEqual(
+            ['light.bowl', 'switch.ac'],
+            [state.entity_id for state in self.hass.states.async_sorted()])
+
     def test_all(self):
         """Test everything."""
         states = sorted(state.entity_id for state in self.states.all())
@@ -560,6 +708,133 @@ class TestStateMachine(unittest.TestCase):
         self.assertEqual(1, len(events))
 
 
+class TestTimeScheduler(unittest.TestCase):
+    """Test TimeScheduler methods."""
+
+    # pylint: disable=invalid-name
+    def setUp(self):
+        """Setup things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        self.scheduler = self.hass.scheduler
+
+    # pylint: disable=invalid-name
+    def tearDown(self):
+        """Stop down stuff we started."""
+        self.hass.stop()
+
+    def _tick(self, now):
+        """Fire a time changed event and wait for it to be handled."""
+        self.hass.bus.fire(ha.EVENT_TIME_CHANGED, {ha.ATTR_NOW: now})
+        self.hass.block_till_done()
+
+    def test_point_in_time_fires_once_in_order(self):
+        """Test point in time listeners fire once when due."""
+        now = datetime(2016, 1, 1, 12, 0, 0, tzinfo=dt_util.UTC)
+        calls = []
+
+        run_callback_threadsafe(
+            self.hass.loop, self.scheduler.async_track_point_in_utc_time,
+            now + timedelta(seconds=2), lambda now: calls.append(2)).result()
+        run_callback_threadsafe(
+            self.hass.loop, self.scheduler.async_track_point_in_utc_time,
+            now + timedelta(seconds=1), lambda now: calls.append(1)).result()
+
+        self._tick(now)
+        self.assertEqual([], calls)
+
+        self._tick(now + timedelta(seconds=1))
+        self.assertEqual([1], calls)
+
+        self._tick(now + timedelta(seconds=5))
+        self.assertEqual([1, 2], calls)
+
+        self._tick(now + timedelta(seconds=6))
+        self.assertEqual([1, 2], calls)
+
+    def test_point_in_time_remove(self):
+        """Test removed point in time listeners do not fire."""
+        now = datetime(2016, 1, 1, 12, 0, 0, tzinfo=dt_util.UTC)
+        calls = []
+
+        unsub = run_callback_threadsafe(
+            self.hass.loop, self.scheduler.async_track_point_in_utc_time,
+            now, calls.append).result()
+        run_callback_threadsafe(self.hass.loop, unsub).result()
+
+        self._tick(now)
+        self.assertEqual([], calls)
+
+    def test_track_seconds_only_wakes_matching_slot(self):
+        """Test second listeners are only woken on their second."""
+        now = datetime(2016, 1, 1, 12, 0, 0, tzinfo=dt_util.UTC)
+        slot_calls = []
+        tick_calls = []
+
+        unsub = run_callback_threadsafe(
+            self.hass.loop, self.scheduler.async_track_seconds,
+            (0, 30), slot_calls.append).result()
+        run_callback_threadsafe(
+            self.hass.loop, self.scheduler.async_track_seconds,
+            None, tick_calls.append).result()
+
+        self._tick(now)
+        self._tick(now + timedelta(seconds=1))
+        self._tick(now + timedelta(seconds=30))
+        self.assertEqual(2, len(slot_calls))
+        self.assertEqual(3, len(tick_calls))
+
+        run_callback_threadsafe(self.hass.loop, unsub).result()
+        self._tick(now + timedelta(minutes=1))
+        self.assertEqual(2, len(slot_calls))
+        self.assertEqual(4, len(tick_calls))
+
+
+class TestStateChangeDispatcher(unittest.TestCase):
+    """Test StateChangeDispatcher methods."""
+
+    # pylint: disable=invalid-name
+    def setUp(self):
+        """Setup things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        self.dispatcher = self.hass.state_dispatcher
+
+    # pylint: disable=invalid-name
+    def tearDown(self):
+        """Stop down stuff we started."""
+        self.hass.stop()
+
+    def test_dispatch_by_entity_id(self):
+        """Test listeners only receive events of tracked entities."""
+        light_calls = []
+        all_calls = []
+
+        unsub = run_callback_threadsafe(
+            self.hass.loop, self.dispatcher.async_track,
+            ('light.bowl', 'light.ceiling'), light_calls.append).result()
+        run_callback_threadsafe(
+            self.hass.loop, self.dispatcher.async_track,
+            ha.MATCH_ALL, all_calls.append).result()
+
+        self.assertEqual({'light.bowl': 1, 'light.ceiling': 1, '*': 1},
+                         self.dispatcher.listeners)
+
+        self.hass.states.set('light.bowl', 'on')
+        self.hass.states.set('switch.kitchen', 'on')
+        self.hass.block_till_done()
+
+        self.assertEqual(1, len(light_calls))
+        self.assertEqual('light.bowl', light_calls[0].data['entity_id'])
+        self.assertEqual(2, len(all_calls))
+
+        run_callback_threadsafe(self.hass.loop, unsub).result()
+        self.assertEqual({'*': 1}, self.dispatcher.listeners)
+
+        self.hass.states.set('light.bowl', 'off')
+        self.hass.block_till_done()
+        self.assertEqual(1, len(light_calls))
+        self.assertEqual(3, len(all_calls))
+
+
 class TestServiceCall(unittest.TestCase):
     """Test ServiceCall class."""
 
@@ -668,6 +943,22 @@ class TestServiceRegistry(unittest.TestCase):
         self.hass.block_till_done()
         self.assertEqual(1, len(calls))
 
+    def test_sync_service_runs_in_services_pool(self):
+        """Test sync service handlers run in the services pool."""
+        threads = []
+
+        def service_handler(call):
+            """Service handler."""
+            threads.append(threading.current_thread())
+
+        self.services.register('test_domain', 'register_calls',
+                               service_handler)
+        self.assertTrue(
+            self.services.call('test_domain', 'REGISTER_CALLS', blocking=True))
+        self.assertEqual(1, len(threads))
+        self.assertIn(threads[0],
+                      self.hass.executors[ha.POOL_SERVICES]._threads)
+
 
 class TestConfig(unittest.TestCase):
     """Test configuration methods."""
@@ -3,7 +3,7 @@
 import asyncio
 import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import homeassistant.core as ha
 import homeassistant.bootstrap as bootstrap
@@ -11,6 +11,7 @@ import homeassistant.remote as remote
 import homeassistant.components.http as http
 from homeassistant.const import HTTP_HEADER_HA_AUTH, EVENT_STATE_CHANGED
 import homeassistant.util.dt as dt_util
+from homeassistant.util.async import run_callback_threadsafe
 
 from tests.common import (
     get_test_instance_port, get_test_home_assistant, get_test_config_dir)
@@ -129,6 +130,92 @@ class TestRemoteMethods(unittest.TestCase):
         # Should not trigger any exception
         remote.fire_event(broken_api, "test.event_no_data")
 
+    def test_fire_events(self):
+        """Test Python API fire_events."""
+        test_value = []
+
+        @ha.callback
+        def listener(event):
+            """Helper method that will verify our events got called."""
+            test_value.append(event.data)
+
+        hass.bus.listen("test.event_batch", listener)
+        remote.fire_events(master_api, [("test.event_batch", {'n': 1}),
+                                        ("test.event_batch", None)])
+        hass.block_till_done()
+        self.assertEqual([{'n': 1}, {}], test_value)
+
+        # Should not trigger any exception
+        remote.fire_events(broken_api, [("test.event_batch", None)])
+
+    def test_fire_events_falls_back_to_single_events(self):
+        """Test fire_events fires one by one if batches are unsupported."""
+        api = Mock(return_value=Mock(status_code=404))
+
+        with patch('homeassistant.remote.fire_event') as mock_fire:
+            remote.fire_events(api, [('event_1', {'n': 1}), ('event_2', None)])
+
+        self.assertEqual([(api, 'event_1', {'n': 1}), (api, 'event_2', None)],
+                         [call[0] for call in mock_fire.call_args_list])
+
+    def test_event_forwarder_batches_events(self):
+        """Test the event forwarder sends a burst of events in one batch."""
+        forwarder = remote.EventForwarder(hass)
+        api = Mock(host='127.0.0.1', port=1)
+        run_callback_threadsafe(
+            hass.loop, forwarder.async_connect, api).result()
+
+        @ha.callback
+        def fire_burst():
+            """Fire a burst of events."""
+            for index in range(3):
+                hass.bus.async_fire('test.forward_batch', {'n': index})
+
+        with patch('homeassistant.remote.fire_events') as mock_fire:
+            run_callback_threadsafe(hass.loop, fire_burst).result()
+            hass.block_till_done()
+
+        run_callback_threadsafe(
+            hass.loop, forwarder.async_disconnect, api).result()
+        hass.block_till_done()
+
+        calls = [call[0] for call in mock_fire.call_args_list
+                 if call[0][0] is api]
+        self.assertEqual(
+            [(api, [('test.forward_batch', {'n': index})
+                    for index in range(3)])],
+            calls)
+
+    def test_event_forwarder_failed_batch(self):
+        """Test a failing batch does not stop forwarding later events."""
+        forwarder = remote.EventForwarder(hass)
+        forwarder._targets[('127.0.0.1', 1)] = Mock(host='127.0.0.1')
+        forwarder._pending = [ha.Event('test.forward_fail')]
+        forwarder._forwarding = True
+
+        with patch('homeassistant.remote.fire_events',
+                   side_effect=ValueError) as mock_fire:
+            forwarder._forward_events()
+
+        self.assertEqual(1, mock_fire.call_count)
+        self.assertFalse(forwarder._forwarding)
+        self.assertEqual([], forwarder._pending)
+
+    def test_api_session_per_thread(self):
+        """Test each thread calling the API uses its own session."""
+        api = remote.API('127.0.0.1', API_PASSWORD, MASTER_PORT)
+        sessions = []
+        thread = threading.Thread(
+            target=lambda: sessions.append(api._get_session()))
+        thread.start()
+        thread.join()
+
+        self.assertIs(api._get_session(), api._get_session())
+        self.assertIsNot(sessions[0], api._get_session())
+
+        api.close()
+        self.assertEqual({}, api._sessions)
+
     def test_get_state(self):
         """Test Python API get_state."""
         self.assertEqual(
@@ -46,6 +46,35 @@ class TestLocationUtil(TestCase):
 
         assert meters/1000 - DISTANCE_KM < 0.01
 
+    def test_haversine_close_to_distance(self):
+        """Test the haversine distance is within the tolerance."""
+        meters = location_util.distance(*COORDINATES_PARIS,
+                                        *COORDINATES_NEW_YORK)
+        approximate = location_util.haversine(*COORDINATES_PARIS,
+                                              *COORDINATES_NEW_YORK)
+
+        assert abs(approximate - meters) <= \
+            meters * location_util.HAVERSINE_TOLERANCE
+        assert location_util.haversine(*COORDINATES_PARIS,
+                                       *COORDINATES_PARIS) == 0
+
+    def test_nearest(self):
+        """Test finding the nearest point."""
+        points = [COORDINATES_NEW_YORK, (48.86, 2.35), (48.87, 2.35)]
+
+        with patch('homeassistant.util.location.distance',
+                   wraps=location_util.distance) as mock_distance:
+            index, meters = location_util.nearest(
+                COORDINATES_PARIS[0], COORDINATES_PARIS[1], points)
+
+        assert index == 1
+        assert meters == location_util.distance(*COORDINATES_PARIS,
+                                                *points[1])
+        # The other points are ruled out by the haversine distance
+        assert mock_distance.call_count == 1
+
+        assert location_util.nearest(0, 0, []) == (None, None)
+
     def test_get_kilometers(self):
         """Test getting the distance between given coordinates in km."""
         kilometers = location_util.vincenty(COORDINATES_PARIS,
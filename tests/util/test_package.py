@@ -2,6 +2,7 @@
 import os
 import pkg_resources
 import subprocess
+import tempfile
 import unittest
 
 from distutils.sysconfig import get_python_lib
@@ -107,6 +108,63 @@ class TestPackageUtilInstallPackage(unittest.TestCase):
         self.assertEqual(mock_logger.exception.call_count, 1)
 
 
+@patch('homeassistant.util.package.subprocess.call')
+@patch('homeassistant.util.package.check_package_exists')
+class TestPackageUtilInstallPackages(unittest.TestCase):
+    """Test installing multiple packages at once."""
+
+    @patch('homeassistant.util.package.sys')
+    def test_install_missing_in_one_call(self, mock_sys, mock_exists,
+                                         mock_subprocess):
+        """Test only missing packages are installed with one pip call."""
+        mock_exists.side_effect = lambda package, target: \
+            package == TEST_EXIST_REQ
+        mock_subprocess.return_value = 0
+
+        self.assertEqual([], package.install_packages(
+            [TEST_EXIST_REQ, TEST_NEW_REQ, 'other==1.0'], False))
+
+        self.assertEqual(
+            mock_subprocess.call_args_list,
+            [call([mock_sys.executable, '-m', 'pip', 'install', '--quiet',
+                   TEST_NEW_REQ, 'other==1.0'])])
+
+    def test_install_failure_returns_failing(self, mock_exists,
+                                             mock_subprocess):
+        """Test the failing packages are found when the batch fails."""
+        mock_exists.return_value = False
+        mock_subprocess.side_effect = lambda args: \
+            1 if TEST_NEW_REQ in args else 0
+
+        self.assertEqual([TEST_NEW_REQ], package.install_packages(
+            [TEST_NEW_REQ, 'other==1.0']))
+        self.assertEqual(3, mock_subprocess.call_count)
+
+    def test_install_uses_cache(self, mock_exists, mock_subprocess):
+        """Test installed packages are remembered across caches."""
+        mock_exists.return_value = False
+        mock_subprocess.return_value = 0
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'cache')
+
+            package.install_packages(
+                [TEST_NEW_REQ], cache=package.RequirementsCache(path, tmp_dir))
+            self.assertEqual(1, mock_exists.call_count)
+
+            cache = package.RequirementsCache(path, tmp_dir)
+            self.assertEqual([], package.install_packages(
+                [TEST_NEW_REQ], cache=cache))
+            self.assertEqual(1, mock_exists.call_count)
+            self.assertEqual(1, mock_subprocess.call_count)
+
+            # Changes to the lib dir invalidate the cache
+            os.mkdir(os.path.join(tmp_dir, 'new_package'))
+            os.utime(tmp_dir, (0, 0))
+            cache = package.RequirementsCache(path, tmp_dir)
+            self.assertFalse(cache.is_installed(TEST_NEW_REQ))
+
+
 class TestPackageUtilCheckPackageExists(unittest.TestCase):
     """Test for homeassistant.util.package module."""
 
@@ -1,6 +1,7 @@
 """Test Home Assistant yaml loader."""
 import io
 import os
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -251,6 +252,90 @@ class TestYaml(unittest.TestCase):
         assert yaml.dump({'a': None, 'b': 'b'}) == 'a:\nb: b\n'
 
 
+class TestNodeCache(unittest.TestCase):
+    """Test caching of parsed YAML files."""
+
+    # pylint: disable=invalid-name
+    def setUp(self):
+        """Create a config dir with an included file."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = self.write('configuration.yaml',
+                                      'key: !include included.yaml\n')
+        self.write('included.yaml', 'nested:\n  value: 1\n')
+
+    # pylint: disable=invalid-name
+    def tearDown(self):
+        """Remove the config dir and its cached files."""
+        for path in list(yaml._NODE_CACHE):
+            if path.startswith(self.tmp_dir.name):
+                del yaml._NODE_CACHE[path]
+        yaml._NODE_CACHE_DIRTY.clear()
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        """Write a file that is old enough to be cached."""
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w') as yaml_file:
+            yaml_file.write(content)
+        os.utime(path, (0, 0))
+        return path
+
+    def test_unchanged_files_are_not_parsed(self):
+        """Test files are only parsed again when they change."""
+        with patch('homeassistant.util.yaml._NodeLoader',
+                   side_effect=yaml._NodeLoader) as mock_loader:
+            conf = yaml.load_yaml(self.config_path)
+            assert conf['key']['nested'] == {'value': 1}
+            assert mock_loader.call_count == 2
+
+            conf = yaml.load_yaml(self.config_path)
+            assert conf['key']['nested'] == {'value': 1}
+            assert conf['key']['nested'].__line__ == 1
+            assert mock_loader.call_count == 2
+
+            self.write('included.yaml', 'nested:\n  value: 22\n')
+            conf = yaml.load_yaml(self.config_path)
+            assert conf['key']['nested'] == {'value': 22}
+            assert mock_loader.call_count == 3
+
+    def test_recently_changed_files_are_not_cached(self):
+        """Test files that may change again in the same second are parsed."""
+        os.utime(self.config_path)
+
+        with patch('homeassistant.util.yaml._NodeLoader',
+                   side_effect=yaml._NodeLoader) as mock_loader:
+            yaml.load_yaml(self.config_path)
+            yaml.load_yaml(self.config_path)
+            assert mock_loader.call_count == 3
+
+    def test_cache_is_stored_in_config_dir(self):
+        """Test the parsed files are stored and loaded from the config dir."""
+        cache_path = os.path.join(self.tmp_dir.name, '.yaml_cache')
+
+        yaml.load_yaml(self.config_path)
+        yaml.save_node_cache(cache_path, self.tmp_dir.name)
+        assert os.path.isfile(cache_path)
+
+        del yaml._NODE_CACHE[self.config_path]
+        yaml.load_node_cache(cache_path)
+        assert self.config_path in yaml._NODE_CACHE
+
+        with patch('homeassistant.util.yaml._NodeLoader') as mock_loader:
+            yaml.load_yaml(self.config_path)
+            assert not mock_loader.called
+
+    def test_failed_save_leaves_no_cache(self):
+        """Test a failure to store the cache is logged and cleaned up."""
+        cache_path = os.path.join(self.tmp_dir.name, '.yaml_cache')
+
+        yaml.load_yaml(self.config_path)
+        with patch('pickle.dump', side_effect=TypeError):
+            yaml.save_node_cache(cache_path, self.tmp_dir.name)
+
+        assert not any(name.startswith('.yaml_cache')
+                       for name in os.listdir(self.tmp_dir.name))
+
+
 FILES = {}
 
 